@@ -0,0 +1,92 @@
+"""
+Microbenchmark of the per-call overhead of the dispatch decorators: the dispatch
+of multipledispatch is compared with the cached dispatch used on the inference
+path, for methods without arguments, with an argument of the exact registered
+type, and with an argument of a subclass of the registered type.
+
+Usage: python -m benchmarks.dispatch_benchmark [nr_calls]
+"""
+import sys
+import timeit
+
+from multipledispatch import dispatch as multiple_dispatch
+
+from bn.values.value import Value
+from bn.values.value_factory import ValueFactory
+from datastructs.assignment import Assignment
+from utils.dispatch_utils import dispatch as cached_dispatch
+
+
+class PlainMethods:
+    def get(self):
+        return 1
+
+    def set(self, value):
+        return value
+
+
+class MultipleDispatchMethods:
+    @multiple_dispatch()
+    def get(self):
+        return 1
+
+    @multiple_dispatch(str)
+    def set(self, value):
+        return value
+
+    @multiple_dispatch(Value)
+    def set(self, value):
+        return value
+
+
+class CachedDispatchMethods:
+    @cached_dispatch()
+    def get(self):
+        return 1
+
+    @cached_dispatch(str)
+    def set(self, value):
+        return value
+
+    @cached_dispatch(Value)
+    def set(self, value):
+        return value
+
+
+def measure(statement, nr_calls, **variables):
+    """
+    Returns the average duration of the statement, in nanoseconds.
+
+    :param statement: the statement to time
+    :param nr_calls: the number of calls
+    :param variables: the variables used in the statement
+    :return: the average duration per call (best of five runs)
+    """
+    timings = timeit.repeat(statement, globals=variables, number=nr_calls, repeat=5)
+    return min(timings) / nr_calls * 1e9
+
+
+def main(nr_calls=200000):
+    value = ValueFactory.create(True)
+    rows = []
+    for name, instance in (('plain', PlainMethods()),
+                           ('multipledispatch', MultipleDispatchMethods()),
+                           ('cached dispatch', CachedDispatchMethods())):
+        rows.append((name,
+                     measure('instance.get()', nr_calls, instance=instance),
+                     measure('instance.set("value")', nr_calls, instance=instance),
+                     measure('instance.set(value)', nr_calls, instance=instance, value=value)))
+
+    print('%-20s %12s %12s %12s' % ('per call (ns)', 'no argument', 'exact type', 'subclass'))
+    for name, no_arg, exact, subclass in rows:
+        print('%-20s %12.0f %12.0f %12.0f' % (name, no_arg, exact, subclass))
+
+    assignment = Assignment('var', value)
+    print()
+    print('Assignment.get_value: %.0f ns' % measure('assignment.get_value("var")', nr_calls, assignment=assignment))
+    print('Assignment.get_variables: %.0f ns' % measure('assignment.get_variables()', nr_calls, assignment=assignment))
+    print('Assignment.consistent_with: %.0f ns' % measure('assignment.consistent_with(assignment)', nr_calls, assignment=assignment))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,278 @@
+"""
+Benchmark suite over the example domains and the example networks, providing a
+performance baseline that can be compared across commits:
+
+- scripted user inputs are replayed against the example domains, measuring the
+  latency of each turn (percentiles), the time spent pruning the dialogue state
+  (StatePruner.prune) and the peak memory of the dialogue;
+- probability queries are run on the example networks (see NetworkExamples), with
+  variable elimination, the junction tree algorithm and the sampling algorithm,
+  measuring their throughput.
+
+The results are written as JSON, and can be compared with the results of a previous
+run (the ratios between the new and the old measures are then printed).
+
+Usage: python -m benchmarks.performance_suite [--repeats N] [--output results.json]
+                                              [--compare baseline.json]
+"""
+import argparse
+import json
+import logging
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from dialogue_system import DialogueSystem
+from inference.approximate.sampling_algorithm import SamplingAlgorithm
+from inference.exact.junction_tree import JunctionTree
+from inference.exact.variable_elimination import VariableElimination
+from readers.xml_domain_reader import XMLDomainReader
+from test.common.network_examples import NetworkExamples
+from utils.instrumentation import Instrumentation
+
+# scripted user inputs for each example domain (each input is either a string or a
+# N-best list of hypotheses associated with their probabilities)
+dialogue_scripts = {
+    'example_domains/example-flightbooking.xml': [
+        'I want to go to Oslo',
+        {'to Bergen': 0.6, 'to Tromsø': 0.3},
+        'yes',
+        'on March 14',
+        {'2 tickets': 0.7, '3 tickets': 0.2},
+        'yes',
+        'no',
+        'yes',
+    ],
+    'example_domains/example-pizzas.xml': [
+        'I would like one pizza Margherita',
+        {'yes': 0.8, 'no': 0.1},
+        {'two bottles of Coke': 0.5, 'two bottles of Fanta': 0.4},
+        'yes',
+        'three pizzas Tonno',
+        'no',
+        'three pizzas Napoli',
+        'yes',
+    ],
+    'example_domains/example-step-by-step_params.xml': [
+        'move forward',
+        {'turn left': 0.6, 'turn right': 0.3},
+        'go forward',
+        'turn right',
+        {'move left': 0.4, 'move forward': 0.4},
+        'go forward',
+    ],
+    'example_domains/elevator.xml': [
+        'second floor',
+        {'yes': 0.7, 'third floor': 0.2},
+        {'first floor': 0.5, 'third floor': 0.4},
+        'yes',
+        'third',
+        'exactly',
+    ],
+}
+
+# example networks, with their constructors
+networks = {
+    'basic_network': NetworkExamples.construct_basic_network,
+    'basic_network2': NetworkExamples.construct_basic_network2,
+}
+
+# percentiles of the turn latencies
+percentiles = [50, 90, 99]
+
+
+def run_dialogue(domain, inputs, trace_memory=False):
+    """
+    Replays the user inputs against a new dialogue system for the domain.
+
+    :param domain: the dialogue domain
+    :param inputs: the scripted user inputs
+    :param trace_memory: whether to trace the memory allocations of the dialogue
+    :return: the list of turn latencies (in seconds), the list of pruning times (in
+             seconds), and the peak memory (in bytes, or None if not traced)
+    """
+    if trace_memory:
+        tracemalloc.start()
+
+    system = DialogueSystem(domain)
+    system.get_settings().show_gui = False
+
+    Instrumentation.clear()
+    Instrumentation.enable()
+    latencies = []
+    try:
+        system.start_system()
+        for user_input in inputs:
+            start_time = time.perf_counter()
+            system.add_user_input(user_input)
+            latencies.append(time.perf_counter() - start_time)
+    finally:
+        Instrumentation.enable(False)
+        system.pause(True)
+
+    prune_times = []
+    for report in Instrumentation.get_reports():
+        for cycle in report['cycles']:
+            for event in cycle['events']:
+                prune_events = [sub_event for sub_event in event.get('events', []) if sub_event['category'] == 'prune']
+                if event['category'] == 'reduce' and len(prune_events) > 0:
+                    prune_times.append(sum(sub_event['duration'] for sub_event in prune_events))
+    Instrumentation.clear()
+
+    peak_memory = None
+    if trace_memory:
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return latencies, prune_times, peak_memory
+
+
+def benchmark_dialogue(domain_file, inputs, repeats):
+    """
+    Benchmarks the dialogues of a domain.
+
+    :param domain_file: the domain file
+    :param inputs: the scripted user inputs
+    :param repeats: the number of times the dialogue is replayed
+    :return: the dictionary of measures
+    """
+    domain = XMLDomainReader.extract_domain(domain_file)
+
+    latencies = []
+    prune_times = []
+    for _ in range(repeats):
+        dialogue_latencies, dialogue_prune_times, _ = run_dialogue(domain, inputs)
+        latencies.extend(dialogue_latencies)
+        prune_times.extend(dialogue_prune_times)
+
+    # the memory is traced on a separate run, since tracing slows down the execution
+    _, _, peak_memory = run_dialogue(domain, inputs, trace_memory=True)
+
+    result = {'nb_turns': len(latencies)}
+    for percentile in percentiles:
+        result['latency_p%d' % percentile] = float(np.percentile(latencies, percentile))
+    result['latency_mean'] = float(np.mean(latencies))
+    result['prune_mean'] = float(np.mean(prune_times)) if len(prune_times) > 0 else None
+    result['prune_total'] = float(np.sum(prune_times) / repeats)
+    result['peak_memory'] = peak_memory
+    return result
+
+
+def benchmark_network(constructor, min_duration):
+    """
+    Benchmarks the probability queries on each chance node of an example network,
+    with variable elimination, the junction tree algorithm (whose tree is calibrated
+    by the first query) and the sampling algorithm.
+
+    :param constructor: the constructor of the network
+    :param min_duration: the minimum duration of the measure for each algorithm (in
+                         seconds)
+    :return: the dictionary of measures
+    """
+    network = constructor()
+    query_vars = sorted(network.get_chance_node_ids())
+
+    result = {'nb_nodes': len(network.get_nodes())}
+    for name, algorithm in (('ve', VariableElimination()), ('junction_tree', JunctionTree()),
+                            ('sampling', SamplingAlgorithm())):
+        nb_queries = 0
+        start_time = time.perf_counter()
+        while time.perf_counter() - start_time < min_duration:
+            for query_var in query_vars:
+                algorithm.query_prob(network, query_var)
+            nb_queries += len(query_vars)
+        result['%s_queries_per_second' % name] = nb_queries / (time.perf_counter() - start_time)
+    return result
+
+
+def get_commit():
+    """
+    Returns the hash of the current git commit (or None if it cannot be determined).
+
+    :return: the commit hash
+    """
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(repeats=5, min_duration=1.):
+    """
+    Runs the benchmark suite.
+
+    :param repeats: the number of times each dialogue is replayed
+    :param min_duration: the minimum duration of each network measure (in seconds)
+    :return: the results of the benchmarks
+    """
+    random.seed(0)
+    np.random.seed(0)
+
+    results = {
+        'commit': get_commit(),
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'dialogues': dict(),
+        'networks': dict(),
+    }
+    for domain_file, inputs in dialogue_scripts.items():
+        results['dialogues'][domain_file] = benchmark_dialogue(domain_file, inputs, repeats)
+    for name, constructor in networks.items():
+        results['networks'][name] = benchmark_network(constructor, min_duration)
+    return results
+
+
+def compare(results, baseline):
+    """
+    Returns the ratios between the measures of the results and those of a baseline
+    (for the measures present in both).
+
+    :param results: the new results
+    :param baseline: the baseline results
+    :return: dictionary mapping each benchmark to the ratios of its measures
+    """
+    ratios = dict()
+    for group in ['dialogues', 'networks']:
+        for name, measures in results[group].items():
+            old_measures = baseline.get(group, dict()).get(name, dict())
+            for key, value in measures.items():
+                old_value = old_measures.get(key, None)
+                if isinstance(value, (int, float)) and isinstance(old_value, (int, float)) and old_value != 0:
+                    ratios.setdefault(name, dict())[key] = value / old_value
+    return ratios
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Benchmark suite over the example domains and networks')
+    parser.add_argument('--repeats', type=int, default=5, help='number of replays of each dialogue')
+    parser.add_argument('--min-duration', type=float, default=1., help='minimum duration of each network measure')
+    parser.add_argument('--output', help='file in which to write the results (JSON)')
+    parser.add_argument('--compare', help='file of baseline results (JSON) to compare with')
+    args = parser.parse_args(argv)
+
+    logging.getLogger('PyOpenDial').setLevel(logging.WARNING)
+    results = run(args.repeats, args.min_duration)
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print('ratios with respect to %s (commit %s):' % (args.compare, baseline.get('commit', None)))
+        for name, ratios in compare(results, baseline).items():
+            print(name)
+            for key, ratio in sorted(ratios.items()):
+                print('  %-28s %6.2f' % (key, ratio))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,73 @@
+"""
+Benchmark of the cold start of the core runtime in headless mode: each run is
+performed in a new interpreter, measuring the duration of `import dialogue_system`,
+of the extraction of the domain, and of the construction of the dialogue system
+(without GUI). The optional dependencies (GUI, audio, speech plugins, example
+models) loaded by the run are also reported, since a headless system should not
+load any of them.
+
+Usage: python -m benchmarks.startup_benchmark [domain_file] [nr_runs]
+"""
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+# top-level packages of the optional dependencies
+optional_packages = ['PyQt5', 'soundcard', 'google', 'torch', 'parlai', 'scipy', 'asteval']
+
+# script of a single run, printing its measures as JSON
+run_script = """
+import json
+import sys
+import time
+
+start_time = time.perf_counter()
+import dialogue_system
+import_time = time.perf_counter() - start_time
+
+from readers.xml_domain_reader import XMLDomainReader
+start_time = time.perf_counter()
+domain = XMLDomainReader.extract_domain(sys.argv[1])
+domain_time = time.perf_counter() - start_time
+
+start_time = time.perf_counter()
+system = dialogue_system.DialogueSystem(domain)
+system.get_settings().show_gui = False
+construction_time = time.perf_counter() - start_time
+
+packages = sorted(set(module.split('.')[0] for module in sys.modules) & set(sys.argv[2].split(',')))
+print(json.dumps({'import': import_time, 'domain': domain_time, 'construction': construction_time,
+                  'optional_packages': packages}))
+"""
+
+
+def run(domain_file):
+    """
+    Performs a single run in a new interpreter.
+
+    :param domain_file: the domain file
+    :return: the measures of the run
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.check_output([sys.executable, '-c', run_script, domain_file, ','.join(optional_packages)],
+                                     cwd=root)
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main(domain_file='example_domains/example-flightbooking.xml', nr_runs=5):
+    runs = [run(domain_file) for _ in range(nr_runs)]
+
+    print('cold start of %s (%d runs)' % (domain_file, nr_runs))
+    print('%-25s %10s %10s' % ('(ms)', 'min', 'median'))
+    for key in ['import', 'domain', 'construction']:
+        durations = [measures[key] * 1000 for measures in runs]
+        print('%-25s %10.1f %10.1f' % (key, min(durations), np.median(durations)))
+    print('optional packages loaded: %s' % ', '.join(runs[-1]['optional_packages']))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else 'example_domains/example-flightbooking.xml',
+         int(sys.argv[2]) if len(sys.argv) > 2 else 5)
@@ -1,13 +1,13 @@
+import itertools
 import logging
 from collections import Collection
 from copy import copy
 
-from multipledispatch import dispatch
-
 from bn.nodes.action_node import ActionNode
 from bn.nodes.b_node import BNode
 from bn.nodes.chance_node import ChanceNode
 from bn.nodes.utility_node import UtilityNode
+from utils.dispatch_utils import dispatch
 
 
 class BNetworkWrapper:
@@ -23,6 +23,10 @@ class BNetwork(BNetworkWrapper):
     # logger
     log = logging.getLogger('PyOpenDial')
 
+    # source of the version stamps of the networks (each change of relation or
+    # content gives a fresh stamp to the network, which is unique across networks)
+    _versions = itertools.count()
+
     # ===================================
     # NETWORK CONSTRUCTION
     # ===================================
@@ -36,6 +40,12 @@ class BNetwork(BNetworkWrapper):
             self._chance_nodes = dict()
             self._utility_nodes = dict()
             self._action_nodes = dict()
+            self._sorted_nodes = None
+            self._components = None
+            self._junction_tree = None
+            self._last_queries = None
+            self._structure_version = next(BNetwork._versions)
+            self._content_version = next(BNetwork._versions)
         elif isinstance(arg1, Collection):
             nodes = arg1
             """
@@ -62,6 +72,7 @@ class BNetwork(BNetworkWrapper):
             raise ValueError()
 
         self._nodes[node_id] = node
+        self.notify_structure_change()
         node.set_network(self)
 
         if isinstance(node, ChanceNode):
@@ -140,6 +151,7 @@ class BNetwork(BNetworkWrapper):
         elif isinstance(node, ActionNode):
             del self._action_nodes[node_id]
 
+        self.notify_structure_change()
         return self._nodes.pop(node_id)
 
     @dispatch(Collection)  # collection of strings
@@ -166,6 +178,7 @@ class BNetwork(BNetworkWrapper):
         :param new_node_id: the new node identifier
         """
         node = self._nodes.pop(old_node_id, None)
+        self.notify_structure_change()
         if old_node_id in self._chance_nodes:
             del self._chance_nodes[old_node_id]
         if old_node_id in self._utility_nodes:
@@ -194,6 +207,7 @@ class BNetwork(BNetworkWrapper):
         self._chance_nodes.clear()
         self._utility_nodes.clear()
         self._action_nodes.clear()
+        self.notify_structure_change()
 
         for node in network.get_nodes():
             self.add_node(node)
@@ -459,13 +473,18 @@ class BNetwork(BNetworkWrapper):
         Returns an ordered list of nodes, where the ordering is defined in the
         compareTo method implemented in BNode. The ordering will place end nodes (i.e.
         nodes with no outward edges) at the beginning of the list, and start nodes
-        (nodes with no inward edges) at the end of the list.
+        (nodes with no inward edges) at the end of the list. The ordering is cached
+        until the next change in the graph structure.
 
         :return: the ordered list of nodes
         """
-        result = list(self._nodes.values())
-        result.sort()
-        return result
+        version = BNode.get_graph_version()
+        if self._sorted_nodes is None or self._sorted_nodes[0] != version:
+            result = list(self._nodes.values())
+            result.sort()
+            self._sorted_nodes = (version, result)
+
+        return list(self._sorted_nodes[1])
 
     @dispatch()
     def get_sorted_node_ids(self):
@@ -489,22 +508,8 @@ class BNetwork(BNetworkWrapper):
 
         :return: the collection of cliques for the network.
         """
-        cliques = list()
-
-        node_ids_to_process = list()
-        node_ids_to_process.extend(list(self._nodes.keys()))
-        while len(node_ids_to_process) > 0:
-            node_id = node_ids_to_process.pop()
-            clique = self._nodes.get(node_id).get_clique()
-            cliques.append(clique)
-
-            for node_id in clique:
-                if node_id in node_ids_to_process:
-                    node_ids_to_process.remove(node_id)
-
-        cliques.sort(key=lambda clique: hash(frozenset(clique)))
-
-        return cliques
+        cliques = set(self._get_components().values())
+        return [set(clique) for clique in sorted(cliques, key=hash)]
 
     @dispatch(set)
     def get_cliques(self, node_ids):
@@ -517,29 +522,19 @@ class BNetwork(BNetworkWrapper):
         :param node_ids: the subset of node identifiers to use
         :return: the collection of cliques for the network.
         """
-        cliques = list()
-
-        node_ids_to_process = list()
-        node_ids_to_process.extend(list(self._nodes.keys()))
+        components = self._get_components()
+        cliques = set([components[node_id] for node_id in node_ids if node_id in self._nodes])
+        return [set(clique) for clique in sorted(cliques, key=hash)]
 
-        remaining_node_ids_to_process = list()
-        for node_id in node_ids_to_process:
-            if node_id in node_ids:
-                remaining_node_ids_to_process.append(node_id)
-        node_ids_to_process = remaining_node_ids_to_process
-
-        while len(node_ids_to_process) > 0:
-            node_id = node_ids_to_process.pop()
-            clique = self._nodes.get(node_id).get_clique()
-            cliques.append(clique)
-
-            for node_id in clique:
-                if node_id in node_ids_to_process:
-                    node_ids_to_process.remove(node_id)
-
-        cliques.sort(key=lambda clique: hash(frozenset(clique)))
+    @dispatch(str)
+    def get_clique(self, node_id):
+        """
+        Returns the (maximal) clique in the network that contains the node.
 
-        return cliques
+        :param node_id: the node identifier
+        :return: the (read-only) set of node identifiers in the clique
+        """
+        return self._get_components()[node_id]
 
     @dispatch(set)
     def is_clique(self, node_ids):
@@ -553,14 +548,152 @@ class BNetwork(BNetworkWrapper):
         if len(node_ids) == 0:
             return False
 
-        node_id = node_ids.pop()
-        node_ids.add(node_id)
-        return self.has_node(node_id) and self.get_node(node_id).get_clique() == node_ids
+        node_id = next(iter(node_ids))
+        return self.has_node(node_id) and self._get_components()[node_id] == node_ids
+
+    def _get_components(self):
+        """
+        Returns the mapping from the node identifiers to the maximal cliques (that is,
+        the connected components) of the network. The cliques are computed in one
+        pass over the relations between nodes with a union-find structure, and are
+        cached until the next change in the graph structure.
+
+        :return: the mapping from node identifiers to (frozen) sets of identifiers
+        """
+        version = BNode.get_graph_version()
+        if self._components is None or self._components[0] != version:
+            parents = {node_id: node_id for node_id in self._nodes}
+
+            def find(node_id):
+                while parents[node_id] != node_id:
+                    parents[node_id] = parents[parents[node_id]]
+                    node_id = parents[node_id]
+                return node_id
+
+            for node_id, node in self._nodes.items():
+                for related_node_id in node.get_input_node_ids() | node.get_output_node_ids():
+                    root1 = find(node_id)
+                    root2 = find(parents.setdefault(related_node_id, related_node_id))
+                    if root1 != root2:
+                        parents[root1] = root2
+
+            members = dict()
+            for node_id in parents:
+                members.setdefault(find(node_id), []).append(node_id)
+
+            components = dict()
+            for node_ids in members.values():
+                component = frozenset(node_ids)
+                for node_id in node_ids:
+                    components[node_id] = component
+
+            self._components = (version, components)
+
+        return self._components[1]
+
+    def get_structure_version(self):
+        """
+        Returns the version of the network structure, which changes at each addition,
+        removal or renaming of a node and at each change of relation between its nodes.
+        Contrary to the graph version (see BNode.get_graph_version), only the changes
+        of the nodes owned by the network are notified to it.
+
+        :return: the structure version
+        """
+        return self._structure_version
+
+    def get_content_version(self):
+        """
+        Returns the version of the network contents, which changes at each change of
+        the distribution (or values) of its nodes.
+
+        :return: the content version
+        """
+        return self._content_version
+
+    def notify_structure_change(self):
+        """
+        Notifies the network that its structure has changed, which invalidates the
+        cached node ordering, cliques and ancestors/descendants of all nodes (see
+        BNode.notify_graph_change), and the version of the network.
+        """
+        BNode.notify_graph_change()
+        self._structure_version = next(BNetwork._versions)
+
+    def notify_content_change(self):
+        """
+        Notifies the network that the contents of one of its nodes have changed, which
+        invalidates the cached junction tree.
+        """
+        self._content_version = next(BNetwork._versions)
+
+    def get_junction_tree(self):
+        """
+        Returns the junction tree cached for the network by the junction tree
+        algorithm (see JunctionTree), or None if no tree is cached.
+
+        :return: the cached junction tree
+        """
+        return self._junction_tree
+
+    def set_junction_tree(self, junction_tree):
+        """
+        Caches the junction tree for the network. The tree is never copied, nor
+        pickled, with the network.
+
+        :param junction_tree: the junction tree to cache
+        """
+        self._junction_tree = junction_tree
+
+    def get_last_queries(self):
+        """
+        Returns the version of the network at its last probability queries, together
+        with their number (recorded by the switching algorithm, see
+        SwitchingAlgorithm), or None if the network was not queried yet.
+
+        :return: the pair (network version, number of queries)
+        """
+        return self._last_queries
+
+    def set_last_queries(self, last_queries):
+        """
+        Records the version of the network at its last probability queries, together
+        with their number. The record is never copied, nor pickled, with the network.
+
+        :param last_queries: the pair (network version, number of queries)
+        """
+        self._last_queries = last_queries
 
     # ===================================
     # UTILITIES
     # ===================================
 
+    def __getstate__(self):
+        """
+        Returns the state of the network to pickle, without the cached node ordering,
+        cliques, junction tree and last queries (which are only valid in the current
+        process).
+
+        :return: the state of the network
+        """
+        state = dict(self.__dict__)
+        state['_sorted_nodes'] = None
+        state['_components'] = None
+        state['_junction_tree'] = None
+        state['_last_queries'] = None
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restores the state of the pickled network, with fresh versions (the versions
+        being only unique within a process).
+
+        :param state: the state of the network
+        """
+        self.__dict__.update(state)
+        self._structure_version = next(BNetwork._versions)
+        self._content_version = next(BNetwork._versions)
+
     def __hash__(self):
         """
         Returns the hashcode for the network, defined as the hashcode for the node
@@ -577,21 +710,34 @@ class BNetwork(BNetworkWrapper):
         :return: the copy
         """
         result = BNetwork()
+        self._copy_nodes(result)
+        return result
+
+    def _copy_nodes(self, result):
+        """
+        Adds copies of the nodes (and of their relations) to the (empty) network
+        given as argument. The node distributions are shared with the copies until
+        they are modified, and the relations are directly copied since the network
+        is already known to be acyclic.
+
+        :param result: the network in which to add the copies
+        """
         nodes = self.get_sorted_nodes()
         nodes.sort(reverse=True)
 
+        copied_nodes = dict()
         for node in nodes:
             copied_node = copy(node)
-            for input_node in node.get_input_nodes():
-                if not result.has_node(input_node.get_id()):
+            for input_node_id in node.get_input_node_ids():
+                copied_input_node = copied_nodes.get(input_node_id, None)
+                if copied_input_node is None:
                     raise ValueError()
 
-                copied_node.add_input_node(result.get_node(input_node.get_id()))
+                copied_node._add_copied_input_node(copied_input_node)
 
+            copied_nodes[copied_node.get_id()] = copied_node
             result.add_node(copied_node)
 
-        return result
-
     def __str__(self):
         """
         Returns a basic string representation for the network, defined as the set of
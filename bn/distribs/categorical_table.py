@@ -3,7 +3,6 @@ import math
 from xml.etree.ElementTree import ElementTree, Element
 
 import numpy as np
-from multipledispatch import dispatch
 
 from bn.distribs.density_functions.discrete_density_function import DiscreteDensityFunction
 from bn.distribs.independent_distribution import IndependentDistribution
@@ -15,8 +14,8 @@ from bn.values.value_factory import ValueFactory
 from datastructs.assignment import Assignment
 from inference.approximate.intervals import Intervals
 from settings import Settings
+from utils.dispatch_utils import dispatch
 from utils.inference_utils import InferenceUtils
-from utils.math_utils import MathUtils
 from utils.string_utils import StringUtils
 
 
@@ -54,6 +53,7 @@ class CategoricalTable(CategoricalTableWrapper):
             self._variable = variable
             self._table = head_table
             self._intervals = None
+            self._nearest_index = None
         else:
             raise NotImplementedError()
 
@@ -116,6 +116,7 @@ class CategoricalTable(CategoricalTableWrapper):
             self._table = new_table
 
         self._intervals = None
+        self._nearest_index = None
         return changed
 
     # ===================================
@@ -141,33 +142,11 @@ class CategoricalTable(CategoricalTableWrapper):
 
         if value in self._table:
             return self._table[value]
-        elif isinstance(value, DoubleVal) and self._is_continuous():
+        elif isinstance(value, (DoubleVal, ArrayVal)):
             # if the distribution has continuous values, search for the closest element
-            to_find = value.get_double()
-            closest = None
-            min_distance = math.inf
-            for v in self._table.keys():
-                distance = abs(v.get_double() - to_find)
-                if distance < min_distance:
-                    closest = v
-                    min_distance = distance
-
-            return self.get_prob(closest)
-
-        elif isinstance(value, ArrayVal) and self._is_continuous():
-            to_find = value.get_array()
-            closest = None
-            min_distance = math.inf
-            for v in self._table.keys():
-                if isinstance(v, NoneVal):
-                    continue
-
-                distance = MathUtils.get_distance(v.get_array(), to_find)
-                if distance < min_distance:
-                    closest = v
-                    min_distance = distance
-
-            return self.get_prob(closest)
+            closest = self._get_closest_value(value)
+            if closest is not None:
+                return self._table[closest]
 
         return 0.
 
@@ -399,6 +378,44 @@ class CategoricalTable(CategoricalTableWrapper):
     # PRIVATE METHODS
     # ===================================
 
+    def _get_closest_value(self, value):
+        """
+        Returns the table value that is the closest to the given double or array value,
+        if the table is continuous. The lookup relies on an index built upon the first
+        call: a sorted array of the double values (searched by bisection) and a KD-tree
+        of the array values.
+
+        :param value: the double or array value
+        :return: the closest value in the table, or None if the table is not
+                 continuous or contains no value of the same type
+        """
+        if self._nearest_index is None:
+            self._nearest_index = dict()
+            if self._is_continuous():
+                doubles = sorted([v for v in self._table.keys() if isinstance(v, DoubleVal)], key=lambda v: v.get_double())
+                if len(doubles) > 0:
+                    self._nearest_index[DoubleVal] = (np.array([v.get_double() for v in doubles]), doubles)
+
+                arrays = [v for v in self._table.keys() if isinstance(v, ArrayVal)]
+                if len(arrays) > 0:
+                    from scipy.spatial import cKDTree
+                    self._nearest_index[ArrayVal] = (cKDTree(np.array([v.get_array() for v in arrays])), arrays)
+
+        if isinstance(value, DoubleVal) and DoubleVal in self._nearest_index:
+            points, values = self._nearest_index[DoubleVal]
+            to_find = value.get_double()
+            idx = int(np.searchsorted(points, to_find))
+            if idx == len(points) or (idx > 0 and to_find - points[idx - 1] <= points[idx] - to_find):
+                idx -= 1
+            return values[idx]
+
+        elif isinstance(value, ArrayVal) and ArrayVal in self._nearest_index:
+            tree, values = self._nearest_index[ArrayVal]
+            _, idx = tree.query(value.get_array())
+            return values[int(idx)]
+
+        return None
+
     @dispatch()
     def _is_continuous(self):
         """
@@ -1,14 +1,13 @@
 import logging
 from copy import copy
 
-from multipledispatch import dispatch
-
 from bn.distribs.independent_distribution import IndependentDistribution
 from bn.distribs.prob_distribution import ProbDistribution
 from bn.distribs.single_value_distribution import SingleValueDistribution
 from bn.values.value import Value
 from bn.values.value_factory import ValueFactory
 from datastructs.assignment import Assignment
+from utils.dispatch_utils import dispatch
 
 
 class ConditionalTable(ProbDistribution):
@@ -69,14 +68,11 @@ class ConditionalTable(ProbDistribution):
         :param old_id: the old variable label
         :param new_id: the new variable label
         """
-        for condition in self._table.keys():
-            self._table[condition].modify_variable_id(old_id, new_id)
-            if condition.contains_var(old_id):
-                # TODO: check refactor > something is weird
-                distrib = self._table.pop(condition)
-                value = condition.remove_pair(old_id)
-                condition.add_pair(new_id, value)
-                self._table[condition] = distrib
+        new_table = dict()
+        for condition, distrib in self._table.items():
+            distrib.modify_variable_id(old_id, new_id)
+            new_table[condition.rename_var(old_id, new_id)] = distrib
+        self._table = new_table
 
         if old_id in self._conditional_vars:
             self._conditional_vars.remove(old_id)
@@ -3,7 +3,6 @@ from copy import copy
 from xml.etree.ElementTree import Element
 
 import numpy as np
-from multipledispatch import dispatch
 
 from bn.distribs.density_functions.density_function import DensityFunction
 from bn.distribs.distribution_builder import CategoricalTableBuilder
@@ -14,6 +13,7 @@ from bn.values.value import Value
 from bn.values.value_factory import ValueFactory
 from datastructs.assignment import Assignment
 from settings import Settings
+from utils.dispatch_utils import dispatch
 
 
 class ContinuousDistribution(IndependentDistribution):
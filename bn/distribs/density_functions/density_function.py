@@ -1,6 +1,7 @@
-from multipledispatch import dispatch
 import abc
 
+from utils.dispatch_utils import dispatch
+
 
 class DensityFunction:
     """
@@ -1,12 +1,11 @@
 from xml.etree.ElementTree import Element
 
-from multipledispatch import dispatch
 import logging
 import numpy as np
 
-from scipy.stats import dirichlet
 
 from bn.distribs.density_functions.density_function import DensityFunction
+from utils.dispatch_utils import dispatch
 
 
 class DirichletDensityFunction(DensityFunction):
@@ -19,6 +18,7 @@ class DirichletDensityFunction(DensityFunction):
     log = logging.getLogger('PyOpenDial')
 
     def __init__(self, alpha_list=None):
+        from scipy.stats import dirichlet
         if isinstance(alpha_list, np.ndarray):
             """
             Create a new Dirichlet density function with the provided alpha parameters
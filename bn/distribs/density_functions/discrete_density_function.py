@@ -2,10 +2,10 @@ import logging
 from xml.etree.ElementTree import Element
 
 import numpy as np
-from multipledispatch import dispatch
 
 from bn.distribs.density_functions.density_function import DensityFunction
 from bn.values.value_factory import ValueFactory
+from utils.dispatch_utils import dispatch
 from utils.math_utils import MathUtils
 from utils.string_utils import StringUtils
 
@@ -1,14 +1,13 @@
 from xml.etree.ElementTree import Element
 
-from multipledispatch import dispatch
 import logging
 
 import numpy as np
-from scipy import stats
 
 from bn.distribs.density_functions.density_function import DensityFunction
 from bn.values.array_val import ArrayVal
 from bn.values.value_factory import ValueFactory
+from utils.dispatch_utils import dispatch
 from utils.string_utils import StringUtils
 
 
@@ -23,6 +22,7 @@ class GaussianDensityFunction(DensityFunction):
     log = logging.getLogger('PyOpenDial')
 
     def __init__(self, arg1=None, arg2=None):
+        from scipy import stats
         if isinstance(arg1, np.ndarray) and isinstance(arg2, np.ndarray):
             mean, variance = arg1, arg2
             """
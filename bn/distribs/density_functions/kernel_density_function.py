@@ -1,4 +1,3 @@
-from multipledispatch import dispatch
 import logging
 import math
 
@@ -6,7 +5,7 @@ import numpy as np
 
 from bn.distribs.density_functions.density_function import DensityFunction
 from bn.distribs.density_functions.gaussian_density_function import GaussianDensityFunction
-from utils.math_utils import MathUtils
+from utils.dispatch_utils import dispatch
 from utils.string_utils import StringUtils
 
 
@@ -19,8 +18,8 @@ class KernelDensityFunction(DensityFunction):
     # logger
     log = logging.getLogger('PyOpenDial')
 
-    # the kernel function
-    _kernel = GaussianDensityFunction(0.0, 1.0)
+    # log of the normalisation constant of the Gaussian kernel
+    _log_sqrt_2pi = 0.5 * math.log(2 * math.pi)
 
     def __init__(self, points=None):
         if isinstance(points, np.ndarray):
@@ -29,7 +28,7 @@ class KernelDensityFunction(DensityFunction):
 
             :param points: the points
             """
-            self._points = points
+            self._points = np.asarray(points, dtype=np.float64)
             if len(points) == 0:
                 raise ValueError("KDE Must contain at least one point")
 
@@ -51,48 +50,46 @@ class KernelDensityFunction(DensityFunction):
     @dispatch((float, np.ndarray))
     def get_density(self, x):
         """
-        Returns the density for the given point
+        Returns the density for the given point. If the argument is a two-dimensional
+        array, the densities of all its rows are returned at once.
 
-        :param x: the point
-        :return: its density
+        :param x: the point (or the array of points)
+        :return: its density (or the array of densities)
         """
         if isinstance(x, float):
             x = np.array([x])
-        density = 0.
-        for point in self._points:
-            density += math.exp(self._point_density(x, point))
+        if x.ndim == 2:
+            return self._get_densities(x)
 
-        density /= len(self._points)
+        return float(self._get_densities(x.reshape(1, -1))[0])
 
-        # bounded support (cf. Jones 1993)
-        if self._is_bounded:
-            l = [None] * len(self._bandwidths)
-            u = [None] * len(self._bandwidths)
-            for idx in range(len(self._bandwidths)):
-                l[idx] = (0. - x[idx]) / self._bandwidths[idx]
-                u[idx] = (1. - x[idx]) / self._bandwidths[idx]
-
-            factor = 1. / (self._kernel.get_cdf(u) - self._kernel.get_cdf(l))
-            density = factor * density
-
-        return density
-
-    @dispatch(np.ndarray, np.ndarray)
-    def _point_density(self, estimate_point, data_point):
+    def _get_densities(self, points):
         """
-        Density of x for a single point in the KDE
+        Returns the densities for the rows of the array, computed in log-space over all
+        the data points of the KDE.
 
-        :param estimate_point: the estimate point
-        :param data_point: the data point
-        :return: single point density
+        :param points: the array of estimate points (one per row)
+        :return: the array of densities
         """
+        from scipy.special import logsumexp
+        from scipy.stats import norm
+
+        points = np.asarray(points, dtype=np.float64)
         dim = len(self._bandwidths) - 1 if self._is_bounded else len(self._bandwidths)
+        bandwidths = self._bandwidths[:dim]
 
-        sum = 0.
-        for idx in range(dim):
-            sum += math.log(self._kernel.get_density((estimate_point[idx] - data_point[idx]) / self._bandwidths[idx]) / self._bandwidths[idx])
+        # log-density of each estimate point (rows) for each data point (columns)
+        z = (points[:, np.newaxis, :dim] - self._points[np.newaxis, :, :dim]) / bandwidths
+        log_densities = -0.5 * np.sum(z * z, axis=2) - np.sum(np.log(bandwidths)) - dim * KernelDensityFunction._log_sqrt_2pi
+        densities = np.exp(logsumexp(log_densities, axis=1)) / len(self._points)
 
-        return sum
+        # bounded support (cf. Jones 1993)
+        if self._is_bounded:
+            lower = norm.cdf((0. - points[:, :dim]) / bandwidths)
+            upper = norm.cdf((1. - points[:, :dim]) / bandwidths)
+            densities = densities / np.prod(upper - lower, axis=1)
+
+        return densities
 
     @dispatch()
     def sample(self):
@@ -102,19 +99,30 @@ class KernelDensityFunction(DensityFunction):
 
         :return: the sampled point
         """
-        # step 1 : selecting one point from the available points
-        centre = self._points[np.random.randint(len(self._points))]
+        return self.sample(1)[0]
 
-        # step 2: sampling a point in its vicinity (following a Gaussian)
-        new_point = np.random.multivariate_normal(np.zeros_like(centre), np.identity(len(centre))) * self._sampling_deviation + centre
-        total = np.sum(new_point)
-        shift = min(np.min(new_point, axis=0), 0.)
+    @dispatch(int)
+    def sample(self, nb_samples):
+        """
+        Draws a number of samples at once from the kernel density function (one per row
+        of the returned array).
 
-        # step 3: if the density must be bounded, ensure the sum is = 1
+        :param nb_samples: the number of samples to draw
+        :return: the array of sampled points
+        """
+        # step 1 : selecting the points from the available points
+        centres = self._points[np.random.randint(len(self._points), size=nb_samples)]
+
+        # step 2: sampling points in their vicinity (following a Gaussian)
+        new_points = np.random.standard_normal(centres.shape) * self._sampling_deviation + centres
+
+        # step 3: if the density must be bounded, ensure the sums are = 1
         if self._is_bounded:
-            new_point = (new_point - shift) / (total - shift * len(centre))
+            totals = np.sum(new_points, axis=1, keepdims=True)
+            shifts = np.minimum(np.min(new_points, axis=1, keepdims=True), 0.)
+            new_points = (new_points - shifts) / (totals - shifts * centres.shape[1])
 
-        return new_point
+        return new_points
 
     @dispatch(int)
     def discretize(self, nb_buckets):
@@ -200,21 +208,21 @@ class KernelDensityFunction(DensityFunction):
     @dispatch((float, np.ndarray))
     def get_cdf(self, x):
         """
-        Returns the cumulative probability distribution for the KDE.
+        Returns the cumulative probability distribution for the KDE. If the argument is
+        a two-dimensional array, the cumulative probabilities of all its rows are
+        returned at once.
 
-        :param x: the point
+        :param x: the point (or the array of points)
         :return: the cumulative probability from 0 to x.
         """
         if isinstance(x, float):
             x = np.array([x])
-        if len(x) != self.get_dimensions():
-            raise ValueError("Illegal dimensionality: ", x.length, "!=", self.get_dimensions())
-        nb_lower_points = 0
-        for data_idx in range(len(self._points)):
-            if MathUtils.is_lower(self._points[data_idx, :], x):
-                nb_lower_points += 1
-
-        return nb_lower_points / len(self._points)
+        if x.shape[-1] != self.get_dimensions():
+            raise ValueError("Illegal dimensionality: %d != %d" % (x.shape[-1], self.get_dimensions()))
+        if x.ndim == 2:
+            return np.mean(np.all(self._points[np.newaxis, :, :] <= x[:, np.newaxis, :], axis=2), axis=1)
+
+        return float(np.mean(np.all(self._points <= x, axis=1)))
 
     @dispatch()
     def _get_standard_deviations(self):
@@ -2,11 +2,10 @@ import logging
 from xml.etree.ElementTree import Element
 
 import numpy as np
-from multipledispatch import dispatch
-from scipy import stats
 
 from bn.distribs.density_functions.density_function import DensityFunction
 from bn.values.value_factory import ValueFactory
+from utils.dispatch_utils import dispatch
 
 
 class UniformDensityFunction(DensityFunction):
@@ -18,6 +17,7 @@ class UniformDensityFunction(DensityFunction):
     log = logging.getLogger('PyOpenDial')
 
     def __init__(self, min_val=None, max_val=None):
+        from scipy import stats
         if isinstance(min_val, float) and isinstance(max_val, float):
             """
             Creates a new uniform density function with the given minimum and maximum threshold
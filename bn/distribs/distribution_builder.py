@@ -1,7 +1,6 @@
 import logging
 
 import numpy as np
-from multipledispatch import dispatch
 
 from bn.distribs.categorical_table import CategoricalTable
 from bn.distribs.conditional_table import ConditionalTable
@@ -12,6 +11,7 @@ from bn.values.value_factory import ValueFactory
 from datastructs.assignment import Assignment
 from datastructs.value_range import ValueRange
 from settings import Settings
+from utils.dispatch_utils import dispatch
 from utils.inference_utils import InferenceUtils
 
 
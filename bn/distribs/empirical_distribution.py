@@ -3,7 +3,6 @@ import random
 from collections import Collection
 
 import numpy as np
-from multipledispatch import dispatch
 
 from bn.distribs.continuous_distribution import ContinuousDistribution
 from bn.distribs.density_functions.kernel_density_function import KernelDensityFunction
@@ -12,7 +11,9 @@ from bn.distribs.distribution_builder import CategoricalTableBuilder as Categori
 from bn.distribs.multivariate_distribution import MultivariateDistribution
 from bn.values.array_val import ArrayVal
 from bn.values.double_val import DoubleVal
+from bn.values.value_factory import ValueFactory
 from datastructs.assignment import Assignment
+from utils.dispatch_utils import dispatch
 
 
 class EmpiricalDistribution(MultivariateDistribution):
@@ -20,6 +21,12 @@ class EmpiricalDistribution(MultivariateDistribution):
     Distribution defined "empirically" in terms of a set of samples on a collection of
     random variables. This distribution can then be explicitly converted into a table
     or a continuous distribution (depending on the variable type).
+
+    The samples are also stored column by column: each variable is associated with an
+    array of integer codes (one per sample) and with the list of values indexed by
+    these codes, and a weight column holds the weight of each sample. The columns are
+    built upon the first use of each variable, and the tables and continuous
+    distributions are then derived from the counts of the codes.
     """
 
     # logger
@@ -36,6 +43,8 @@ class EmpiricalDistribution(MultivariateDistribution):
             """
             self._samples = []
             self._variables = set()
+            self._columns = dict()
+            self._weights = None
             self._discrete_cache = None
             self._continuous_cache = None
         elif isinstance(arg1, Collection):
@@ -47,6 +56,8 @@ class EmpiricalDistribution(MultivariateDistribution):
             """
             self._samples = samples
             self._variables = set()
+            self._columns = dict()
+            self._weights = None
             self._discrete_cache = None
             self._continuous_cache = None
 
@@ -63,9 +74,8 @@ class EmpiricalDistribution(MultivariateDistribution):
         :param sample: the sample to add
         """
         self._samples.append(sample)
-        self._discrete_cache = None
-        self._continuous_cache = None
-        self._variables.difference_update(sample.get_variables())
+        self._clear_caches()
+        self._variables.update(sample.get_variables())
 
     @dispatch(str)
     def remove_variable(self, variable_id):
@@ -76,8 +86,7 @@ class EmpiricalDistribution(MultivariateDistribution):
         """
 
         self._variables.remove(variable_id)
-        self._discrete_cache = None
-        self._continuous_cache = None
+        self._clear_caches()
         for assignment in self._samples:
             assignment.remove_pair(variable_id)
 
@@ -157,12 +166,17 @@ class EmpiricalDistribution(MultivariateDistribution):
         Returns a discrete representation of the empirical distribution.
         """
         if self._discrete_cache is None:
-            builder = MultivariateTableBuilder()
-            prob = 1. / len(self._samples)
+            variables = sorted(self._variables)
+            columns = [self._get_column(variable) for variable in variables]
+            rows, probs = self._get_frequencies([codes for codes, _ in columns])
 
-            for assignment in self._samples:
-                trimmed_assignment = assignment.get_trimmed(self._variables)
-                builder.increment_row(trimmed_assignment, prob)
+            builder = MultivariateTableBuilder()
+            for row, prob in zip(rows, probs):
+                assignment = Assignment()
+                for variable, (_, values), code in zip(variables, columns, row):
+                    if values[code] is not None:
+                        assignment.add_pair(variable, values[code])
+                builder.increment_row(assignment, prob)
 
             self._discrete_cache = builder.build()
 
@@ -197,7 +211,8 @@ class EmpiricalDistribution(MultivariateDistribution):
             return self.create_discrete(variable)
 
         # TODO: check bug or refactor. Why 5?
-        if len(set(self._samples)) < 5:
+        codes = np.stack([self._get_column(v)[0] for v in sorted(self._variables | {variable})], axis=1)
+        if len(np.unique(codes, axis=0)) < 5:
             return self.create_discrete(variable)
 
         return self.create_continuous(variable)
@@ -216,13 +231,18 @@ class EmpiricalDistribution(MultivariateDistribution):
         if len(condition_variables) == 0:
             return self.get_marginal(variable)
 
-        builder = ConditionalTableBuilder(variable)
-        prob = 1. / len(self._samples)
+        condition_variables = sorted(condition_variables)
+        columns = [self._get_column(condition_variable) for condition_variable in condition_variables]
+        head_codes, head_values = self._get_column(variable)
+        rows, probs = self._get_frequencies([codes for codes, _ in columns] + [head_codes])
 
-        for assignment in self._samples:
-            condition = assignment.get_trimmed(condition_variables)
-            value = assignment.get_value(variable)
-            builder.increment_row(condition, value, prob)
+        builder = ConditionalTableBuilder(variable)
+        for row, prob in zip(rows, probs):
+            condition = Assignment()
+            for condition_variable, (_, values), code in zip(condition_variables, columns, row):
+                if values[code] is not None:
+                    condition.add_pair(condition_variable, values[code])
+            builder.increment_row(condition, self._get_value(head_values, row[-1]), prob)
 
         builder.normalize()
         return builder.build()
@@ -235,12 +255,12 @@ class EmpiricalDistribution(MultivariateDistribution):
         :param head_variable: the variable for which to create the distribution
         :return: the resulting table
         """
-        builder = CategoricalTableBuilder(head_variable)
-        prob = 1. / len(self._samples)
+        codes, values = self._get_column(head_variable)
+        probs = np.bincount(codes, weights=self._get_weights(), minlength=len(values)) / self._get_weights().sum()
 
-        for assignment in self._samples:
-            value = assignment.get_value(head_variable)
-            builder.increment_row(value, prob)
+        builder = CategoricalTableBuilder(head_variable)
+        for code in np.flatnonzero(probs):
+            builder.increment_row(self._get_value(values, code), float(probs[code]))
 
         return builder.build()
 
@@ -252,16 +272,19 @@ class EmpiricalDistribution(MultivariateDistribution):
         :param head_variable: the variable for which to create the distribution
         :return: the resulting continuous distribution
         """
-        values = []
-        for assignment in self._samples:
-            value = assignment.get_value(head_variable)
-            if isinstance(value, ArrayVal):
-                values.append(value.get_array())
-            elif isinstance(value, DoubleVal):
-                values.append([value.get_double()])
-        values = np.array(values)
+        codes, values = self._get_column(head_variable)
+
+        # the points of the distinct values are indexed by the codes of the samples
+        is_continuous = np.array([isinstance(value, (ArrayVal, DoubleVal)) for value in values], dtype=bool)
+        value_points = [value.get_array() if isinstance(value, ArrayVal) else [value.get_double()]
+                        for value in values if isinstance(value, (ArrayVal, DoubleVal))]
+        if len(value_points) == 0:
+            raise ValueError("no continuous values for %s" % head_variable)
 
-        return ContinuousDistribution(head_variable, KernelDensityFunction(values))
+        value_indices = np.cumsum(is_continuous) - 1
+        points = np.array(value_points, dtype=np.float64)[value_indices[codes[is_continuous[codes]]]]
+
+        return ContinuousDistribution(head_variable, KernelDensityFunction(points))
 
     # ===================================
     # UTILITY METHODS
@@ -275,33 +298,24 @@ class EmpiricalDistribution(MultivariateDistribution):
 
         :param threshold: the frequency threshold
         """
+        if len(self._samples) == 0:
+            return False
 
-        freq = dict()
-        for assignment in self._samples:
-            for variable in assignment.get_variables():
-                value = assignment.get_value(variable)
-                value_freq = freq[variable]
-                if value_freq is None:
-                    value_freq = dict()
-                    freq[variable] = value_freq
-
-                if value not in value_freq:
-                    value_freq[value] = 1
-                else:
-                    value_freq[value] += 1
-
-        changed = False
         min_number = int(len(self._samples) * threshold)
-        for assignment in self._samples:
-            for variable in assignment.get_variables():
-                if freq[variable][assignment.get_value(variable)] < min_number:
-                    # TODO: check bug > is this the right implementation of pruning?
-                    self._samples.remove(assignment)
-                    changed = True
+        to_keep = np.ones(len(self._samples), dtype=bool)
+        for variable in self._variables:
+            codes, values = self._get_column(variable)
+            is_prunable = np.array([value is not None and not isinstance(value, (ArrayVal, DoubleVal))
+                                    for value in values], dtype=bool)
+            counts = np.bincount(codes, minlength=len(values))
+            to_keep &= (counts >= min_number)[codes] | ~is_prunable[codes]
 
-        self._discrete_cache = None
-        self._continuous_cache = None
-        return changed
+        if to_keep.all():
+            return False
+
+        self._samples = [sample for sample, keep in zip(self._samples, to_keep) if keep]
+        self._clear_caches()
+        return True
 
     @dispatch(str, str)
     def modify_variable_id(self, old_id, new_id):
@@ -320,6 +334,11 @@ class EmpiricalDistribution(MultivariateDistribution):
                 value = assignment.remove_pair(old_id)
                 assignment.add_pair(new_id, value)
 
+        column = self._columns.pop(old_id, None)
+        self._columns.pop(new_id, None)
+        if column is not None:
+            self._columns[new_id] = column
+
         if self._discrete_cache is not None:
             self._discrete_cache.modify_variable_id(old_id, new_id)
 
@@ -349,10 +368,14 @@ class EmpiricalDistribution(MultivariateDistribution):
 
         return str(self.to_discrete())
 
+    # ===================================
+    # PRIVATE METHODS
+    # ===================================
+
     @dispatch()
     def _is_continuous(self):
         for variable in self.get_variables():
-            assignment = self._samples.get(0)
+            assignment = self._samples[0]
             if assignment.contains_var(variable) and assignment.contains_continuous_values():
                 if len(self.get_variables()) == 1:
                     return True
@@ -360,3 +383,75 @@ class EmpiricalDistribution(MultivariateDistribution):
                     return False
 
         return False
+
+    def _clear_caches(self):
+        """
+        Clears the columns and the distributions derived from the samples.
+        """
+        self._columns = dict()
+        self._weights = None
+        self._discrete_cache = None
+        self._continuous_cache = None
+
+    def _get_column(self, variable):
+        """
+        Returns the column of the variable, built upon the first call. The column
+        consists of an array with the code of the variable value in each sample, and of
+        the list of distinct values indexed by these codes (None when the variable is
+        absent from the sample).
+
+        :param variable: the variable label
+        :return: the pair (codes, values)
+        """
+        column = self._columns.get(variable, None)
+        if column is None:
+            if len(self._samples) == 0:
+                self.log.warning("distribution has no samples")
+                raise ValueError()
+
+            index = dict()
+            codes = np.fromiter((index.setdefault(sample.get_pairs().get(variable, None), len(index))
+                                 for sample in self._samples), dtype=np.int64, count=len(self._samples))
+            column = (codes, list(index.keys()))
+            self._columns[variable] = column
+
+        return column
+
+    def _get_weights(self):
+        """
+        Returns the weight column (the samples being equally weighted).
+
+        :return: the array of sample weights
+        """
+        if self._weights is None:
+            self._weights = np.ones(len(self._samples))
+        return self._weights
+
+    def _get_frequencies(self, columns):
+        """
+        Returns the distinct rows of codes in the given columns together with their
+        relative (weighted) frequency in the samples.
+
+        :param columns: the list of code columns
+        :return: the pair (list of distinct rows, list of frequencies)
+        """
+        weights = self._get_weights()
+        if len(columns) == 0:
+            return [()], [1.]
+
+        rows, inverse = np.unique(np.stack(columns, axis=1), axis=0, return_inverse=True)
+        probs = np.bincount(inverse.ravel(), weights=weights, minlength=len(rows)) / weights.sum()
+        return rows.tolist(), probs.tolist()
+
+    @staticmethod
+    def _get_value(values, code):
+        """
+        Returns the value for the code in the list of column values (the none value if
+        the variable is absent from the sample).
+
+        :param values: the column values
+        :param code: the code
+        :return: the corresponding value
+        """
+        value = values[code]
+        return ValueFactory.none() if value is None else value
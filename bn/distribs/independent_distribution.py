@@ -2,12 +2,12 @@ import abc
 import logging
 
 import numpy as np
-from multipledispatch import dispatch
 
 from bn.distribs.prob_distribution import ProbDistribution
 from bn.values.value import Value
 from bn.values.value_factory import ValueFactory
 from datastructs.assignment import Assignment
+from utils.dispatch_utils import dispatch
 
 
 class IndependentDistribution(ProbDistribution):
@@ -2,8 +2,6 @@ import logging
 import threading
 from copy import copy
 
-from multipledispatch import dispatch
-
 from bn.distribs.categorical_table import CategoricalTable
 from bn.distribs.distribution_builder import CategoricalTableBuilder as CategoricalTableBuilder
 from bn.distribs.multivariate_distribution import MultivariateDistribution
@@ -11,6 +9,7 @@ from bn.distribs.multivariate_table import MultivariateTable
 from bn.distribs.prob_distribution import ProbDistribution
 from bn.values.value import Value
 from datastructs.assignment import Assignment
+from utils.dispatch_utils import dispatch
 
 
 class MarginalDistribution(ProbDistribution):
@@ -75,6 +74,21 @@ class MarginalDistribution(ProbDistribution):
             'modify_variable_id': threading.RLock(),
         }
 
+    def __getstate__(self):
+        """
+        Returns the state to pickle, without the locks (which are recreated upon
+        unpickling).
+
+        :return: the state
+        """
+        state = dict(self.__dict__)
+        del state['_locks']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_lock()
+
     @dispatch()
     def get_variable(self):
         """
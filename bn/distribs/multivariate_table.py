@@ -2,12 +2,12 @@ import logging
 from copy import copy
 
 import numpy as np
-from multipledispatch import dispatch
 
 from bn.distribs.categorical_table import CategoricalTable
 from bn.distribs.multivariate_distribution import MultivariateDistribution
 from datastructs.assignment import Assignment
 from inference.approximate.intervals import Intervals
+from utils.dispatch_utils import dispatch
 from utils.inference_utils import InferenceUtils
 
 
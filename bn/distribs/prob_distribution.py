@@ -1,9 +1,8 @@
 import abc
 
-from multipledispatch import dispatch
-
 from bn.values.value import Value
 from datastructs.assignment import Assignment
+from utils.dispatch_utils import dispatch
 
 
 class ProbDistribution:
@@ -1,11 +1,11 @@
 import numpy as np
-from multipledispatch import dispatch
 
 from bn.distribs.categorical_table import CategoricalTable
 from bn.distribs.independent_distribution import IndependentDistribution
 from bn.values.value import Value
 from bn.values.value_factory import ValueFactory
 from datastructs.assignment import Assignment
+from utils.dispatch_utils import dispatch
 
 
 class SingleValueDistribution(IndependentDistribution):
@@ -1,9 +1,8 @@
 import logging
 
-from multipledispatch import dispatch
-
 from bn.distribs.utility_function import UtilityFunction
 from datastructs.assignment import Assignment
+from utils.dispatch_utils import dispatch
 from utils.inference_utils import InferenceUtils
 
 
@@ -1,4 +1,3 @@
-from multipledispatch import dispatch
 import random
 import logging
 
@@ -6,6 +5,7 @@ from bn.nodes.b_node import BNode
 from bn.values.value import Value
 from bn.values.value_factory import ValueFactory
 from datastructs.assignment import Assignment
+from utils.dispatch_utils import dispatch
 
 
 class ActionNode(BNode):
@@ -60,6 +60,7 @@ class ActionNode(BNode):
         """
 
         self._action_values.add(value)
+        self._notify_content_change()
 
     @dispatch(set)
     def add_values(self, values):
@@ -80,6 +81,7 @@ class ActionNode(BNode):
         :param value: the value to remove
         """
         self._action_values.remove(value)
+        self._notify_content_change()
 
     @dispatch(set)
     def remove_values(self, values):
@@ -89,6 +91,7 @@ class ActionNode(BNode):
         :param values: the values to remove
         """
         self._action_values.difference_update(values)
+        self._notify_content_change()
 
     @dispatch()
     def get_factor(self):
@@ -1,12 +1,15 @@
-from multipledispatch import dispatch
 import abc
 import functools
 import logging
-from collections import Collection
+import threading
+import weakref
+from collections import Collection, deque
+from copy import copy
 
 from regex.regex import Pattern
 
 from datastructs.value_range import ValueRange
+from utils.dispatch_utils import dispatch
 from utils.string_utils import StringUtils
 
 
@@ -29,6 +32,17 @@ class BNode(BNodeWrapper):
     # logger
     log = logging.getLogger('PyOpenDial')
 
+    # lock of the lists of nodes sharing a distribution (the nodes of a shared domain
+    # may be copied and modified from several threads)
+    _sharers_lock = threading.Lock()
+
+    # version of the graph structure, incremented at each change of identifier or
+    # relation of a node (used to invalidate the cached ancestors, descendants,
+    # orderings and cliques). The version is global, since the nodes may be shared
+    # between several networks (for instance, a dialogue state created from a network)
+    _graph_version = 0
+    _graph_lock = threading.Lock()
+
     # ===================================
     # NODE CONSTRUCTION
     # ===================================
@@ -46,6 +60,10 @@ class BNode(BNodeWrapper):
         self._output_nodes = dict()
         self._network = None
 
+        self._ancestors = None
+        self._descendants = None
+        self._distrib_sharers = None
+
     @dispatch(BNodeWrapper)
     def add_input_node(self, input_node):
         """
@@ -157,6 +175,7 @@ class BNode(BNodeWrapper):
         """
         old_node_id = self._node_id
         self._node_id = new_node_id
+        self._notify_structure_change()
 
         self.modify_variable_id(old_node_id, new_node_id)
 
@@ -179,6 +198,16 @@ class BNode(BNodeWrapper):
         """
         self._network = network
 
+    @dispatch()
+    def get_network(self):
+        """
+        Returns the Bayesian network associated with the node (that is, the last
+        network in which the node was added), or None if there is no such network.
+
+        :return: the Bayesian network owning the node
+        """
+        return self._network
+
     # ===================================
     # GETTERS
     # ===================================
@@ -289,20 +318,7 @@ class BNode(BNodeWrapper):
 
         :return: an ordered list of ancestors for the node
         """
-        ancestors = list()
-        nodes_to_process = list()
-        nodes_to_process.append(self)
-
-        while len(nodes_to_process) > 0:
-            cur_node = nodes_to_process.pop(0)
-            for ancestor_node in cur_node.get_input_nodes():
-                if ancestor_node not in ancestors:
-                    ancestors.append(ancestor_node)
-
-                if ancestor_node not in nodes_to_process:
-                    nodes_to_process.append(ancestor_node)
-
-        return ancestors
+        return list(self._get_ancestors()[0])
 
     @dispatch()
     def get_ancestor_ids(self):
@@ -312,8 +328,7 @@ class BNode(BNodeWrapper):
 
         :return: the ordered list of ancestor identifiers
         """
-        ancestors = self.get_ancestors()
-        return set([node.get_id() for node in ancestors])
+        return set(self._get_ancestors()[1])
 
     @dispatch(Collection)
     def get_ancestor_ids(self, variables_to_retain):
@@ -367,20 +382,7 @@ class BNode(BNodeWrapper):
 
         :return: an ordered list of descendants for the node
         """
-        descendants = list()
-        nodes_to_process = list()
-        nodes_to_process.append(self)
-
-        while len(nodes_to_process) > 0:
-            cur_node = nodes_to_process.pop(0)
-            for descendant_node in cur_node.get_output_nodes():
-                if descendant_node not in descendants:
-                    descendants.append(descendant_node)
-
-                if descendant_node not in nodes_to_process:
-                    nodes_to_process.append(descendant_node)
-
-        return descendants
+        return list(self._get_descendants()[0])
 
     @dispatch()
     def get_descendant_ids(self):
@@ -390,8 +392,7 @@ class BNode(BNodeWrapper):
 
         :return: the ordered list of descendant identifiers
         """
-        descendants = self.get_descendants()
-        return [node.get_id() for node in descendants]
+        return [node.get_id() for node in self._get_descendants()[0]]
 
     @dispatch(set)
     def has_descendant(self, variables):
@@ -402,19 +403,7 @@ class BNode(BNodeWrapper):
         :param variables: the node identifiers of potential descendants
         :return: true if a descendant is found, false otherwise
         """
-        nodes_to_process = list()
-        nodes_to_process.append(self)
-
-        # NB: we try to avoid recursion for efficiency reasons, and use a while loop instead
-        while len(nodes_to_process) > 0:
-            cur_node = nodes_to_process.pop(0)
-            for descendant_node in cur_node.get_output_nodes():
-                if descendant_node.get_id() in variables:
-                    return True
-                if descendant_node not in nodes_to_process:
-                    nodes_to_process.append(descendant_node)
-
-        return False
+        return not self._get_descendants()[1].isdisjoint(variables)
 
     @dispatch(set)
     def has_ancestor(self, variables):
@@ -425,18 +414,7 @@ class BNode(BNodeWrapper):
         :param variables: the node identifiers of potential descendants
         :return: true if a descendant is found, false otherwise
         """
-        nodes_to_process = list()
-        nodes_to_process.append(self)
-
-        while len(nodes_to_process) > 0:
-            cur_node = nodes_to_process.pop(0)
-            for ancestor_node in cur_node.get_input_nodes():
-                if ancestor_node.get_id() in variables:
-                    return True
-                if ancestor_node not in nodes_to_process:
-                    nodes_to_process.append(ancestor_node)
-
-        return False
+        return not self._get_ancestors()[1].isdisjoint(variables)
 
     @dispatch(Pattern)
     def has_descendant(self, pattern):
@@ -447,17 +425,9 @@ class BNode(BNodeWrapper):
         :param pattern: the regular expression pattern to look for
         :return: true if a descendant is found, false otherwise
         """
-        nodes_to_process = list()
-        nodes_to_process.append(self)
-
-        # NB: we try to avoid recursion for efficiency reasons, and use a while loop instead
-        while len(nodes_to_process) > 0:
-            cur_node = nodes_to_process.pop(0)
-            for descendant_node in cur_node.get_output_nodes():
-                if pattern.match(descendant_node.get_id()) is not None:
-                    return True
-                if descendant_node not in nodes_to_process:
-                    nodes_to_process.append(descendant_node)
+        for descendant_id in self._get_descendants()[1]:
+            if pattern.match(descendant_id) is not None:
+                return True
 
         return False
 
@@ -554,6 +524,21 @@ class BNode(BNodeWrapper):
         """
         raise NotImplementedError()
 
+    def __getstate__(self):
+        """
+        Returns the state of the node to pickle, without the cached ancestors and
+        descendants (which are only valid in the current process).
+
+        :return: the state of the node
+        """
+        state = dict(self.__dict__)
+        state['_ancestors'] = None
+        state['_descendants'] = None
+        if self._is_distrib_shared():
+            state['_distrib'] = copy(self._distrib)
+        state['_distrib_sharers'] = None
+        return state
+
     def __hash__(self):
         """
         Returns the hashcode, simply defined as the hashcode of the identifier.
@@ -602,12 +587,12 @@ class BNode(BNodeWrapper):
 
             return StringUtils.compare(self._node_id, other.get_id()) < 0
 
-        ancestors = self.get_ancestors()
-        if other in ancestors:
+        ancestors = self._get_ancestors()[1]
+        if other._node_id in ancestors:
             return True
 
-        other_ancestors = other.get_ancestors()
-        if self in other_ancestors:
+        other_ancestors = other._get_ancestors()[1]
+        if self._node_id in other_ancestors:
             return False
 
         size_diff = len(other_ancestors) - len(ancestors)
@@ -645,6 +630,53 @@ class BNode(BNodeWrapper):
             self._remove_output_node_internal(old_node_id)
             self._add_output_node_internal(output_node)
 
+    def _share_distrib(self, copied_node):
+        """
+        Lets the copy of the node share the distribution of the node. The nodes sharing
+        a distribution are (weakly) referenced in a common list, so that a node only
+        copies the distribution before modifying it if other nodes still share it.
+
+        :param copied_node: the copy of the node
+        """
+        with BNode._sharers_lock:
+            if self._distrib_sharers is None:
+                self._distrib_sharers = [weakref.ref(self)]
+            else:
+                self._distrib_sharers[:] = [ref for ref in self._distrib_sharers if ref() is not None]
+            self._distrib_sharers.append(weakref.ref(copied_node))
+            copied_node._distrib_sharers = self._distrib_sharers
+
+    def _is_distrib_shared(self):
+        """
+        Returns true if the distribution of the node is shared with other (living)
+        nodes, and removes the nodes that no longer share it from the list.
+
+        :return: true if the distribution is shared, false otherwise
+        """
+        with BNode._sharers_lock:
+            if self._distrib_sharers is None:
+                return False
+
+            sharers = []
+            for ref in self._distrib_sharers:
+                node = ref()
+                if node is not None and node._distrib is self._distrib:
+                    sharers.append(ref)
+            self._distrib_sharers[:] = sharers
+            return len(sharers) > 1
+
+    def _add_copied_input_node(self, input_node):
+        """
+        Adds a new relation from the input node to the current node, where both nodes
+        are copies (not yet included in any network) of nodes from an acyclic network.
+        Contrary to add_input_node, the relation is not checked for cycles and the
+        structure version is left unchanged, since the caches of the copies are empty.
+
+        :param input_node: the (copied) input node
+        """
+        self._input_nodes[input_node._node_id] = input_node
+        input_node._output_nodes[self._node_id] = self
+
     @dispatch(BNodeWrapper)
     def _add_input_node_internal(self, input_node):
         """
@@ -661,6 +693,7 @@ class BNode(BNodeWrapper):
             raise ValueError()
 
         self._input_nodes[input_node.get_id()] = input_node
+        self._notify_structure_change()
 
     @dispatch(BNodeWrapper)
     def _add_output_node_internal(self, output_node):
@@ -678,6 +711,7 @@ class BNode(BNodeWrapper):
             raise ValueError()
         else:
             self._output_nodes[output_node.get_id()] = output_node
+            self._notify_structure_change()
 
     @dispatch(str)
     def _remove_input_node_internal(self, input_node_id):
@@ -693,6 +727,7 @@ class BNode(BNodeWrapper):
             return False
 
         del self._input_nodes[input_node_id]
+        self._notify_structure_change()
         return True
 
     @dispatch(str)
@@ -711,6 +746,7 @@ class BNode(BNodeWrapper):
             raise ValueError()
 
         output_node = self._output_nodes.pop(output_node_id)
+        self._notify_structure_change()
         return output_node is not None
 
     @dispatch(BNodeWrapper)
@@ -721,7 +757,97 @@ class BNode(BNodeWrapper):
         :param input_node: the input node
         :return: true if such a cycle exists, false otherwise
         """
-        if input_node in self.get_descendants():
+        if input_node._node_id in self._get_descendants()[1]:
             return True
 
         return False
+
+    @staticmethod
+    def get_graph_version():
+        """
+        Returns the version of the graph structure, which changes at each change of
+        identifier or relation of a node, in any network.
+
+        :return: the graph version
+        """
+        return BNode._graph_version
+
+    @staticmethod
+    def notify_graph_change():
+        """
+        Increments the version of the graph structure, which invalidates the cached
+        ancestors, descendants, orderings and cliques of all nodes and networks.
+        """
+        with BNode._graph_lock:
+            BNode._graph_version += 1
+
+    def _notify_structure_change(self):
+        """
+        Notifies the change of identifier or of relation of the node to the network
+        owning the node (which increments the graph version as well), or only to the
+        graph version if the node is not included in a network.
+        """
+        if self._network is not None:
+            self._network.notify_structure_change()
+        else:
+            BNode.notify_graph_change()
+
+    def _notify_content_change(self):
+        """
+        Notifies the network owning the node (if any) of a change of distribution (or
+        of values) of the node.
+        """
+        if self._network is not None:
+            self._network.notify_content_change()
+
+    def _get_ancestors(self):
+        """
+        Returns the ordered list of ancestors of the node together with the set of
+        their identifiers. The result is cached until the next change in the graph
+        structure.
+
+        :return: the pair (ordered list of ancestors, set of ancestor identifiers)
+        """
+        version = BNode._graph_version
+        if self._ancestors is None or self._ancestors[0] != version:
+            ancestors = list()
+            ancestor_ids = set()
+            nodes_to_process = deque([self])
+
+            while len(nodes_to_process) > 0:
+                cur_node = nodes_to_process.popleft()
+                for ancestor_node in cur_node.get_input_nodes():
+                    if ancestor_node._node_id not in ancestor_ids:
+                        ancestors.append(ancestor_node)
+                        ancestor_ids.add(ancestor_node._node_id)
+                        nodes_to_process.append(ancestor_node)
+
+            self._ancestors = (version, ancestors, ancestor_ids)
+
+        return self._ancestors[1:]
+
+    def _get_descendants(self):
+        """
+        Returns the ordered list of descendants of the node together with the set of
+        their identifiers. The result is cached until the next change in the graph
+        structure.
+
+        :return: the pair (ordered list of descendants, set of descendant identifiers)
+        """
+        version = BNode._graph_version
+        if self._descendants is None or self._descendants[0] != version:
+            descendants = list()
+            descendant_ids = set()
+            nodes_to_process = deque([self])
+
+            while len(nodes_to_process) > 0:
+                cur_node = nodes_to_process.popleft()
+                for descendant_node in cur_node.get_output_nodes():
+                    if descendant_node._node_id not in descendant_ids:
+                        descendants.append(descendant_node)
+                        descendant_ids.add(descendant_node._node_id)
+                        nodes_to_process.append(descendant_node)
+
+            self._descendants = (version, descendants, descendant_ids)
+
+        return self._descendants[1:]
@@ -1,4 +1,3 @@
-from multipledispatch import dispatch
 from copy import copy
 import logging
 
@@ -11,6 +10,7 @@ from bn.nodes.b_node import BNode
 from bn.values.value import Value
 from datastructs.assignment import Assignment
 from settings import Settings
+from utils.dispatch_utils import dispatch
 
 
 class ChanceNode(BNode):
@@ -64,6 +64,8 @@ class ChanceNode(BNode):
         :param distrib: the distribution for the node
         """
         self._distrib = distrib
+        self._distrib_sharers = None
+        self._notify_content_change()
         if distrib.get_variable() != self._node_id:
             self.log.warning(self._node_id + "  != " + distrib.get_variable())
             raise ValueError()
@@ -88,7 +90,7 @@ class ChanceNode(BNode):
         """
         old_id = self._node_id
         super(ChanceNode, self).set_id(new_id)
-        self._distrib.modify_variable_id(old_id, new_id)
+        self._get_own_distrib().modify_variable_id(old_id, new_id)
 
     @dispatch(float)
     def prune_values(self, threshold):
@@ -97,8 +99,9 @@ class ChanceNode(BNode):
 
         :param threshold: the probability threshold
         """
-        if self._distrib.prune_values(threshold):
+        if self._get_own_distrib().prune_values(threshold):
             self._cached_values = None
+            self._notify_content_change()
 
     # ===================================
     # GETTERS
@@ -217,12 +220,28 @@ class ChanceNode(BNode):
     @dispatch()
     def get_distrib(self):
         """
-        Returns the probability distribution attached to the node.
+        Returns the probability distribution attached to the node. The distribution
+        may be shared with copies of the node, and must therefore not be modified
+        (see get_mutable_distrib).
 
         :return: the distribution
         """
         return self._distrib
 
+    @dispatch()
+    def get_mutable_distrib(self):
+        """
+        Returns the probability distribution attached to the node, for modification.
+        The distribution is copied beforehand if it is shared with copies of the node,
+        and the network owning the node is notified of the (upcoming) change.
+
+        :return: the distribution
+        """
+        distrib = self._get_own_distrib()
+        self._cached_values = None
+        self._notify_content_change()
+        return distrib
+
     @dispatch()
     def get_factor(self):
         """
@@ -248,11 +267,13 @@ class ChanceNode(BNode):
     def __copy__(self):
         """
         Returns a copy of the node. Note that only the node content is copied, not its
-        connection with other nodes.
+        connection with other nodes. The distribution is shared by the two nodes until
+        one of them accesses it for modification.
 
         :return: the copy
         """
-        chance_node = ChanceNode(self._node_id, copy(self._distrib))
+        chance_node = ChanceNode(self._node_id, self._distrib)
+        self._share_distrib(chance_node)
         if self._cached_values is not None:
             chance_node._cached_values = copy(self._cached_values)
         return chance_node
@@ -289,4 +310,16 @@ class ChanceNode(BNode):
         :param new_id: the new identifier for the node
         """
         super(ChanceNode, self).modify_variable_id(old_id, new_id)
-        self._distrib.modify_variable_id(old_id, new_id)
+        self._get_own_distrib().modify_variable_id(old_id, new_id)
+
+    def _get_own_distrib(self):
+        """
+        Returns the distribution of the node, after copying it if it is still shared
+        with other nodes (as a result of a copy of the node).
+
+        :return: the distribution
+        """
+        if self._is_distrib_shared():
+            self._distrib = copy(self._distrib)
+            self._distrib_sharers = None
+        return self._distrib
@@ -1,6 +1,6 @@
 from collections import Callable
 
-from multipledispatch import dispatch
+from utils.dispatch_utils import dispatch
 
 
 class CustomUtilityFunction:
@@ -1,4 +1,3 @@
-from multipledispatch import dispatch
 from copy import copy
 import logging
 
@@ -6,6 +5,7 @@ from bn.distribs.utility_function import UtilityFunction
 from bn.distribs.utility_table import UtilityTable
 from bn.nodes.b_node import BNode
 from datastructs.assignment import Assignment
+from utils.dispatch_utils import dispatch
 
 
 class UtilityNode(BNode):
@@ -53,7 +53,8 @@ class UtilityNode(BNode):
         :param value: the assigned utility
         """
         if isinstance(self._distrib, UtilityTable):
-            self._distrib.set_util(input, value)
+            self._get_own_distrib().set_util(input, value)
+            self._notify_content_change()
         else:
             self.log.warning("utility distribution is not a table, cannot add value")
             raise ValueError()
@@ -66,7 +67,8 @@ class UtilityNode(BNode):
         :param input: the input associated with the utility to be removed
         """
         if isinstance(self._distrib, UtilityTable):
-            self._distrib.remove_util(input)
+            self._get_own_distrib().remove_util(input)
+            self._notify_content_change()
         else:
             self.log.warning("utility distribution is not a table, cannot remove value")
             raise ValueError()
@@ -79,6 +81,8 @@ class UtilityNode(BNode):
         :param distrib: the distribution for the node
         """
         self._distrib = distrib
+        self._distrib_sharers = None
+        self._notify_content_change()
 
     @dispatch(str)
     def set_id(self, new_node_id):
@@ -88,7 +92,7 @@ class UtilityNode(BNode):
         :param new_node_id: the new identifier for the node
         """
         super(UtilityNode, self).set_id(new_node_id)
-        self._distrib.modify_variable_id(self._node_id, new_node_id)
+        self._get_own_distrib().modify_variable_id(self._node_id, new_node_id)
 
     # ===================================
     # GETTERS
@@ -117,12 +121,26 @@ class UtilityNode(BNode):
     @dispatch()
     def get_function(self):
         """
-        Returns the utility distribution.
+        Returns the utility distribution. The distribution may be shared with copies
+        of the node, and must therefore not be modified (see get_mutable_function).
 
         :return: the utility distribution
         """
         return self._distrib
 
+    @dispatch()
+    def get_mutable_function(self):
+        """
+        Returns the utility distribution, for modification. The distribution is copied
+        beforehand if it is shared with copies of the node, and the network owning the
+        node is notified of the (upcoming) change.
+
+        :return: the utility distribution
+        """
+        distrib = self._get_own_distrib()
+        self._notify_content_change()
+        return distrib
+
     @dispatch()
     def get_factor(self):
         """
@@ -146,11 +164,14 @@ class UtilityNode(BNode):
     def __copy__(self):
         """
         Returns a copy of the utility node. Note that only the node content is copied,
-        not its connection with other nodes.
+        not its connection with other nodes. The distribution is shared by the two
+        nodes until one of them accesses it for modification.
 
         :return: the copy
         """
-        return UtilityNode(self._node_id, copy(self._distrib))
+        utility_node = UtilityNode(self._node_id, self._distrib)
+        self._share_distrib(utility_node)
+        return utility_node
 
     def __str__(self):
         """
@@ -169,3 +190,15 @@ class UtilityNode(BNode):
         :return: the hashcode
         """
         return hash(self._node_id) - hash(self._distrib)
+
+    def _get_own_distrib(self):
+        """
+        Returns the distribution of the node, after copying it if it is still shared
+        with other nodes (as a result of a copy of the node).
+
+        :return: the distribution
+        """
+        if self._is_distrib_shared():
+            self._distrib = copy(self._distrib)
+            self._distrib_sharers = None
+        return self._distrib
@@ -1,5 +1,5 @@
-from multipledispatch import dispatch
 from bn.values.value import Value
+from utils.dispatch_utils import dispatch
 from utils.string_utils import StringUtils
 import numpy as np
 
@@ -1,6 +1,6 @@
 from bn.values.value import Value
+from utils.dispatch_utils import dispatch
 import logging
-from multipledispatch import dispatch
 
 
 class BooleanVal(Value):
@@ -37,6 +37,9 @@ class BooleanVal(Value):
         :param other: the value to compare
         :return: true if similar, false otherwise
         """
+        if self is other:
+            return True
+
         if not isinstance(other, BooleanVal):
             return False
 
@@ -73,11 +76,18 @@ class BooleanVal(Value):
 
     def __copy__(self):
         """
-        Copies the boolean value.
+        Returns its own instance, as boolean values are immutable.
+
+        :return: its own instance
+        """
+        return self
 
-        :return: the copy
+    def __reduce__(self):
+        """
+        Returns the interned boolean value upon unpickling.
         """
-        return BooleanVal(self._value)
+        from bn.values.value_factory import ValueFactory
+        return ValueFactory.intern, (self._value,)
 
     def __contains__(self, item):
         """
@@ -1,7 +1,7 @@
 from bn.values.value import Value
+from utils.dispatch_utils import dispatch
 from utils.string_utils import StringUtils
 import logging
-from multipledispatch import dispatch
 
 
 class DoubleVal(Value):
@@ -39,6 +39,9 @@ class DoubleVal(Value):
         :param other: the object to compare
         :return: true if similar, false otherwise
         """
+        if self is other:
+            return True
+
         if not isinstance(other, DoubleVal):
             return False
 
@@ -77,11 +80,18 @@ class DoubleVal(Value):
 
     def __copy__(self):
         """
-        Returns a copy of the double value.
+        Returns its own instance, as double values are immutable.
+
+        :return: its own instance
+        """
+        return self
 
-        :return: the copy
+    def __reduce__(self):
+        """
+        Returns the interned double value upon unpickling.
         """
-        return DoubleVal(self._value)
+        from bn.values.value_factory import ValueFactory
+        return ValueFactory.intern, (self._value,)
 
     def __contains__(self, item):
         """
@@ -1,5 +1,5 @@
 from bn.values.value import Value
-from multipledispatch import dispatch
+from utils.dispatch_utils import dispatch
 
 
 class NoneVal(Value):
@@ -57,6 +57,13 @@ class NoneVal(Value):
         """
         return self
 
+    def __reduce__(self):
+        """
+        Returns the none value of the ValueFactory upon unpickling.
+        """
+        from bn.values.value_factory import ValueFactory
+        return ValueFactory.none, ()
+
     def __contains__(self, item):
         """
         True if subvalue is contained in the current instance, and false otherwise.
@@ -2,9 +2,9 @@ from copy import copy
 
 from bn.values.value import Value
 from datastructs.graph import Graph
+from utils.dispatch_utils import dispatch
 
 import logging
-from multipledispatch import dispatch
 
 
 class RelationalVal(Graph, Value):
@@ -1,9 +1,9 @@
 from collections import Collection
 
 from bn.values.value import Value
+from utils.dispatch_utils import dispatch
 
 import logging
-from multipledispatch import dispatch
 
 
 class SetVal(Value):
@@ -1,7 +1,7 @@
 from bn.values.value import Value
+from utils.dispatch_utils import dispatch
 
 import logging
-from multipledispatch import dispatch
 
 
 class StringVal(Value):
@@ -20,6 +20,8 @@ class StringVal(Value):
             :param value: the string
             """
             self._value = value
+            self._key = value.lower()
+            self._hash = hash(self._key)
             self._template = None
         else:
             raise NotImplementedError()
@@ -30,7 +32,7 @@ class StringVal(Value):
 
         :return: the hashcode
         """
-        return hash(self._value.lower())
+        return self._hash
 
     def __eq__(self, other):
         """
@@ -39,10 +41,13 @@ class StringVal(Value):
         :param other: the object to compare
         :return: true if equals, false otherwise
         """
+        if self is other:
+            return True
+
         if not isinstance(other, StringVal):
             return False
 
-        return self._value.lower() == str(other).lower()
+        return self._hash == other._hash and self._key == other._key
 
     def __lt__(self, other):
         """
@@ -74,11 +79,18 @@ class StringVal(Value):
 
     def __copy__(self):
         """
-        Returns a copy of the string value.
+        Returns its own instance, as string values are immutable.
+
+        :return: its own instance
+        """
+        return self
 
-        :return: the copy
+    def __reduce__(self):
         """
-        return StringVal(self._value)
+        Returns the interned string value upon unpickling.
+        """
+        from bn.values.value_factory import ValueFactory
+        return ValueFactory.intern, (self._value,)
 
     def __contains__(self, item):
         """
@@ -12,9 +12,9 @@ from bn.values.string_val import StringVal
 from bn.values.custom_val import CustomVal
 from bn.values.value import Value
 from datastructs.graph import Graph
+from utils.dispatch_utils import dispatch
 from utils.py_utils import get_class, Singleton
 import logging
-from multipledispatch import dispatch
 from settings import Settings
 
 dispatch_namespace = dict()
@@ -30,6 +30,17 @@ class ValueFactory:
     _custom_class_pattern = re.compile(r'^@[^\(\)]*$')
     _custom_function_pattern = re.compile(r'^@[^\(\)]+\(.*\)$')
 
+    # interned string, double and boolean values
+    _string_values = dict()
+    _double_values = dict()
+    _boolean_values = {True: BooleanVal(True), False: BooleanVal(False)}
+
+    # values created from their string representation (only for interned values)
+    _created_values = dict()
+
+    # maximum number of values in each table (the table is cleared when full)
+    max_cache_size = 100000
+
     # logger
     log = logging.getLogger('PyOpenDial')
 
@@ -40,20 +51,43 @@ class ValueFactory:
         Creates a new value based on the provided string representation. If the string
         contains a numeric value, "true", "false", "None", or opening and closing
         brackets, convert it to the appropriate values. Else, returns a string value.
+        String, double, boolean and none values are interned, and memoized for the
+        string representation.
 
         :param value: the string representation for the value
         :return: the resulting value
         """
-        if value == None:
-            return NoneVal()
+        created_value = ValueFactory._created_values.get(value, None)
+        if created_value is not None:
+            return created_value
+
+        created_value = ValueFactory._create(value)
+
+        # custom classes and functions are never memoized
+        if not value.startswith('@') and isinstance(created_value, (StringVal, DoubleVal, BooleanVal, NoneVal)):
+            if len(ValueFactory._created_values) >= ValueFactory.max_cache_size:
+                ValueFactory._created_values.clear()
+            ValueFactory._created_values[value] = created_value
 
+        return created_value
+
+    @staticmethod
+    def _create(value):
+        """
+        Creates a new value based on the provided string representation.
+
+        :param value: the string representation for the value
+        :return: the resulting value
+        """
         if ValueFactory._double_pattern.search(value):
-            return DoubleVal(float(value))
-        elif value.lower() == 'true':
-            return BooleanVal(True)
-        elif value.lower() == 'false':
-            return BooleanVal(False)
-        elif value.lower() == 'none':
+            return ValueFactory.intern(float(value))
+
+        lower_value = value.lower()
+        if lower_value == 'true':
+            return ValueFactory._boolean_values[True]
+        elif lower_value == 'false':
+            return ValueFactory._boolean_values[False]
+        elif lower_value == 'none':
             return ValueFactory._none_value
         elif ValueFactory._array_pattern.match(value):
             value_list = list()
@@ -100,14 +134,14 @@ class ValueFactory:
                 elif isinstance(func_result, set):
                     return SetVal(func_result)
                 elif isinstance(func_result, str):
-                    return StringVal(func_result)
+                    return ValueFactory.intern(func_result)
                 else:
                     raise ValueError("Not supported return type %s" % type(func_result))
             else:
                 raise ValueError("Function %s is not defined." % function_name)
 
         else:
-            return StringVal(value)
+            return ValueFactory.intern(value)
 
     @staticmethod
     @dispatch(float, namespace=dispatch_namespace)
@@ -118,7 +152,7 @@ class ValueFactory:
         :param value: the float
         :return: the value
         """
-        return DoubleVal(value)
+        return ValueFactory.intern(value)
 
     @staticmethod
     @dispatch(bool, namespace=dispatch_namespace)
@@ -129,7 +163,37 @@ class ValueFactory:
         :param value: the boolean
         :return: the boolean value
         """
-        return BooleanVal(value)
+        return ValueFactory._boolean_values[value]
+
+    @staticmethod
+    def intern(value):
+        """
+        Returns the interned value for the string (without parsing its content), double
+        or boolean, such that equal values share a single instance.
+
+        :param value: the string, double or boolean
+        :return: the interned value
+        """
+        if isinstance(value, bool):
+            return ValueFactory._boolean_values[value]
+        elif isinstance(value, str):
+            values = ValueFactory._string_values
+        elif isinstance(value, float):
+            if value != value:
+                # NaN values are never equal to themselves, and are thus not interned
+                return DoubleVal(value)
+            values = ValueFactory._double_values
+        else:
+            raise ValueError()
+
+        interned_value = values.get(value, None)
+        if interned_value is None:
+            interned_value = StringVal(value) if isinstance(value, str) else DoubleVal(value)
+            if len(values) >= ValueFactory.max_cache_size:
+                values.clear()
+            values[value] = interned_value
+
+        return interned_value
 
     @staticmethod
     @dispatch((list, Collection), namespace=dispatch_namespace)
@@ -146,7 +210,6 @@ class ValueFactory:
             return ArrayVal(np.array(values))
 
     @staticmethod
-    @dispatch(namespace=dispatch_namespace)
     def none():
         """
         Returns the none value.
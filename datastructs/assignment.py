@@ -4,12 +4,12 @@ from copy import copy
 from xml.etree.ElementTree import Element
 
 import numpy as np
-from multipledispatch import dispatch
 
 from bn.values.array_val import ArrayVal
 from bn.values.double_val import DoubleVal
 from bn.values.value import Value
 from bn.values.value_factory import ValueFactory
+from utils.dispatch_utils import dispatch
 
 dispatch_namespace = dict()
 # TODO: not implemented with java map entries.
@@ -236,6 +236,25 @@ class Assignment(AssignmentWrapper):
         else:
             raise NotImplementedError()
 
+    def __getstate__(self):
+        """
+        Returns the state of the assignment to pickle, without the cached hashcode
+        (since the hashcode of the variable labels may change across processes).
+
+        :return: the state of the assignment
+        """
+        state = dict(getattr(self, '__dict__', dict()))
+        for cls in type(self).__mro__:
+            for slot in getattr(cls, '__slots__', []):
+                if hasattr(self, slot):
+                    state[slot] = getattr(self, slot)
+        state['_cached_hash'] = 0
+        return state
+
+    def __setstate__(self, state):
+        for key, value in state.items():
+            setattr(self, key, value)
+
     def __hash__(self):
         """
         Returns the hashcode associated with the assignment. The hashcode is
@@ -244,10 +263,7 @@ class Assignment(AssignmentWrapper):
         :return: the corresponding hashcode
         """
         if self._cached_hash == 0:
-            result = []
-            for key, value in self._map.items():
-                result.append((hash(key), hash(value)))
-            self._cached_hash = hash(frozenset(result))
+            self._cached_hash = hash(frozenset(self._map.items()))
 
         return self._cached_hash
 
@@ -622,7 +638,6 @@ class Assignment(AssignmentWrapper):
         """
         return len(self._map)
 
-    @dispatch(str)
     def contains_var(self, variable):
         """
         Returns true if the assignment contains the given variable, and false otherwise
@@ -684,12 +699,7 @@ class Assignment(AssignmentWrapper):
         :return:a new, trimmed assignment
         """
         assignment = Assignment()
-
-        for variable, value in self._map.items():
-            if variable in variables:
-                assignment.add_pair(variable, value)
-
-        assignment._cached_hash = 0
+        assignment._map = {variable: value for variable, value in self._map.items() if variable in variables}
         return assignment
 
     @dispatch(list)
@@ -702,12 +712,7 @@ class Assignment(AssignmentWrapper):
         :return:a new, trimmed assignment
         """
         assignment = Assignment()
-
-        for variable, value in self._map.items():
-            if variable in variables:
-                assignment.add_pair(variable, value)
-
-        assignment._cached_hash = 0
+        assignment._map = {variable: value for variable, value in self._map.items() if variable in variables}
         return assignment
 
     @dispatch(Collection)
@@ -720,12 +725,7 @@ class Assignment(AssignmentWrapper):
         :return: a new, pruned assignment
         """
         assignment = Assignment()
-
-        for variable, value in self._map.items():
-            if variable not in variables:
-                assignment.add_pair(variable, value)
-
-        assignment._cached_hash = 0
+        assignment._map = {variable: value for variable, value in self._map.items() if variable not in variables}
         return assignment
 
     def __copy__(self):
@@ -738,6 +738,15 @@ class Assignment(AssignmentWrapper):
         assignment._cached_hash = self._cached_hash
         return assignment
 
+    def freeze(self):
+        """
+        Returns a frozen (immutable) version of the assignment. The values are not
+        copied.
+
+        :return: the frozen assignment
+        """
+        return FrozenAssignment(self)
+
     @dispatch()
     def get_variables(self):
         """
@@ -756,7 +765,6 @@ class Assignment(AssignmentWrapper):
         """
         return set(self._map.items())
 
-    @dispatch(str)
     def get_value(self, variable):
         """
         Returns the value associated with the variable in the assignment, if one is
@@ -897,3 +905,155 @@ class Assignment(AssignmentWrapper):
             var.append(value)
             root.append(var)
         return root
+
+
+class FrozenAssignment(Assignment):
+    """
+    Immutable assignment of values to variables. Contrary to the (mutable) assignment,
+    the values are never copied, the hashcode is computed once upon construction,
+    and the merging, trimming and pruning operations directly create the resulting
+    frozen assignment. Frozen assignments are equal to (and have the same hashcode
+    as) mutable assignments with the same pairs, and can thus be used as keys of
+    tables and caches indexed by assignments.
+
+    The operations modifying the assignment in place are not supported. A mutable
+    copy of the assignment can be obtained with thaw() (or copy).
+    """
+
+    __slots__ = []
+
+    def __init__(self, arg1=None):
+        """
+        Creates a frozen assignment from an assignment, a dictionary of (var,value)
+        pairs, or a list of assignments to merge (the pairs of the last assignments
+        overriding the ones of the first).
+
+        :param arg1: the assignment, dictionary or list of assignments
+        """
+        if arg1 is None:
+            self._map = dict()
+        elif isinstance(arg1, Assignment):
+            self._map = dict(arg1._map)
+        elif isinstance(arg1, dict):
+            self._map = dict(arg1)
+        elif isinstance(arg1, list):
+            self._map = dict()
+            for assignment in arg1:
+                self._map.update(assignment._map)
+        else:
+            raise NotImplementedError("UNDEFINED PARAMETERS")
+
+        self._cached_hash = hash(frozenset(self._map.items()))
+
+    @staticmethod
+    def _create(pairs):
+        """
+        Creates a frozen assignment that directly uses the dictionary of pairs.
+
+        :param pairs: the (var,value) pairs, which must not be modified afterwards
+        :return: the frozen assignment
+        """
+        assignment = FrozenAssignment.__new__(FrozenAssignment)
+        assignment._map = pairs
+        assignment._cached_hash = hash(frozenset(pairs.items()))
+        return assignment
+
+    def __reduce__(self):
+        # the hashcode of the variable labels may change across processes
+        return FrozenAssignment, (self._map,)
+
+    def __copy__(self):
+        """
+        Returns a mutable copy of the assignment
+
+        :return: the copy
+        """
+        return self.thaw()
+
+    def freeze(self):
+        """
+        Returns the assignment itself.
+
+        :return: the assignment
+        """
+        return self
+
+    def thaw(self):
+        """
+        Returns a mutable copy of the assignment. The values are not copied.
+
+        :return: the mutable assignment
+        """
+        assignment = Assignment()
+        assignment._map = dict(self._map)
+        assignment._cached_hash = self._cached_hash
+        return assignment
+
+    def union(self, assignment):
+        """
+        Returns the frozen assignment merging the pairs of the current assignment with
+        the ones of the assignment given as argument (which override the current ones).
+
+        :param assignment: the assignment to merge
+        :return: the merged frozen assignment
+        """
+        if len(assignment._map) == 0:
+            return self
+        pairs = dict(self._map)
+        pairs.update(assignment._map)
+        return FrozenAssignment._create(pairs)
+
+    def get_trimmed(self, variables):
+        """
+        Returns a trimmed version of the assignment, where only the variables given as
+        parameters are considered
+
+        :param variables: the variables to consider
+        :return: a new, trimmed frozen assignment
+        """
+        return FrozenAssignment._create({variable: value for variable, value in self._map.items() if variable in variables})
+
+    def get_pruned(self, variables):
+        """
+        Returns a prunes version of the assignment, where the the variables given as
+        parameters are pruned out of the assignment
+
+        :param variables: the variables to remove
+        :return: a new, pruned frozen assignment
+        """
+        return FrozenAssignment._create({variable: value for variable, value in self._map.items() if variable not in variables})
+
+    def remove_primes(self):
+        """
+        Returns a new frozen assignment with the primes removed.
+
+        :return: a new frozen assignment, without the accessory specifiers
+        """
+        return FrozenAssignment(super(FrozenAssignment, self).remove_primes())
+
+    def add_primes(self):
+        """
+        Returns a new frozen assignment with primes added to the variables.
+
+        :return: a new frozen assignment, with the accessory specifiers
+        """
+        return FrozenAssignment._create({variable + "'": value for variable, value in self._map.items()})
+
+    def rename_var(self, old_variable_name, new_variable_name):
+        """
+        Returns a new frozen assignment where the variable name is replaced.
+
+        :param old_variable_name: old variable name
+        :param new_variable_name: new variable name
+        :return: the new frozen assignment with the renamed variable
+        """
+        if old_variable_name not in self._map:
+            return self
+        pairs = dict(self._map)
+        pairs[new_variable_name] = pairs.pop(old_variable_name)
+        return FrozenAssignment._create(pairs)
+
+    def _modify(self, *args):
+        raise ValueError("frozen assignments cannot be modified")
+
+    add_pair = add_pairs = add_assignment = remove_pair = remove_pairs = clear = trim = remove_all = filter_values = _modify
@@ -3,9 +3,9 @@ import logging
 from collections import OrderedDict
 
 import regex as re
-from multipledispatch import dispatch
 
 from bn.values.value import Value
+from utils.dispatch_utils import dispatch
 
 dispatch_namespace = dict()
 
@@ -1,15 +1,16 @@
+import ast
 import logging
 from copy import copy
 
+import numpy as np
 import regex as re
-from asteval import Interpreter
-from multipledispatch import dispatch
 
 from bn.values.array_val import ArrayVal
 from bn.values.double_val import DoubleVal
 from datastructs.assignment import Assignment
 from settings import Settings
 from templates.template import Template
+from utils.dispatch_utils import dispatch
 
 dispatch_namespace = dict()
 
@@ -18,11 +19,198 @@ def expr(expression, context=None):
     if context is None:
         context = dict()
 
-    interpreter = Interpreter()
-    for variable, value in context.items():
-        interpreter.symtable[variable] = value
+    try:
+        compiled_expression = CompiledExpression.create(expression)
+    except SyntaxError as e:
+        CompiledExpression.log.warning("cannot compile %s: %s" % (expression, e))
+        return None
 
-    return interpreter(expression)
+    return compiled_expression.evaluate(context)
+
+
+class CompiledExpression:
+    """
+    Mathematical expression compiled (once) into a Python function whose arguments
+    are the variables of the expression. The function is evaluated with the same
+    functions and constants as the asteval interpreter, and variables provided in
+    the context take precedence over these functions and constants.
+
+    Only the expressions made of safe constructs (constants, variables, operators,
+    comparisons, conditionals, subscripts and calls of named functions) are compiled.
+    The other ones (for instance, with attributes, dunder names, lambdas or
+    comprehensions) are evaluated by the asteval interpreter, which checks each
+    operation at runtime.
+    """
+
+    # logger
+    log = logging.getLogger('PyOpenDial')
+
+    # functions and constants available in the expressions
+    namespace = None
+
+    # maximum number of compiled expressions kept in the cache
+    max_cache_size = 10000
+
+    # compiled expressions, indexed by their string
+    compiled_expressions = dict()
+
+    # syntax nodes allowed in the compiled expressions
+    safe_nodes = tuple(getattr(ast, name) for name in [
+        'Expression', 'BoolOp', 'BinOp', 'UnaryOp', 'Compare', 'IfExp', 'Call', 'keyword', 'Name', 'Load',
+        'Num', 'Str', 'Bytes', 'NameConstant', 'Constant', 'Tuple', 'List', 'Subscript', 'Index', 'Slice',
+        'boolop', 'operator', 'unaryop', 'cmpop'] if hasattr(ast, name))
+
+    # marker of the variables that are neither in the context nor in the namespace
+    undefined = object()
+
+    def __init__(self, expression):
+        if isinstance(expression, str):
+            """
+            Compiles the expression
+
+            :param expression: the expression string
+            """
+            if CompiledExpression.namespace is None:
+                from asteval import Interpreter
+                namespace = dict(Interpreter().symtable)
+                namespace['__builtins__'] = dict()
+                CompiledExpression.namespace = namespace
+
+            expression = expression.strip()
+            tree = ast.parse(expression, mode='eval')
+            self._expression_str = expression
+            self._arguments = tuple(sorted(set([node.id for node in ast.walk(tree) if isinstance(node, ast.Name)])))
+            self._defaults = tuple([CompiledExpression.namespace.get(argument, CompiledExpression.undefined) for argument in self._arguments])
+            self._safe = CompiledExpression.is_safe(tree)
+            if self._safe:
+                function_str = 'lambda %s: (%s)' % (', '.join(self._arguments), expression)
+                self._function = eval(compile(function_str, '<expression>', 'eval'), CompiledExpression.namespace)
+            else:
+                self._function = self._interpret
+        else:
+            raise NotImplementedError()
+
+    @staticmethod
+    def create(expression):
+        """
+        Returns the compiled expression corresponding to the string, compiling it if
+        it was not already compiled.
+
+        :param expression: the expression string
+        :return: the compiled expression
+        """
+        compiled_expression = CompiledExpression.compiled_expressions.get(expression, None)
+        if compiled_expression is None:
+            compiled_expression = CompiledExpression(expression)
+            if len(CompiledExpression.compiled_expressions) >= CompiledExpression.max_cache_size:
+                CompiledExpression.compiled_expressions.clear()
+            CompiledExpression.compiled_expressions[expression] = compiled_expression
+        return compiled_expression
+
+    @staticmethod
+    def is_safe(tree):
+        """
+        Returns true if the syntax tree of the expression only contains safe
+        constructs, which can be compiled into a Python function: no attribute, no
+        dunder name, no lambda or comprehension, and calls of named functions only.
+
+        :param tree: the syntax tree of the expression
+        :return: true if the expression can be compiled, false otherwise
+        """
+        for node in ast.walk(tree):
+            if not isinstance(node, CompiledExpression.safe_nodes):
+                return False
+            if isinstance(node, ast.Name) and node.id.startswith('__'):
+                return False
+            if isinstance(node, ast.Call) and not isinstance(node.func, ast.Name):
+                return False
+        return True
+
+    def __reduce__(self):
+        return CompiledExpression.create, (self._expression_str,)
+
+    def get_arguments(self):
+        """
+        Returns the variables (and functions) referred to in the expression
+
+        :return: the names of the arguments
+        """
+        return self._arguments
+
+    def evaluate(self, context):
+        """
+        Evaluates the expression given the values in the context. As for the asteval
+        interpreter, errors are logged and the result is then None.
+
+        :param context: the dictionary of values for the variables
+        :return: the result, or None if the expression could not be evaluated
+        """
+        try:
+            return self._function(*self._get_arguments(context))
+        except Exception as e:
+            self.log.warning("cannot evaluate %s: %s" % (self._expression_str, e))
+            return None
+
+    def evaluate_batch(self, contexts):
+        """
+        Evaluates the expression for a list of contexts at once, by calling the
+        function on NumPy vectors of values. If the expression cannot be vectorized
+        (for instance, with conditionals or missing variables), the contexts are
+        evaluated one by one.
+
+        :param contexts: the list of dictionaries of values for the variables
+        :return: the NumPy array of results (NaN for the contexts that could not be evaluated)
+        """
+        nr_contexts = len(contexts)
+        columns = dict()
+        for argument in self._arguments:
+            if all(argument in context for context in contexts):
+                columns[argument] = np.array([context[argument] for context in contexts], dtype=np.float64)
+
+        try:
+            with np.errstate(all='ignore'):
+                results = np.asarray(self._function(*self._get_arguments(columns)), dtype=np.float64)
+            return np.array(np.broadcast_to(results, (nr_contexts,)))
+        except Exception:
+            pass
+
+        results = np.full(nr_contexts, np.nan)
+        for idx, context in enumerate(contexts):
+            try:
+                results[idx] = self._function(*self._get_arguments(context))
+            except Exception as e:
+                self.log.debug("cannot evaluate %s: %s" % (self._expression_str, e))
+        return results
+
+    def _interpret(self, *arguments):
+        """
+        Evaluates the expression with the asteval interpreter, for the expressions
+        that are not compiled.
+
+        :param arguments: the values of the arguments of the expression
+        :return: the result
+        """
+        from asteval import Interpreter
+        interpreter = Interpreter()
+        for argument, value in zip(self._arguments, arguments):
+            if value is not CompiledExpression.undefined:
+                interpreter.symtable[argument] = value
+        return interpreter(self._expression_str, show_errors=False)
+
+    def _get_arguments(self, context):
+        """
+        Returns the list of arguments of the function given the context.
+
+        :param context: the dictionary of values for the variables
+        :return: the list of arguments
+        """
+        arguments = []
+        for argument, default in zip(self._arguments, self._defaults):
+            value = context.get(argument, default)
+            if value is CompiledExpression.undefined and self._safe:
+                raise NameError("name '%s' is not defined" % argument)
+            arguments.append(value)
+        return arguments
 
 
 class MathExpressionWrapper:
@@ -71,6 +259,7 @@ class MathExpression(MathExpressionWrapper):
             local = re.sub(r'[\[\]\{\}]', '', local)
             local = re.sub(r'\.([a-zA-Z])', '_$1', local)
             self._expression_str = local
+            self._compiled = None
         elif isinstance(arg1, MathExpressionWrapper):
             existing = arg1
             """
@@ -82,6 +271,7 @@ class MathExpression(MathExpressionWrapper):
             self._expression_str = existing._expression_str
             self._variables = existing._variables
             self._functions = existing._functions
+            self._compiled = existing._compiled
 
         else:
             raise NotImplementedError()
@@ -127,7 +317,7 @@ class MathExpression(MathExpressionWrapper):
         if len(self._variables) > 0:
             raise ValueError()
 
-        return float(expr(self._expression_str))
+        return float(self.get_compiled().evaluate(dict()))
 
     @dispatch(Assignment)
     def evaluate(self, param):
@@ -138,6 +328,38 @@ class MathExpression(MathExpressionWrapper):
         :param param: the assignment
         :return: the result
         """
+        return self.get_compiled().evaluate(self._get_context(param))
+
+    @dispatch(list)
+    def evaluate_batch(self, params):
+        """
+        Evaluates the result of the expression for each assignment in the list, in
+        a single (vectorized) evaluation when possible.
+
+        :param params: the list of assignments
+        :return: the NumPy array of results (NaN for the assignments where the expression could not be evaluated)
+        """
+        return self.get_compiled().evaluate_batch([self._get_context(param) for param in params])
+
+    @dispatch()
+    def get_compiled(self):
+        """
+        Returns the compiled form of the expression (compiled at the first call).
+
+        :return: the compiled expression
+        """
+        if self._compiled is None:
+            self._compiled = CompiledExpression.create(self._expression_str)
+        return self._compiled
+
+    def _get_context(self, param):
+        """
+        Returns the double values of the assignment, together with the results of the
+        functions in the expression.
+
+        :param param: the assignment
+        :return: the dictionary of values for the variables of the expression
+        """
         param = param if len(self._functions) == 0 else copy(param)
 
         for functional_template in self._functions:
@@ -145,7 +367,7 @@ class MathExpression(MathExpressionWrapper):
             result = functional_template.get_value(param)
             param.add_pair(custom_function.__name__ + str(hash(functional_template)), result)
 
-        return expr(self._expression_str, self.get_doubles(param))
+        return self.get_doubles(param)
 
     @dispatch(str, list)
     def combine(self, operator, elements):
@@ -197,7 +419,7 @@ class MathExpression(MathExpressionWrapper):
             if not (isinstance(value, DoubleVal) or isinstance(value, ArrayVal)):
                 continue
 
-            variable = re.sub(r'\.', '_', variable)
+            variable = variable.replace('.', '_')
 
             if isinstance(value, DoubleVal):
                 doubles[variable] = value.get_double()
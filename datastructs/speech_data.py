@@ -4,9 +4,8 @@ import numpy as np
 
 from time import sleep
 
-from multipledispatch import dispatch
-
 from bn.values.value import Value
+from utils.dispatch_utils import dispatch
 
 
 class SpeechData(Value):
@@ -1,9 +1,10 @@
 from bn.values.value import Value
 from datastructs.assignment import Assignment
+from utils.dispatch_utils import dispatch
 from utils.inference_utils import InferenceUtils
 
+import itertools
 import logging
-from multipledispatch import dispatch
 from collections import Collection
 
 class ValueRangeWrapper:
@@ -124,6 +125,18 @@ class ValueRange(ValueRangeWrapper):
 
         return InferenceUtils.get_all_combinations(self._range)
 
+    @dispatch()
+    def iterate(self):
+        """
+        Iterates over the alternative assignments of values for the variables in the
+        range, one at a time, without building the full set of assignments.
+
+        :return: the generator of alternative assignments
+        """
+        variables = list(self._range.keys())
+        for values in itertools.product(*[self._range[variable] for variable in variables]):
+            yield Assignment(dict(zip(variables, values)))
+
     @dispatch()
     def get_nb_combinations(self):
         """
@@ -4,8 +4,6 @@ import threading
 from collections import Collection
 from xml.etree.ElementTree import Element, ElementTree
 
-from multipledispatch import dispatch
-
 from bn.b_network import BNetwork
 from bn.distribs.categorical_table import CategoricalTable
 from bn.distribs.independent_distribution import IndependentDistribution
@@ -24,6 +22,7 @@ from domains.rules.distribs.output_distribution import OutputDistribution
 from domains.rules.rule import Rule, RuleType
 from inference.approximate.sampling_algorithm import SamplingAlgorithm
 from inference.switching_algorithm import SwitchingAlgorithm
+from utils.dispatch_utils import dispatch
 
 
 class DialogueStateWrapper(BNetwork):
@@ -125,6 +124,21 @@ class DialogueState(DialogueStateWrapper):
             'get_new_action_variables': threading.RLock(),
         }
 
+    def __getstate__(self):
+        """
+        Returns the state to pickle, without the locks (which are recreated upon
+        unpickling).
+
+        :return: the state
+        """
+        state = super().__getstate__()
+        del state['_locks']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_lock()
+
     @dispatch(BNetwork)
     def reset(self, network):
         """
@@ -356,7 +370,7 @@ class DialogueState(DialogueStateWrapper):
         if self.has_chance_node(variable):
             chance_node = self.get_chance_node(variable)
 
-            if isinstance(chance_node.get_distrib(), IndependentDistribution) and chance_node.get_clique().isdisjoint(
+            if isinstance(chance_node.get_distrib(), IndependentDistribution) and self.get_clique(variable).isdisjoint(
                     self._evidence.get_variables()):
                 return chance_node.get_distrib()
             else:
@@ -541,7 +555,8 @@ class DialogueState(DialogueStateWrapper):
 
         :return: the copy
         """
-        dialogue_state = DialogueState(super().__copy__())
+        dialogue_state = DialogueState()
+        self._copy_nodes(dialogue_state)
         dialogue_state.add_evidence(copy.copy(self._evidence))
         dialogue_state._parameter_vars = set(self._parameter_vars)
         dialogue_state._incremental_vars = set(self._incremental_vars)
@@ -617,7 +632,7 @@ class DialogueState(DialogueStateWrapper):
                 self._connect_to_predictions(output_node)
             else:
                 output_node = self.get_chance_node(updated_var)
-                output_distrib = output_node.get_distrib()
+                output_distrib = output_node.get_mutable_distrib()
 
             output_node.add_input_node(rule_node)
             output_distrib.add_anchored_rule(rule)
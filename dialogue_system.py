@@ -1,10 +1,9 @@
+import asyncio
 import logging
 import threading
 from collections import Collection
 from copy import copy
 
-from multipledispatch import dispatch
-
 from bn.b_network import BNetwork
 from bn.distribs.distribution_builder import CategoricalTableBuilder
 from bn.distribs.independent_distribution import IndependentDistribution
@@ -16,15 +15,13 @@ from datastructs.speech_data import SpeechData
 from dialogue_state import DialogueState
 from domains.domain import Domain
 from gui.gui_frame import GUIFrame
-from modules.audio_module import AudioModule
-from modules.dialogue_importer import DialogueImporter
+from inference.approximate.likelihood_weighting import LikelihoodWeighting
 from modules.dialogue_recorder import DialogueRecorder
-from modules.forward_planner import ForwardPlanner
-from modules.mcts_planner import MCTSPlanner
 from modules.module import Module
-from readers.xml_dialogue_reader import XMLDialogueReader
 from readers.xml_domain_reader import XMLDomainReader
 from settings import Settings
+from utils.dispatch_utils import dispatch
+from utils.instrumentation import Instrumentation
 from utils.py_utils import get_class_name_from_type, get_class_name
 
 
@@ -62,9 +59,11 @@ class DialogueSystem:
             self._modules.append(DialogueRecorder(self))
             if self._settings.planner == 'forward':
                 self.log.info("Forward planner will be used.")
+                from modules.forward_planner import ForwardPlanner
                 self._modules.append(ForwardPlanner(self))
             elif self._settings.planner == 'mcts':
                 self.log.info("MCTS planner will be used.")
+                from modules.mcts_planner import MCTSPlanner
                 self._modules.append(MCTSPlanner(self))
             else:
                 raise ValueError("Not supported planner: %s" % self._settings.planner)
@@ -97,6 +96,8 @@ class DialogueSystem:
             'pause_update': threading.RLock(),
             'update': threading.RLock()
         }
+        # asyncio lock serializing the asynchronous updates, with its event loop
+        self._async_lock = None
 
     @dispatch()
     def start_system(self):
@@ -199,6 +200,10 @@ class DialogueSystem:
         for module in self._modules:
             module.pause(to_pause)
 
+        if to_pause:
+            # the sampling processes are not kept idle while the system is paused
+            LikelihoodWeighting.shutdown_pool()
+
         if not to_pause and not self._cur_state.get_new_variables().is_empty():
             with self._locks['pause_update']:
                 self.update()
@@ -231,6 +236,7 @@ class DialogueSystem:
 
     @dispatch(bool)
     def enable_speech(self, to_enable):
+        from modules.audio_module import AudioModule
         if to_enable:
             if self.get_module(AudioModule) is None:
                 self._settings.select_audio_mixers()
@@ -248,6 +254,8 @@ class DialogueSystem:
 
     @dispatch(str)
     def import_dialogues(self, dialogue_file):
+        from modules.dialogue_importer import DialogueImporter
+        from readers.xml_dialogue_reader import XMLDialogueReader
         turns = XMLDialogueReader.extract_dialogue(dialogue_file)
         importer = DialogueImporter(self, turns)
         importer.start()
@@ -396,35 +404,68 @@ class DialogueSystem:
         """
 
         with self._locks['update']:
-            updated_vars = dict()
+            if not Instrumentation.enabled:
+                return self._update()
+
+            Instrumentation.start_turn()
+            updated_vars = set()
+            try:
+                updated_vars = self._update()
+                return updated_vars
+            finally:
+                Instrumentation.end_turn(updated_vars)
 
-            while len(self._cur_state.get_new_variables()) > 0:
-                to_process = self._cur_state.get_new_variables()
+    def _update(self):
+        """
+        Performs the update loop (see update()).
 
+        :return: the set of variables that have been updated during the process.
+        """
+        updated_vars = dict()
+
+        while len(self._cur_state.get_new_variables()) > 0:
+            to_process = self._cur_state.get_new_variables()
+            if Instrumentation.enabled:
+                Instrumentation.start_cycle(to_process)
+
+            with Instrumentation.measure('reduce', 'DialogueState.reduce'):
                 self._cur_state.reduce()
 
-                for model in self._domain.get_models():
-                    if not model.planning_only and model.is_triggered(self._cur_state, to_process):
-                        change = model.trigger(self._cur_state)
-                        if change and model.is_blocking():
-                            break
+            for model in self._domain.get_triggered_models(to_process):
+                if not model.planning_only:
+                    with Instrumentation.measure('model', model.get_id()):
+                        change = self.trigger_model(model, self._cur_state)
+                    if change and model.is_blocking():
+                        break
 
-                for i in range(len(self._modules)):
+            for i in range(len(self._modules)):
+                with Instrumentation.measure('module', type(self._modules[i]).__name__):
                     self._modules[i].trigger(self._cur_state, to_process)
 
-                for v in to_process:
-                    if v not in updated_vars or updated_vars[v] is None:
-                        count = 1
-                    else:
-                        count = updated_vars[v] + 1
-                    updated_vars[v] = count
+            for v in to_process:
+                if v not in updated_vars or updated_vars[v] is None:
+                    count = 1
+                else:
+                    count = updated_vars[v] + 1
+                updated_vars[v] = count
 
-                    if count > 100:  # TODO: count > 10 ?
-                        self.display_comment("Warning: Recursive update of variable %s" % v)
-                        return set(updated_vars.keys())
+                if count > 100:  # TODO: count > 10 ?
+                    self.display_comment("Warning: Recursive update of variable %s" % v)
+                    return set(updated_vars.keys())
 
         return set(updated_vars.keys())
 
+    def trigger_model(self, model, state):
+        """
+        Triggers a model of the domain on the dialogue state (the current state, or a
+        state simulated by the planner), which applies the rules of the model.
+
+        :param model: the model of the domain
+        :param state: the dialogue state
+        :return: true if the state has been changed, false otherwise
+        """
+        return model.trigger(state)
+
     @dispatch()
     def refresh_domain(self):
         """
@@ -445,6 +486,87 @@ class DialogueSystem:
             self._domain = Domain()
             self._domain.set_source_file(src_file)
 
+    # ===============================
+    # ASYNCHRONOUS STATE UPDATE
+    # ===============================
+
+    async def add_user_input_async(self, user_input, timeout=None):
+        """
+        Asynchronous version of add_user_input, which can be awaited from an event
+        loop without blocking it (see _run_async).
+
+        :param user_input: the user input (string, N-best list or speech data)
+        :param timeout: the maximum duration (in seconds) to wait for the update, or
+                        None to wait without limit
+        :return: the variables that were updated in the process
+        """
+        return await self._run_async(self.add_user_input, user_input, timeout=timeout)
+
+    async def add_content_async(self, *content, timeout=None):
+        """
+        Asynchronous version of add_content, which can be awaited from an event loop
+        without blocking it (see _run_async).
+
+        :param content: the content to add (as for add_content)
+        :param timeout: the maximum duration (in seconds) to wait for the update, or
+                        None to wait without limit
+        :return: the set of variables that have been updated
+        """
+        return await self._run_async(self.add_content, *content, timeout=timeout)
+
+    async def update_async(self, timeout=None):
+        """
+        Asynchronous version of update, which can be awaited from an event loop
+        without blocking it (see _run_async).
+
+        :param timeout: the maximum duration (in seconds) to wait for the update, or
+                        None to wait without limit
+        :return: the set of variables that have been updated
+        """
+        return await self._run_async(self.update, timeout=timeout)
+
+    async def _run_async(self, method, *args, timeout=None):
+        """
+        Runs the (synchronous) method in the default executor of the event loop. The
+        asynchronous calls on the system are serialized: the method is only run once
+        the previous calls are completed.
+
+        If the call is cancelled (or times out) before the method is started, the
+        method is never run. Once started, the method cannot be interrupted: it runs
+        until its completion (and the next calls wait for it), but its result is
+        discarded.
+
+        :param method: the method to run
+        :param args: the arguments of the method
+        :param timeout: the maximum duration (in seconds) of the call, or None
+        :return: the result of the method
+        """
+        return await asyncio.wait_for(self._run_serialized(method, *args), timeout)
+
+    async def _run_serialized(self, method, *args):
+        """
+        Runs the method in the default executor of the event loop, after the previous
+        asynchronous calls on the system.
+
+        :param method: the method to run
+        :param args: the arguments of the method
+        :return: the result of the method
+        """
+        loop = asyncio.get_event_loop()
+        if self._async_lock is None or self._async_lock[0] is not loop:
+            self._async_lock = (loop, asyncio.Lock(loop=loop))
+        lock = self._async_lock[1]
+
+        await lock.acquire()
+        try:
+            future = loop.run_in_executor(None, method, *args)
+        except BaseException:
+            lock.release()
+            raise
+        # the lock is released once the method is completed, even if the call is cancelled
+        future.add_done_callback(lambda _: lock.release())
+        return await asyncio.shield(future)
+
     # ===============================
     # GETTERS
     # ===============================
@@ -1,11 +1,12 @@
 from bn.b_network import BNetwork
 from dialogue_state import DialogueState
 from domains.model import Model
+from domains.trigger_index import TriggerIndex
 from settings import Settings
+from utils.dispatch_utils import dispatch
 from pathlib import Path
 
 import logging
-from multipledispatch import dispatch
 
 
 class Domain:
@@ -28,6 +29,8 @@ class Domain:
         self._parameters = BNetwork()
         self._imported_files = []
         self._xml_file = None  # path to the source XML file (and its imports)
+        self._trigger_index = None
+        self._functions = dict()  # custom functions declared in the domain
 
     @dispatch(Path)
     def set_source_file(self, xml_file):
@@ -112,6 +115,26 @@ class Domain:
         """
         return self._models
 
+    @dispatch()
+    def build_trigger_index(self):
+        """
+        (Re)builds the index of the model triggers.
+        """
+        self._trigger_index = TriggerIndex(self._models)
+
+    def get_triggered_models(self, updated_vars):
+        """
+        Returns the models (in their order in the domain) that are triggered by the
+        updated variables. The index of the model triggers is rebuilt if the models
+        have changed since its construction.
+
+        :param updated_vars: the updated variables
+        :return: the list of triggered models
+        """
+        if self._trigger_index is None or not self._trigger_index.is_valid_for(self._models):
+            self.build_trigger_index()
+        return self._trigger_index.get_triggered_models(updated_vars)
+
     @dispatch(Settings)
     def set_settings(self, settings):
         """
@@ -130,6 +153,24 @@ class Domain:
         """
         return self._settings
 
+    def add_function(self, name, func):
+        """
+        Adds a custom function to the domain, and registers it in the settings.
+
+        :param name: the name of the function
+        :param func: the function
+        """
+        self._functions[name] = func
+        Settings.add_function(name, func)
+
+    def get_functions(self):
+        """
+        Returns the custom functions declared in the domain.
+
+        :return: the mapping between function names and functions
+        """
+        return self._functions
+
     def __str__(self):
         """
         Returns the domain name.
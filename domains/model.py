@@ -1,11 +1,10 @@
 import logging
 from collections import Collection
 
-from multipledispatch import dispatch
-
 from dialogue_state import DialogueState
 from domains.rules.rule import Rule
 from templates.template import Template
+from utils.dispatch_utils import dispatch
 
 
 class Model:
@@ -20,6 +19,9 @@ class Model:
 
     id_counter = 0
 
+    # version of the triggers and rules of all models, incremented at each change
+    version = 0
+
     # ===================================
     # MODEL CONSTRUCTION
     # ===================================
@@ -60,6 +62,7 @@ class Model:
         :param trigger: the variable
         """
         self._triggers.append(Template.create(trigger))
+        Model.version += 1
 
     @dispatch(list)
     def add_triggers(self, triggers):
@@ -79,6 +82,7 @@ class Model:
         :param rule: the rule to add
         """
         self._rules.append(rule)
+        Model.version += 1
 
     @dispatch(bool)
     def set_blocking(self, blocking):
@@ -124,8 +128,8 @@ class Model:
             try:
                 state.apply_rule(rule)
             except Exception as e:
-                self.log.warning("rule " + rule.get_rule_id() + " could not be applied ")
-                raise ValueError()
+                self.log.warning("rule " + rule.get_rule_id() + " could not be applied: " + str(e))
+                raise ValueError("rule %s could not be applied: %s" % (rule.get_rule_id(), e)) from e
 
         return len(state.get_new_variables()) > 0 or len(state.get_new_action_variables()) > 0
 
@@ -9,9 +9,9 @@ from datastructs.assignment import Assignment
 from domains.rules.conditions.condition import Condition
 from domains.rules.rule_grounding import RuleGrounding
 from templates.template import Template
+from utils.dispatch_utils import dispatch
 
 import logging
-from multipledispatch import dispatch
 
 
 class Relation(Enum):
@@ -3,9 +3,9 @@ from enum import Enum, auto
 from datastructs.assignment import Assignment
 from domains.rules.rule_grounding import RuleGrounding
 from domains.rules.conditions.condition import Condition
+from utils.dispatch_utils import dispatch
 
 import logging
-from multipledispatch import dispatch
 
 
 class BinaryOperator(Enum):
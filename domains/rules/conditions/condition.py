@@ -1,7 +1,7 @@
 import abc
-from multipledispatch import dispatch
 
 from datastructs.assignment import Assignment
+from utils.dispatch_utils import dispatch
 
 
 class Condition(object):
@@ -4,9 +4,9 @@ from datastructs.assignment import Assignment
 from domains.rules import rule_grounding
 from domains.rules.conditions.condition import Condition
 from domains.rules.rule_grounding import RuleGrounding
+from utils.dispatch_utils import dispatch
 
 import logging
-from multipledispatch import dispatch
 
 
 class NegatedCondition(Condition):
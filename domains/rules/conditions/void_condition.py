@@ -3,9 +3,9 @@ import abc
 from datastructs.assignment import Assignment
 from domains.rules.conditions.condition import Condition
 from domains.rules.rule_grounding import RuleGrounding
+from utils.dispatch_utils import dispatch
 
 import logging
-from multipledispatch import dispatch
 
 
 class VoidCondition(Condition):
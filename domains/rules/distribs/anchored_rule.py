@@ -1,15 +1,20 @@
 import logging
 
-from multipledispatch import dispatch
-
 from bn.distribs.distribution_builder import CategoricalTableBuilder as CategoricalTableBuilder
 from bn.distribs.marginal_distribution import MarginalDistribution
 from bn.distribs.prob_distribution import ProbDistribution
 from bn.distribs.utility_function import UtilityFunction
 from bn.values.value import Value
-from datastructs.assignment import Assignment
+from datastructs.assignment import Assignment, FrozenAssignment
 from datastructs.value_range import ValueRange
+from domains.rules.conditions.basic_condition import BasicCondition
+from domains.rules.conditions.complex_condition import ComplexCondition
+from domains.rules.conditions.negated_condition import NegatedCondition
+from domains.rules.conditions.void_condition import VoidCondition
+from domains.rules.effects.template_effect import TemplateEffect
 from domains.rules.rule import Rule, RuleType
+from settings import Settings
+from utils.dispatch_utils import dispatch
 
 
 class AnchoredRule(ProbDistribution, UtilityFunction):
@@ -58,7 +63,13 @@ class AnchoredRule(ProbDistribution, UtilityFunction):
                     # else:
                     #     raise ValueError('No such variable: %s' % t2)
 
-            conditions = self._inputs.linearize()
+            relevant_inputs = self._get_relevant_inputs()
+            nb_combinations = relevant_inputs.get_nb_combinations()
+            if nb_combinations > Settings.max_combinations:
+                raise ValueError("cannot anchor rule %s: %d input combinations (maximum is %d)"
+                                 % (self._id, nb_combinations, Settings.max_combinations))
+
+            conditions = relevant_inputs.iterate()
 
             if rule.get_rule_type() == RuleType.PROB:
                 self._cache = dict()
@@ -299,8 +310,83 @@ class AnchoredRule(ProbDistribution, UtilityFunction):
         elif param.size() > len(self._variables):
             param = param.get_trimmed(self._variables)
 
-        assign = Assignment([param, self._filled_slots])
-        if assign not in self._cache:
-            self._cache[assign] = self._rule.get_output(assign)
-
-        return self._cache[assign]
+        assign = FrozenAssignment([param, self._filled_slots])
+        output = self._cache.get(assign, None)
+        if output is None:
+            output = self._rule.get_output(assign)
+            self._cache[assign] = output
+
+        return output
+
+    def _get_relevant_inputs(self):
+        """
+        Returns the range of input values to enumerate in order to anchor the rule.
+        The values of an input variable that is only tested by basic conditions
+        without slots (and is not used as a slot in the rule) only matter through
+        the conditions they satisfy. Only one value is thus kept for each distinct
+        combination of satisfied conditions.
+
+        :return: the reduced range of input values
+        """
+        conditions = []
+        slots = set()
+        for condition in self._rule.get_conditions():
+            if not AnchoredRule._add_basic_conditions(condition, conditions):
+                return self._inputs
+            slots.update(condition.get_slots())
+
+        for effect in self._rule.get_effects():
+            for sub_effect in effect.get_sub_effects():
+                if isinstance(sub_effect, TemplateEffect):
+                    slots.update(sub_effect.get_all_slots())
+        parameter_variables = set()
+        for parameter in self._rule.get_parameters():
+            parameter_variables.update(parameter.get_variables())
+
+        conditions_index = dict()
+        for condition in conditions:
+            condition = BasicCondition(condition, self._filled_slots)
+            if condition.get_variable().is_under_specified():
+                return self._inputs
+            conditions_index.setdefault(str(condition.get_variable()), []).append(condition)
+
+        relevant_inputs = ValueRange()
+        for variable in self._inputs.get_variables():
+            values = self._inputs.get_values(variable)
+            variable_conditions = conditions_index.get(variable, [])
+            if variable in slots or variable in parameter_variables \
+                    or any(condition.get_slots() for condition in variable_conditions):
+                relevant_inputs.add_values(variable, values)
+                continue
+
+            signatures = dict()
+            for value in values:
+                try:
+                    signature = tuple([condition.is_satisfied(value) for condition in variable_conditions])
+                except Exception:
+                    signature = value
+                signatures.setdefault(signature, value)
+            relevant_inputs.add_values(variable, set(signatures.values()))
+
+        return relevant_inputs
+
+    @staticmethod
+    def _add_basic_conditions(condition, basic_conditions):
+        """
+        Adds the basic conditions included in the condition to the list.
+
+        :param condition: the (basic or composite) condition
+        :param basic_conditions: the list of basic conditions
+        :return: false if the condition contains an unknown type of condition, true otherwise
+        """
+        if isinstance(condition, BasicCondition):
+            basic_conditions.append(condition)
+        elif isinstance(condition, ComplexCondition):
+            for sub_condition in condition.get_conditions():
+                if not AnchoredRule._add_basic_conditions(sub_condition, basic_conditions):
+                    return False
+        elif isinstance(condition, NegatedCondition):
+            return AnchoredRule._add_basic_conditions(condition.get_init_condition(), basic_conditions)
+        elif not isinstance(condition, VoidCondition):
+            return False
+        return True
@@ -9,9 +9,9 @@ from bn.values.value import Value
 from bn.values.value_factory import ValueFactory
 from datastructs.assignment import Assignment
 from templates.template import Template
+from utils.dispatch_utils import dispatch
 
 import logging
-from multipledispatch import dispatch
 
 
 class EquivalenceDistribution(ProbDistribution):
@@ -6,10 +6,10 @@ from bn.values.value_factory import ValueFactory
 from datastructs.assignment import Assignment
 from domains.rules.distribs.anchored_rule import AnchoredRule
 from domains.rules.effects.effect import Effect
+from utils.dispatch_utils import dispatch
 from utils.inference_utils import InferenceUtils
 
 import logging
-from multipledispatch import dispatch
 
 
 class OutputDistribution(ProbDistribution):
@@ -2,9 +2,9 @@ from bn.values.value import Value
 from bn.values.value_factory import ValueFactory
 from datastructs.assignment import Assignment
 from domains.rules.conditions.basic_condition import BasicCondition, Relation
+from utils.dispatch_utils import dispatch
 
 import logging
-from multipledispatch import dispatch
 
 
 class BasicEffect:
@@ -10,9 +10,9 @@ from domains.rules.conditions.void_condition import VoidCondition
 from domains.rules.effects.basic_effect import BasicEffect
 from domains.rules.effects.template_effect import TemplateEffect
 from templates.template import Template
+from utils.dispatch_utils import dispatch
 
 import logging
-from multipledispatch import dispatch
 
 dispatch_namespace = dict()
 
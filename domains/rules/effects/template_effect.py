@@ -3,9 +3,9 @@ from datastructs.assignment import Assignment
 from domains.rules.effects.basic_effect import BasicEffect
 from domains.rules.conditions.basic_condition import BasicCondition, Relation
 from templates.template import Template
+from utils.dispatch_utils import dispatch
 
 import logging
-from multipledispatch import dispatch
 
 
 class TemplateEffect(BasicEffect):
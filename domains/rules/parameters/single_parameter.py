@@ -3,9 +3,9 @@ from bn.values.double_val import DoubleVal
 from datastructs.assignment import Assignment
 from datastructs.math_expression import MathExpression
 from domains.rules.parameters.parameter import Parameter
+from utils.dispatch_utils import dispatch
 
 import logging
-from multipledispatch import dispatch
 
 
 class SingleParameter(Parameter):
@@ -11,9 +11,9 @@ from domains.rules.parameters.fixed_parameter import FixedParameter
 from domains.rules.parameters.parameter import Parameter
 from domains.rules.rule_grounding import RuleGrounding
 from templates.template import Template
+from utils.dispatch_utils import dispatch
 
 import logging
-from multipledispatch import dispatch
 
 dispatch_namespace = dict()
 
@@ -451,6 +451,27 @@ class Rule:
                 params.update(c.output.get_parameter(e).get_variables())
         return params
 
+    @dispatch()
+    def get_conditions(self):
+        """
+        Returns the conditions of the rule cases, in their order.
+
+        :return: the list of conditions
+        """
+        return [c._condition for c in self._cases]
+
+    @dispatch()
+    def get_parameters(self):
+        """
+        Returns the parameters of the outputs in all rule cases.
+
+        :return: the list of parameters
+        """
+        params = []
+        for c in self._cases:
+            params.extend(c._output.get_parameters())
+        return params
+
     @dispatch()
     def get_effects(self):
         """
@@ -2,9 +2,9 @@ from collections import Collection
 
 from bn.values.value import Value
 from datastructs.assignment import Assignment
+from utils.dispatch_utils import dispatch
 
 import logging
-from multipledispatch import dispatch
 
 
 class RuleGroundingWrapper:
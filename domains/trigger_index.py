@@ -0,0 +1,88 @@
+import logging
+
+from domains.model import Model
+from templates.string_template import StringTemplate
+
+
+class TriggerIndex:
+    """
+    Index of the model triggers of a dialogue domain, mapping the labels of updated
+    variables to the models they trigger. Fully specified triggers are looked up by
+    their (lowercased) label, while the other triggers are matched once per distinct
+    variable label, and the result is memoized.
+    """
+
+    # logger
+    log = logging.getLogger('PyOpenDial')
+
+    # maximum number of variable labels for which the matched models are memoized
+    max_cache_size = 10000
+
+    def __init__(self, models):
+        """
+        Creates the index for the list of models. Models without rules are never
+        triggered, and are thus not indexed.
+
+        :param models: the models of the domain
+        """
+        self._models = list(models)
+        self._version = Model.version
+        self._exact_triggers = dict()
+        self._template_triggers = []
+        self._cache = dict()
+
+        for idx, model in enumerate(self._models):
+            if len(model.get_rules()) == 0:
+                continue
+            for trigger in model.get_triggers():
+                if isinstance(trigger, StringTemplate):
+                    self._exact_triggers.setdefault(str(trigger).lower(), set()).add(idx)
+                else:
+                    self._template_triggers.append((trigger, idx))
+
+    def is_valid_for(self, models):
+        """
+        Returns true if the index is still valid for the given list of models (that
+        is, if the models, their triggers and rules have not changed since the
+        construction of the index), and false otherwise.
+
+        :param models: the models of the domain
+        :return: true if the index is up-to-date, false otherwise
+        """
+        return self._version == Model.version and self._models == models
+
+    def get_triggered_models(self, updated_vars):
+        """
+        Returns the models triggered by the updated variables, in the order in which
+        they are defined in the domain.
+
+        :param updated_vars: the updated variables
+        :return: the list of triggered models
+        """
+        if updated_vars is None:
+            raise ValueError()
+
+        triggered = set()
+        for updated_var in updated_vars:
+            triggered.update(self._exact_triggers.get(updated_var.strip().lower(), ()))
+            if len(self._template_triggers) > 0:
+                triggered.update(self._get_template_matches(updated_var))
+
+        return [self._models[idx] for idx in sorted(triggered)]
+
+    def _get_template_matches(self, updated_var):
+        """
+        Returns the indices of the models with a trigger template matching the
+        variable label.
+
+        :param updated_var: the variable label
+        :return: the set of model indices
+        """
+        matches = self._cache.get(updated_var, None)
+        if matches is None:
+            matches = frozenset([idx for trigger, idx in self._template_triggers if trigger.match(updated_var).is_matching()])
+            if len(self._cache) >= TriggerIndex.max_cache_size:
+                self._cache.clear()
+            self._cache[updated_var] = matches
+
+        return matches
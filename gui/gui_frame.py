@@ -2,14 +2,11 @@ import logging
 import sys
 from collections import Collection
 
-from PyQt5 import QtWidgets, QtGui
-from PyQt5.QtCore import Qt
 from multipledispatch import dispatch
 
 from bn.distribs.categorical_table import CategoricalTable
 from bn.values.none_val import NoneVal
 from dialogue_state import DialogueState
-from gui.gui import GUI
 from modules.module import Module
 from utils.string_utils import StringUtils
 
@@ -53,6 +50,9 @@ class GUIFrame(Module):
         Displays the GUI frame.
         """
         if self._system.get_settings().show_gui and not self.is_running():
+            # the PyQt front-end is only loaded when the GUI is displayed
+            from PyQt5 import QtWidgets
+            from gui.gui import GUI
             self.frame = True
             app = QtWidgets.QApplication(sys.argv)
             self.gui = GUI(self._system)
@@ -76,6 +76,8 @@ class GUIFrame(Module):
         for variable in [self._system.get_settings().user_input, self._system.get_settings().system_output]:
             if not self._paused and variable in update_vars and state.has_chance_node(variable):
                 if variable in [self._settings.system_output, self._settings.user_input]:
+                    from PyQt5 import QtGui
+                    from PyQt5.QtCore import Qt
                     table = self._system.get_content(variable).to_discrete()
                     text = self._get_text_rendering(table)
                     self.gui.chatlog.append(text)
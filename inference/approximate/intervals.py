@@ -1,21 +1,22 @@
 import logging
-import math
 import random
 from collections import Collection, Callable
 
-from multipledispatch import dispatch
+import numpy as np
 
 from settings import Settings
+from utils.dispatch_utils import dispatch
 
 
 class Intervals:
     """
-    * Representation of a collection of intervals, each of which is associated with a
-    * content object, and start and end values. The difference between the start and end
-    * values of an interval can for instance represent the object probability.
+    * Representation of a collection of content objects, each of which is associated
+    * with a weight (for instance, the object probability).
     *
-    * The intervals can then be used for sampling a content object according to the
-    * defined intervals.
+    * The content objects can then be sampled according to their weights. The sampling
+    * relies on an alias table (Walker's alias method, in the construction of Vose), so
+    * that each sample is drawn in constant time, and many samples can be drawn at once
+    * with NumPy.
     """
     log = logging.getLogger('PyOpenDial')
 
@@ -28,19 +29,8 @@ class Intervals:
             :param table: the tables from which to create the intervals could not be
                           created
             """
-            self._intervals = list()
-            self._total_prob = 0.
-
-            for key in table.keys():
-                prob = table.get(key)
-                if math.isnan(prob):
-                    raise ValueError('probability is NaN: ' + str(table))
-
-                self._intervals.append(Interval(key, self._total_prob, self._total_prob + prob))
-                self._total_prob += prob
-
-            if self._total_prob < Settings.eps:
-                raise ValueError('total prob is null: ' + str(self._total_prob))
+            self._contents = list(table.keys())
+            self._build_alias_table(np.fromiter(table.values(), dtype=np.float64, count=len(table)), table)
         elif isinstance(arg1, Collection) and isinstance(arg2, Callable):
             contents = arg1
             probs = arg2
@@ -52,53 +42,90 @@ class Intervals:
             :param probs: the function associating a weight to each object intervals could
                         not be created
             """
-            self._intervals = list()
-            self._total_prob = 0.
-
-            for content in contents:
-                prob = probs(content)
-                if math.isnan(prob):
-                    raise ValueError('probability is Nan: ' + str(content))
-
-                self._intervals.append(Interval(content, self._total_prob, self._total_prob + prob))
-                self._total_prob += prob
-
-            if self._total_prob < Settings.eps:
-                raise ValueError('total prob is null: ' + str(self._total_prob))
+            self._contents = list(contents)
+            self._build_alias_table(np.array([probs(content) for content in self._contents], dtype=np.float64), contents)
         else:
             raise NotImplementedError("UNDEFINED PARAMETERS")
 
+    def _build_alias_table(self, weights, source):
+        """
+        Builds the alias table for the weights of the content objects. Each column of
+        the table holds the probability of keeping its own content object, and the
+        index of the object (the alias) to select otherwise.
+
+        :param weights: the array of weights
+        :param source: the source of the weights (for the error messages)
+        """
+        if np.isnan(weights).any():
+            raise ValueError('probability is NaN: ' + str(source))
+
+        self._total_prob = float(weights.sum())
+        if self._total_prob < Settings.eps:
+            raise ValueError('total prob is null: ' + str(self._total_prob))
+
+        nb_contents = len(weights)
+        scaled = (weights * (nb_contents / self._total_prob)).tolist()
+        probs = [1.] * nb_contents
+        aliases = list(range(nb_contents))
+
+        small = [idx for idx, prob in enumerate(scaled) if prob < 1.]
+        large = [idx for idx, prob in enumerate(scaled) if prob >= 1.]
+        while len(small) > 0 and len(large) > 0:
+            small_idx = small.pop()
+            large_idx = large[-1]
+            probs[small_idx] = scaled[small_idx]
+            aliases[small_idx] = large_idx
+            scaled[large_idx] -= 1. - scaled[small_idx]
+            if scaled[large_idx] < 1.:
+                small.append(large.pop())
+
+        # the remaining columns (up to rounding errors) keep their own content object
+        self._probs = probs
+        self._aliases = aliases
+        self._probs_array = np.array(probs)
+        self._aliases_array = np.array(aliases, dtype=np.int64)
+
+    @dispatch()
     def sample(self):
         """
-        Samples an object from the interval collection, using a simple binary search
-        procedure.
+        Samples an object from the interval collection, using the alias table.
 
         :return: the sampled object
         """
-        if len(self._intervals) == 0:
+        if len(self._contents) == 0:
             raise ValueError('could not sample: empty interval')
 
-        rand = random.random() * self._total_prob
+        idx = int(random.random() * len(self._contents))
+        if random.random() >= self._probs[idx]:
+            idx = self._aliases[idx]
+        return self._contents[idx]
 
-        min_idx = 0
-        max_idx = len(self._intervals)
-        while min_idx <= max_idx:
-            mid = int(min_idx + (max_idx - min_idx) / 2)
-            compare_value = self._intervals[mid].compare_to(rand)
-            if compare_value > 0:
-                max_idx = mid - 1
-            elif compare_value == 0:
-                return self._intervals[mid].get_content()
-            elif compare_value < 0:
-                min_idx = mid + 1
+    @dispatch(int)
+    def sample(self, nb_samples):
+        """
+        Samples a number of objects at once from the interval collection.
+
+        :param nb_samples: the number of objects to sample
+        :return: the list of sampled objects
+        """
+        if len(self._contents) == 0:
+            raise ValueError('could not sample: empty interval')
 
-        raise ValueError("could not sample given the intervals: " + self.__str__())
+        indices = np.random.randint(len(self._contents), size=nb_samples)
+        to_alias = np.random.random(nb_samples) >= self._probs_array[indices]
+        indices[to_alias] = self._aliases_array[indices[to_alias]]
+        return [self._contents[idx] for idx in indices.tolist()]
 
     def __str__(self):
-        return '\n'.join([str(s) for s in self._intervals])
+        probs = np.zeros(len(self._contents))
+        for idx, (prob, alias) in enumerate(zip(self._probs, self._aliases)):
+            probs[idx] += prob
+            probs[alias] += 1. - prob
+        probs *= self._total_prob / len(self._contents)
+        return '\n'.join(['%s[%f]' % (str(content), prob) for content, prob in zip(self._contents, probs)])
 
     def __len__(self):
-        return len(self._intervals)
+        return len(self._contents)
 
     def is_empty(self):
         """
@@ -106,54 +133,4 @@ class Intervals:
 
         :return: whether the interval is empty
         """
-        return len(self._intervals) == 0
-
-
-class Interval:
-    """
-    Representation of a single interval, made of an object, a start value, and an end
-    value
-    """
-
-    def __init__(self, content, start, end):
-        if not isinstance(content, object) or not isinstance(start, float) or not isinstance(end, float):
-            raise NotImplementedError("UNDEFINED PARAMETERS")
-
-        """
-        Creates a new interval
-
-        :param content: the interval content
-        :param start: the start value for the interval
-        :param end: the end value for the interval
-        """
-        self._content = content
-        self._start = start
-        self._end = end
-
-    def get_content(self):
-        """
-        Returns the object associated with the interval
-
-        :return: the object
-        """
-        return self._content
-
-    def __str__(self):
-        return '%s[%f, %f]' % (str(self._content), self._start, self._end)
-
-    @dispatch(float)
-    def compare_to(self, value):
-        """
-        Returns the position of the double value in comparison with the start and end
-        values of the interval
-
-        :param value: the value to compare
-        :return +1 if value < start, 0 if start <= value <= end, -1 if value >= end
-        """
-        if value >= self._start:
-            if value < self._end:
-                return 0
-            else:
-                return -1
-
-        return 1
+        return len(self._contents) == 0
@@ -1,14 +1,15 @@
 import logging
 import math
 import multiprocessing
+import pickle
+import random
 import threading
 import traceback
-from contextlib import closing
-from multiprocessing import Pool
-from multiprocessing.pool import ThreadPool
+from copy import copy
 
-from multipledispatch import dispatch
+import numpy as np
 
+from bn.b_network import BNetwork
 from bn.distribs.continuous_distribution import ContinuousDistribution
 from bn.nodes.action_node import ActionNode
 from bn.nodes.chance_node import ChanceNode
@@ -16,6 +17,9 @@ from bn.nodes.utility_node import UtilityNode
 from inference.approximate.intervals import Intervals
 from inference.approximate.sample import Sample
 from inference.query import Query
+from settings import Settings
+from utils.dispatch_utils import dispatch
+from utils.instrumentation import Instrumentation
 from utils.py_utils import current_time_millis
 
 
@@ -27,86 +31,184 @@ class LikelihoodWeighting:
 
     _weight_threshold = 0.0001
 
+    # minimum number of samples per process for the sampling to be split
+    _min_samples_per_process = 100
+
+    # additional time (in seconds) granted to a process to return its samples
+    _process_grace_time = 1.
+
+    # start method of the sampling processes: the processes are not forked from the
+    # (multi-threaded) dialogue system, since a fork can copy locks held by other threads
+    start_method = 'spawn'
+
+    # process pool shared by all sampling queries (created on first use)
+    _pool = None
+    _pool_size = 0
+    _pool_functions = None
+    _pool_lock = threading.Lock()
+
+    # whether the current process is itself a sampling process of the pool
+    _in_sampling_process = False
+
     def __init__(self, query, nr_samples, max_sampling_time):
         if not isinstance(query, Query) or not isinstance(nr_samples, int) or not isinstance(max_sampling_time, int):
             raise NotImplementedError("UNDEFINED PARAMETERS")
         """
         Creates a new sampling query with the given arguments and starts sampling
-        (using parallel streams).
+        (using a pool of processes if the number of samples is large enough).
 
         :param query: the query to answer
         :param nr_samples: the number of samples to collect
         :param max_sampling_time: maximum sampling time (in milliseconds)
         """
         self._query = query
-        self._evidence = query.get_evidence()
+        self._evidence = query.get_evidence().freeze()
         self._query_vars = query.get_query_vars()
 
         self._sorted_nodes = query.get_filtered_sorted_nodes()
         self._sorted_nodes.sort(reverse=True)
 
-        self._sample_cnt = 0
         self._max_sampling_time = max_sampling_time
 
+        self._samples = self._collect_samples(nr_samples)
+        if Instrumentation.enabled:
+            Instrumentation.annotate(nb_samples=len(self._samples))
+
+    def __getstate__(self):
+        """
+        Returns a picklable snapshot of the query, made of copies of the relevant
+        nodes (detached from the rest of the network), the evidence and the query
+        variables.
+
+        :return: the snapshot
+        """
+        network = BNetwork()
+        for node in self._sorted_nodes:
+            copied_node = copy(node)
+            for input_node_id in node.get_input_node_ids():
+                copied_node.add_input_node(network.get_node(input_node_id))
+            network.add_node(copied_node)
+
+        state = dict()
+        state['_evidence'] = self._evidence
+        state['_query_vars'] = self._query_vars
+        state['_sorted_nodes'] = [network.get_node(node.get_id()) for node in self._sorted_nodes]
+        state['_max_sampling_time'] = self._max_sampling_time
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._query = None
         self._samples = []
-        for _ in range(nr_samples):
-            self._samples.append(self.sample())
-
-        # nr_processes = multiprocessing.cpu_count() - 2
-        # if nr_processes < 1:
-        #     nr_processes = 1
-        #
-        # if nr_processes == 1:
-        #     nr_samples_per_process = [nr_samples]
-        # else:
-        #     nr_samples_per_process = [nr_samples // nr_processes] * (nr_processes) # - 1) + [nr_samples % nr_processes]
-        #
-        # threads = []
-        # self._thread_results = [None] * nr_processes
-        #
-        # for thread_idx in range(nr_processes):
-        #     thread = threading.Thread(target=self._sampling_process, args=(thread_idx, nr_samples_per_process[thread_idx]))
-        #     threads.append(thread)
-        #
-        # for thread in threads:
-        #     thread.start()
-        #
-        # for thread in threads:
-        #     thread.join()
-        #
-        # self._samples = list()
-        # for samples in self._thread_results:
-        #     self._samples.extend(samples)
-
-    #     with closing(Pool(processes=nr_processes)) as pool:
-    #         if nr_processes == 1:
-    #             nr_samples_per_process = [nr_samples]
-    #         else:
-    #             nr_samples_per_process = [nr_samples // nr_processes] * (nr_processes - 1) + [nr_samples % nr_processes]
-    #
-    #         samples_from_processes = pool.map(self._sampling_process, nr_samples_per_process)
-    #         self._samples = [sample for samples_from_process in samples_from_processes for sample in samples_from_process]
-    #         pool.terminate()
-
-    def _sampling_process(self, thread_idx, nr_samples):
-        """
-        Sub-procedure for sample on different processes.
-
-        :param nr_samples: number of samples to sample
-        :return: samples acquired
-        """
-        print('thread idx: ', thread_idx)
-        result = []
-        start_time = current_time_millis()
-        while len(result) < nr_samples:
-            sample = self.sample()
-            if sample.get_weight() > LikelihoodWeighting._weight_threshold:
-                result.append(sample)
-            elapsed_time = current_time_millis() - start_time
-            if elapsed_time > self._max_sampling_time:
+
+    def _collect_samples(self, nr_samples):
+        """
+        Collects samples until nr_samples are collected or the maximum sampling time
+        is exceeded. If the number of samples is large enough, the sampling is split
+        across a pool of processes.
+
+        :param nr_samples: the number of samples to collect
+        :return: the collected samples
+        """
+        deadline = current_time_millis() + self._max_sampling_time
+
+        nr_processes = min(Settings.nr_sampling_processes, nr_samples // LikelihoodWeighting._min_samples_per_process)
+        if nr_processes > 1 and not LikelihoodWeighting._in_sampling_process:
+            try:
+                samples = self._collect_samples_in_pool(nr_samples, nr_processes, deadline)
+                if len(samples) > 0:
+                    return samples
+            except Exception as e:
+                self.log.debug('could not sample in parallel, sampling sequentially: ' + str(e))
+
+        return self._sample_until(nr_samples, deadline)
+
+    def _collect_samples_in_pool(self, nr_samples, nr_processes, deadline):
+        """
+        Splits the sample collection across the process pool. Each process receives
+        a snapshot of the query and its own random seed, and stops at the deadline.
+
+        :param nr_samples: the number of samples to collect
+        :param nr_processes: the number of processes
+        :param deadline: the time (in milliseconds) at which the sampling must stop
+        :return: the samples collected by the processes
+        """
+        snapshot = pickle.dumps(self, pickle.HIGHEST_PROTOCOL)
+        pool = LikelihoodWeighting._get_pool(nr_processes)
+
+        results = list()
+        for process_idx in range(nr_processes):
+            nr_process_samples = nr_samples // nr_processes
+            if process_idx < nr_samples % nr_processes:
+                nr_process_samples += 1
+
+            seed = random.randrange(2 ** 32)
+            results.append(pool.apply_async(_sampling_process, (snapshot, nr_process_samples, seed, deadline)))
+
+        samples = list()
+        for result in results:
+            timeout = max(deadline - current_time_millis(), 0) / 1000. + LikelihoodWeighting._process_grace_time
+            try:
+                samples.extend(result.get(timeout))
+            except multiprocessing.TimeoutError:
+                self.log.warning('sampling process did not return in time, its samples are ignored')
+
+        return samples
+
+    def _sample_until(self, nr_samples, deadline):
+        """
+        Collects samples in the current process until nr_samples are collected or the
+        deadline is reached. At least one sample is always collected.
+
+        :param nr_samples: the number of samples to collect
+        :param deadline: the time (in milliseconds) at which the sampling must stop
+        :return: the collected samples
+        """
+        samples = list()
+        while len(samples) < nr_samples:
+            samples.append(self.sample())
+            if current_time_millis() > deadline:
                 break
 
-        self._thread_results[thread_idx] = result
+        return samples
+
+    @staticmethod
+    def _get_pool(nr_processes):
+        """
+        Returns the process pool used for sampling. The pool is (re)created if the
+        number of processes or the registered functions changed since its creation.
+        The registered functions are passed to the processes upon their creation.
+
+        :param nr_processes: the number of processes
+        :return: the process pool
+        """
+        with LikelihoodWeighting._pool_lock:
+            if LikelihoodWeighting._pool is None or LikelihoodWeighting._pool_size != nr_processes \
+                    or LikelihoodWeighting._pool_functions != Settings._functions:
+                if LikelihoodWeighting._pool is not None:
+                    LikelihoodWeighting._pool.terminate()
+
+                context = multiprocessing.get_context(LikelihoodWeighting.start_method)
+                LikelihoodWeighting._pool = context.Pool(processes=nr_processes, initializer=_init_sampling_process,
+                                                         initargs=(dict(Settings._functions),))
+                LikelihoodWeighting._pool_size = nr_processes
+                LikelihoodWeighting._pool_functions = dict(Settings._functions)
+
+            return LikelihoodWeighting._pool
+
+    @staticmethod
+    def shutdown_pool():
+        """
+        Shuts down the process pool used for sampling, if any. The samplings already
+        submitted to the pool are completed before its processes exit, and a new pool
+        is created upon the next parallel sampling.
+        """
+        with LikelihoodWeighting._pool_lock:
+            if LikelihoodWeighting._pool is not None:
+                LikelihoodWeighting._pool.close()
+                LikelihoodWeighting._pool = None
+                LikelihoodWeighting._pool_size = 0
+                LikelihoodWeighting._pool_functions = None
 
     def __str__(self):
         return '%s (%d samples already collected)' % (str(self._query), len(self._samples))
@@ -205,12 +307,35 @@ class LikelihoodWeighting:
         """
         try:
             intervals = Intervals(self._samples, lambda x: x.get_weight())
-
-            new_samples = list()
-            for _ in range(len(self._samples)):
-                new_samples.append(intervals.sample())
-
-            self._samples = new_samples
+            self._samples = intervals.sample(len(self._samples))
         except Exception as e:
             self.log.warning('could not redraw samples: ' + str(e))
             traceback.print_tb(e.__traceback__)
+
+
+def _init_sampling_process(functions):
+    """
+    Marks the current process as a sampling process of the pool (so that it never
+    spawns processes on its own), and registers the functions of the parent process.
+
+    :param functions: the registered functions, indexed by name
+    """
+    LikelihoodWeighting._in_sampling_process = True
+    for name, func in functions.items():
+        Settings.add_function(name, func)
+
+
+def _sampling_process(snapshot, nr_samples, seed, deadline):
+    """
+    Sub-procedure for sampling on a different process.
+
+    :param snapshot: the pickled snapshot of the query
+    :param nr_samples: number of samples to sample
+    :param seed: the seed for the random generators of the process
+    :param deadline: the time (in milliseconds) at which the sampling must stop
+    :return: samples acquired
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    sampler = pickle.loads(snapshot)
+    return sampler._sample_until(nr_samples, deadline)
@@ -2,9 +2,8 @@ import logging
 import math
 from functools import total_ordering
 
-from multipledispatch import dispatch
-
 from datastructs.assignment import Assignment
+from utils.dispatch_utils import dispatch
 
 
 @total_ordering
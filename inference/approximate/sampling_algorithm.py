@@ -2,8 +2,6 @@ import logging
 import traceback
 from collections import Collection, Callable
 
-from multipledispatch import dispatch
-
 from bn.b_network import BNetwork
 from bn.distribs.continuous_distribution import ContinuousDistribution
 from bn.distribs.empirical_distribution import EmpiricalDistribution
@@ -15,6 +13,7 @@ from inference.approximate.likelihood_weighting import LikelihoodWeighting
 from inference.inference_algorithm import InferenceAlgorithm
 from inference.query import ProbQuery, UtilQuery, Query, ReduceQuery
 from settings import Settings
+from utils.dispatch_utils import dispatch
 
 dispatch_namespace = dict()
 
@@ -241,7 +240,7 @@ class SamplingAlgorithm(InferenceAlgorithm):
             weight_scheme(samples)
 
             intervals = Intervals(samples, lambda x: x.get_weight())
-            for _ in range(len(samples)):
-                distrib.add_sample(intervals.sample())
+            for sample in intervals.sample(len(samples)):
+                distrib.add_sample(sample)
 
         return distrib
@@ -0,0 +1,470 @@
+import logging
+from collections import Collection
+
+import numpy as np
+
+from datastructs.assignment import Assignment, FrozenAssignment
+from inference.exact.double_factor import DoubleFactor
+from utils.dispatch_utils import dispatch
+
+
+class DenseFactor:
+    """
+    Double factor, combining probability and utility distributions, encoded as dense
+    arrays. Each variable of the factor corresponds to an axis of the arrays, and each
+    axis is associated with an indexed domain of values. Pointwise products and sums
+    are then computed by broadcasting over the arrays instead of iterating over pairs
+    of assignments.
+
+    Since the factors used in the variable elimination are sparse (assignments that
+    are inconsistent with the evidence are simply absent), a boolean mask records
+    which entries are defined, so that the factor behaves exactly as a DoubleFactor
+    with the same entries.
+    """
+    log = logging.getLogger('PyOpenDial')
+
+    # maximum number of entries for a dense factor (beyond which the variable
+    # elimination falls back on sparse factors)
+    max_size = 1000000
+
+    def __init__(self, arg1=None):
+        if arg1 is None:
+            """
+            Creates a new, empty factor
+            """
+            self._variables = []
+            self._domains = []
+            self._indices = []
+            self._probs = np.zeros(())
+            self._utils = np.zeros(())
+            self._defined = np.zeros((), dtype=bool)
+        elif isinstance(arg1, DenseFactor):
+            existing_factor = arg1
+            """
+            Creates a new factor out of an existing one
+
+            :param existing_factor: the existing factor
+            """
+            self._variables = list(existing_factor._variables)
+            self._domains = [list(domain) for domain in existing_factor._domains]
+            self._indices = [dict(indices) for indices in existing_factor._indices]
+            self._probs = existing_factor._probs.copy()
+            self._utils = existing_factor._utils.copy()
+            self._defined = existing_factor._defined.copy()
+        elif isinstance(arg1, DoubleFactor):
+            sparse_factor = arg1
+            """
+            Creates a new dense factor with the same entries as the sparse factor. All
+            the entries of the sparse factor must assign the same variables.
+
+            :param sparse_factor: the sparse factor to convert
+            """
+            self._variables = []
+            self._domains = []
+            self._indices = []
+            for assignment in sparse_factor.get_assignments():
+                for variable in assignment.get_variables():
+                    if variable not in self._variables:
+                        self._variables.append(variable)
+                        self._domains.append([])
+                        self._indices.append(dict())
+
+            entries = []
+            for assignment, value in sparse_factor._matrix.items():
+                position = []
+                if len(assignment.get_variables()) != len(self._variables):
+                    raise ValueError("entries of the sparse factor assign distinct variables")
+                for domain, indices, variable in zip(self._domains, self._indices, self._variables):
+                    value_to_index = assignment.get_value(variable)
+                    index = indices.get(value_to_index)
+                    if index is None:
+                        index = len(domain)
+                        indices[value_to_index] = index
+                        domain.append(value_to_index)
+                    position.append(index)
+                entries.append((tuple(position), value[0], value[1]))
+
+            shape = tuple(len(domain) for domain in self._domains)
+            self._probs = np.zeros(shape)
+            self._utils = np.zeros(shape)
+            self._defined = np.zeros(shape, dtype=bool)
+            for position, prob, utility in entries:
+                self._probs[position] = prob
+                self._utils[position] = utility
+                self._defined[position] = True
+        else:
+            raise NotImplementedError("UNDEFINED PARAMETERS")
+
+    def __copy__(self):
+        return DenseFactor(self)
+
+    def __str__(self):
+        return str(self.to_double_factor())
+
+    def __len__(self):
+        return int(np.count_nonzero(self._defined))
+
+    def to_double_factor(self):
+        """
+        Returns the sparse factor with the same entries as the dense factor
+
+        :return: the corresponding double factor
+        """
+        factor = DoubleFactor()
+        for position in self._get_positions():
+            factor.add_entry(self._get_assignment(position), float(self._probs[position]), float(self._utils[position]))
+        return factor
+
+    def get_product_size(self, factor):
+        """
+        Returns the number of entries in the pointwise product of the two factors.
+
+        :param factor: the other factor
+        :return: the size of the product
+        """
+        size = 1
+        for domain, indices, variable in zip(self._domains, self._indices, self._variables):
+            extra_values = 0
+            if variable in factor._variables:
+                other_domain = factor._domains[factor._variables.index(variable)]
+                extra_values = sum(1 for value in other_domain if value not in indices)
+            size *= len(domain) + extra_values
+
+        for domain, variable in zip(factor._domains, factor._variables):
+            if variable not in self._variables:
+                size *= len(domain)
+
+        return size
+
+    def product(self, factor):
+        """
+        Computes the pointwise product of the two factors. The probabilities are
+        multiplied and the utilities are added.
+
+        :param factor: the other factor
+        :return: the pointwise product of the factors
+        """
+        result = DenseFactor()
+        for domain, variable in zip(self._domains, self._variables):
+            result._add_variable(variable, domain)
+        for domain, variable in zip(factor._domains, factor._variables):
+            result._add_variable(variable, domain)
+
+        probs, utils, defined = self._expand(result)
+        probs2, utils2, defined2 = factor._expand(result)
+
+        result._defined = defined & defined2
+        result._probs = np.where(result._defined, probs * probs2, 0.)
+        result._utils = np.where(result._defined, utils + utils2, 0.)
+        return result
+
+    @dispatch(str)
+    def sum_out(self, variable):
+        """
+        Sums out the variable from the factor, and returns the result. The utilities
+        of the resulting factor are normalised with respect to their probabilities.
+
+        :param variable: the variable to sum out
+        :return: the summed out factor
+        """
+        if variable not in self._variables:
+            return DenseFactor(self)
+
+        axis = self._variables.index(variable)
+        result = DenseFactor()
+        result._variables = self._variables[:axis] + self._variables[axis + 1:]
+        result._domains = self._domains[:axis] + self._domains[axis + 1:]
+        result._indices = self._indices[:axis] + self._indices[axis + 1:]
+
+        probs = self._probs.sum(axis=axis)
+        weighted_utils = (self._probs * self._utils).sum(axis=axis)
+        result._defined = self._defined.any(axis=axis)
+        result._probs = probs
+        result._utils = np.where(probs > 0., weighted_utils / np.where(probs > 0., probs, 1.), weighted_utils)
+        return result
+
+    @dispatch(Assignment)
+    def extend_entries(self, assignment):
+        """
+        Extends all entries of the factor with the assignment (whose variables must
+        not already be included in the factor).
+
+        :param assignment: the assignment to add to each entry
+        """
+        for variable in assignment.get_variables():
+            self._variables.append(variable)
+            self._domains.append([assignment.get_value(variable)])
+            self._indices.append({assignment.get_value(variable): 0})
+            self._probs = self._probs[..., np.newaxis]
+            self._utils = self._utils[..., np.newaxis]
+            self._defined = self._defined[..., np.newaxis]
+
+    @dispatch()
+    def normalize(self):
+        """
+        Normalises the factor, assuming no conditional variables in the factor.
+        """
+        if not self._defined.any():
+            return
+
+        total = self._probs.sum()
+        if total == 0.:
+            raise ValueError()
+
+        self._probs = self._probs / total
+
+    @dispatch(Collection)
+    def normalize(self, cond_vars):
+        """
+        Normalises the factor, with the conditional variables as argument.
+
+        :param cond_vars: the conditional variables
+        """
+        axes = tuple(axis for axis, variable in enumerate(self._variables) if variable not in cond_vars)
+        totals = self._probs.sum(axis=axes, keepdims=True)
+        totals = np.broadcast_to(totals, self._probs.shape)
+        if (totals[self._defined] == 0.).any():
+            raise ValueError()
+
+        self._probs = np.where(self._defined, self._probs / np.where(totals == 0., 1., totals), 0.)
+
+    @dispatch(Collection)
+    def trim(self, head_vars):
+        """
+        Trims the factor to the variables provided as argument. As for the sparse
+        factors, if several entries are merged together, only one of them is kept.
+
+        :param head_vars: the variables to retain.
+        """
+        kept_axes = [axis for axis, variable in enumerate(self._variables) if variable in head_vars]
+        removed_axes = [axis for axis, variable in enumerate(self._variables) if variable not in head_vars]
+        if len(removed_axes) == 0:
+            return
+
+        order = kept_axes + removed_axes
+        kept_shape = tuple(self._probs.shape[axis] for axis in kept_axes)
+        probs = np.transpose(self._probs, order).reshape(kept_shape + (-1,))
+        utils = np.transpose(self._utils, order).reshape(kept_shape + (-1,))
+        defined = np.transpose(self._defined, order).reshape(kept_shape + (-1,))
+
+        last = defined.shape[-1] - 1 - np.argmax(defined[..., ::-1], axis=-1)
+        last = last[..., np.newaxis]
+        self._probs = np.take_along_axis(probs, last, axis=-1)[..., 0]
+        self._utils = np.take_along_axis(utils, last, axis=-1)[..., 0]
+        self._defined = defined.any(axis=-1)
+
+        self._variables = [self._variables[axis] for axis in kept_axes]
+        self._domains = [self._domains[axis] for axis in kept_axes]
+        self._indices = [self._indices[axis] for axis in kept_axes]
+
+    def is_empty(self):
+        """
+        Returns true if the factor is empty, e.g. either really empty, or containing
+        only empty assignments.
+
+        :return: true if the factor is empty, false otherwise
+        """
+        return len(self._variables) == 0 or not self._defined.any()
+
+    @dispatch(Assignment)
+    def get_entry(self, assignment):
+        """
+        Get entry
+
+        :param assignment: assignment
+        """
+        position = self._get_position(assignment)
+        if position is None or not self._defined[position]:
+            raise ValueError()
+        return [float(self._probs[position]), float(self._utils[position])]
+
+    @dispatch(Assignment)
+    def get_prob_entry(self, assignment):
+        """
+        Returns the probability for the assignment, if it is encoded in the matrix.
+
+        :param assignment: the assignment
+        :return: probability of the assignment
+        """
+        return self.get_entry(assignment)[0]
+
+    @dispatch(Assignment)
+    def get_utility_entry(self, assignment):
+        """
+        Returns the utility for the assignment, if it is encoded in the matrix.
+
+        :param assignment: the assignment
+        :return: utility for the assignment
+        """
+        return self.get_entry(assignment)[1]
+
+    def get_assignments(self):
+        """
+        Returns the assignments included in the factor
+
+        :return: the assignments
+        """
+        return [self._get_assignment(position) for position in self._get_positions()]
+
+    def get_prob_table(self):
+        """
+        Returns the probability matrix for the factor
+
+        :return: the probability matrix
+        """
+        result = dict()
+        for position in self._get_positions():
+            result[self._get_assignment(position)] = float(self._probs[position])
+        return result
+
+    def get_util_table(self):
+        """
+        Returns the utility matrix for the factor
+
+        :return: the utility matrix
+        """
+        result = dict()
+        for position in self._get_positions():
+            result[self._get_assignment(position)] = float(self._utils[position])
+        return result
+
+    @dispatch()
+    def get_values(self):
+        """
+        Returns the set of assignments in the factor
+
+        :return: the set of assignments
+        """
+        return set(self.get_assignments())
+
+    @dispatch(str)
+    def get_values(self, variable):
+        """
+        Returns the set of possible values for the given variable
+
+        :param variable: the variable label
+        :return: the set of possible values
+        """
+        if variable not in self._variables:
+            return set()
+
+        axis = self._variables.index(variable)
+        other_axes = tuple(i for i in range(len(self._variables)) if i != axis)
+        used = self._defined.any(axis=other_axes)
+        return set(value for value, is_used in zip(self._domains[axis], used) if is_used)
+
+    def get_variables(self):
+        """
+        Returns the set of variables used in the factor.
+
+        :return: the set of variables
+        """
+        if not self._defined.any():
+            return set()
+        return set(self._variables)
+
+    @dispatch(Assignment)
+    def has_assignment(self, assignment):
+        """
+        Returns true if the factor contains the assignment, and false otherwise
+
+        :param assignment: the assignment
+        :return: true if assignment is included, false otherwise
+        """
+        position = self._get_position(assignment)
+        return position is not None and bool(self._defined[position])
+
+    def _add_variable(self, variable, domain):
+        """
+        Adds the variable with the given values to the (still empty) factor, merging
+        the values with the existing domain if the variable is already included.
+
+        :param variable: the variable
+        :param domain: the values of the variable
+        """
+        if variable not in self._variables:
+            self._variables.append(variable)
+            self._domains.append([])
+            self._indices.append(dict())
+
+        axis = self._variables.index(variable)
+        for value in domain:
+            if value not in self._indices[axis]:
+                self._indices[axis][value] = len(self._domains[axis])
+                self._domains[axis].append(value)
+
+    def _expand(self, factor):
+        """
+        Returns the probability, utility and mask arrays of the factor, reindexed on
+        the variables and domains of the (larger) factor given as argument, such that
+        they can be broadcast against its shape.
+
+        :param factor: the factor providing the target variables and domains
+        :return: the tuple of expanded arrays
+        """
+        maps = []
+        identity = True
+        for axis, variable in enumerate(self._variables):
+            target_indices = factor._indices[factor._variables.index(variable)]
+            target_size = len(factor._domains[factor._variables.index(variable)])
+            mapping = [target_indices[value] for value in self._domains[axis]]
+            maps.append(mapping)
+            if target_size != len(mapping) or mapping != list(range(target_size)):
+                identity = False
+
+        arrays = [self._probs, self._utils, self._defined]
+        if not identity:
+            shape = tuple(len(factor._domains[factor._variables.index(variable)]) for variable in self._variables)
+            expanded = []
+            for array in arrays:
+                new_array = np.zeros(shape, dtype=array.dtype)
+                new_array[np.ix_(*maps)] = array
+                expanded.append(new_array)
+            arrays = expanded
+
+        target_axes = [factor._variables.index(variable) for variable in self._variables]
+        order = sorted(range(len(target_axes)), key=lambda i: target_axes[i])
+        shape = [1] * len(factor._variables)
+        for axis, variable in enumerate(self._variables):
+            shape[target_axes[axis]] = len(factor._domains[target_axes[axis]])
+
+        return tuple(np.transpose(array, order).reshape(shape) for array in arrays)
+
+    def _get_positions(self):
+        """
+        Returns the positions of the defined entries in the arrays (the only position
+        of a factor without variables being the empty tuple).
+
+        :return: the list of positions
+        """
+        if self._defined.ndim == 0:
+            return [()] if self._defined else []
+        return list(zip(*np.nonzero(self._defined)))
+
+    def _get_position(self, assignment):
+        """
+        Returns the position in the arrays corresponding to the assignment, or None
+        if one of its values is not included in the factor.
+
+        :param assignment: the assignment
+        :return: the position
+        """
+        if set(assignment.get_variables()) != set(self._variables):
+            return None
+
+        position = []
+        for indices, variable in zip(self._indices, self._variables):
+            index = indices.get(assignment.get_value(variable))
+            if index is None:
+                return None
+            position.append(index)
+        return tuple(position)
+
+    def _get_assignment(self, position):
+        """
+        Returns the assignment corresponding to the position in the arrays.
+
+        :param position: the position
+        :return: the corresponding assignment
+        """
+        return FrozenAssignment({variable: domain[index] for domain, variable, index in zip(self._domains, self._variables, position)})
@@ -1,15 +1,14 @@
 import logging
 from collections import Collection
 
-from multipledispatch import dispatch
-
 from datastructs.assignment import Assignment
-from copy import copy
+from utils.dispatch_utils import dispatch
 
 
 class DoubleFactor:
     """
-    Double factor, combining probability and utility distributions
+    Double factor, combining probability and utility distributions. The assignments of
+    the factor are frozen, and are thus shared between copied factors.
     """
     log = logging.getLogger('PyOpenDial')
 
@@ -28,7 +27,7 @@ class DoubleFactor:
             """
             self._matrix = dict()
             for key, value in existing_factor._matrix.items():
-                self._matrix[copy(key)] = copy(value)
+                self._matrix[key] = list(value)
         else:
             raise NotImplementedError("UNDEFINED PARAMETERS")
 
@@ -65,7 +64,7 @@ class DoubleFactor:
         :param prob_value: probability
         :param utility_value: utility
         """
-        self._matrix[assignment] = [prob_value, utility_value]
+        self._matrix[assignment.freeze()] = [prob_value, utility_value]
 
     @dispatch(Assignment, float, float)
     def increment_entry(self, assignment, prob_increments, utility_increments):
@@ -76,6 +75,7 @@ class DoubleFactor:
         :param prob_increments: probability increment
         :param utility_increments: utility increment
         """
+        assignment = assignment.freeze()
         old_value = self._matrix.get(assignment, [0., 0.])
         value = [old_value[0] + prob_increments, old_value[1] + utility_increments]
         self._matrix[assignment] = value
@@ -131,8 +131,7 @@ class DoubleFactor:
         new_matrix = dict()
 
         for key in self._matrix.keys():
-            key.trim(head_vars)
-            new_matrix[key] = self._matrix[key]
+            new_matrix[key.get_trimmed(head_vars)] = self._matrix[key]
 
         self._matrix = new_matrix
 
@@ -0,0 +1,421 @@
+import logging
+from collections import Collection
+
+from bn.b_network import BNetwork
+from bn.distribs.distribution_builder import MultivariateTableBuilder
+from bn.nodes.utility_node import UtilityNode
+from datastructs.assignment import Assignment
+from inference.exact.dense_factor import DenseFactor
+from inference.exact.double_factor import DoubleFactor
+from inference.exact.variable_elimination import VariableElimination
+from inference.query import ProbQuery
+from utils.dispatch_utils import dispatch
+
+
+class JunctionTree(VariableElimination):
+    """
+    Implementation of the junction tree (or clique tree) algorithm. The factors of
+    the network are grouped in the cliques of a triangulation of the network, and the
+    tree of cliques is calibrated by passing messages in both directions along its
+    edges. Once calibrated, the marginal distribution of any set of variables
+    included in a clique is obtained from the clique potential and its incoming
+    messages, without recomputing the other factors.
+
+    The calibrated tree is cached on the network (for the evidence of the query), and
+    is reused by the following probability queries as long as the network is not
+    modified, which makes the algorithm efficient when several marginals of the same
+    network are queried in a row. The queries that cannot be answered from the tree
+    (query variables spread over several cliques, utility queries and reductions)
+    are delegated to the variable elimination.
+
+    NB: the modifications of the network are detected through its nodes, their
+    relations and the methods modifying their distributions. A distribution that is
+    directly modified in place must thus be set again in its node.
+    """
+
+    log = logging.getLogger('PyOpenDial')
+
+    def __init__(self):
+        super(JunctionTree, self).__init__()
+
+    @dispatch(BNetwork, Collection, Assignment)
+    def query_prob(self, network, query_vars, evidence):
+        return super(JunctionTree, self).query_prob(network, query_vars, evidence)
+
+    @dispatch(BNetwork, Collection)
+    def query_prob(self, network, query_vars):
+        return super(JunctionTree, self).query_prob(network, query_vars)
+
+    @dispatch(BNetwork, str, Assignment)
+    def query_prob(self, network, query_var, evidence):
+        return super(JunctionTree, self).query_prob(network, query_var, evidence)
+
+    @dispatch(BNetwork, str)
+    def query_prob(self, network, query_var):
+        return super(JunctionTree, self).query_prob(network, query_var, Assignment())
+
+    @dispatch(ProbQuery)
+    def query_prob(self, query):
+        """
+        Queries for the probability distribution of the set of random variables in the
+        Bayesian network, given the provided evidence. The distribution is extracted
+        from the calibrated junction tree if the variables are included in one of its
+        cliques, and computed with the variable elimination otherwise.
+
+        :param query: the full query
+        :return: the corresponding categorical table failed
+        """
+        junction_tree = self.get_calibrated_tree(query.get_network(), query.get_evidence())
+        evidence_vars = query.get_evidence().get_variables()
+        query_vars = set(query_var for query_var in query.get_query_vars() if query_var not in evidence_vars)
+
+        query_factor = junction_tree.get_marginal(query_vars)
+        if query_factor is None:
+            return super(JunctionTree, self).query_prob(query)
+
+        query_factor = self._add_evidence_pairs(query_factor, query)
+        query_factor.trim(query.get_query_vars())
+
+        builder = MultivariateTableBuilder()
+        builder.add_rows(query_factor.get_prob_table())
+        builder.normalize()
+        return builder.build()
+
+    @dispatch(BNetwork, Assignment)
+    def get_calibrated_tree(self, network, evidence):
+        """
+        Returns the junction tree of the network calibrated for the evidence, using
+        the tree cached on the network if it is still valid, and creating (and
+        caching) a new one otherwise.
+
+        :param network: the Bayesian network
+        :param evidence: the evidence
+        :return: the calibrated tree
+        """
+        cached = network.get_junction_tree()
+        if isinstance(cached, CliqueTree) and cached.is_valid(network, evidence):
+            return cached
+
+        factors = list()
+        for node in network.get_nodes():
+            if not isinstance(node, UtilityNode):
+                factor = self._make_factor(node, evidence)
+                if not factor.is_empty():
+                    factors.append(factor)
+
+        junction_tree = CliqueTree(network, evidence, factors)
+        network.set_junction_tree(junction_tree)
+        return junction_tree
+
+    @staticmethod
+    def is_calibrated(network, evidence):
+        """
+        Returns true if a calibrated junction tree is cached for the network and the
+        evidence, and the network has not been modified since.
+
+        :param network: the Bayesian network
+        :param evidence: the evidence
+        :return: true if the cached tree can be reused, false otherwise
+        """
+        cached = network.get_junction_tree()
+        return isinstance(cached, CliqueTree) and cached.is_valid(network, evidence)
+
+
+class NetworkVersion:
+    """
+    Version of a Bayesian network, made of its nodes, the versions of its structure
+    and contents, and the evidence integrated in the inference. Two versions are
+    equal if the network has not been modified in between (and the evidence is the
+    same). A version never matches if some nodes of the network are owned by another
+    network, since their changes are only notified to the network owning them.
+    """
+
+    def __init__(self, network, evidence):
+        """
+        Creates the current version of the network, for the evidence.
+
+        :param network: the Bayesian network
+        :param evidence: the evidence
+        """
+        self._nodes = list(network.get_nodes())
+        self._owned = all(node.get_network() is network for node in self._nodes)
+        self._structure_version = network.get_structure_version()
+        self._content_version = network.get_content_version()
+        self._evidence = Assignment(evidence)
+
+    def __eq__(self, other):
+        if not isinstance(other, NetworkVersion) or not self._owned or not other._owned:
+            return False
+        if self._structure_version != other._structure_version or self._content_version != other._content_version:
+            return False
+        if len(self._nodes) != len(other._nodes) or self._evidence != other._evidence:
+            return False
+        return all(node is other_node for node, other_node in zip(self._nodes, other._nodes))
+
+    def __hash__(self):
+        return hash((self._structure_version, self._content_version, len(self._nodes)))
+
+
+class CliqueTree:
+    """
+    Calibrated junction tree of a Bayesian network. The cliques are extracted with a
+    greedy (minimum fill-in) elimination ordering on the moral graph of the factors,
+    and connected by a maximum spanning tree over the sizes of their separators
+    (which yields a forest if the network has several connected components). The
+    messages are computed once along each edge and in each direction (Shafer-Shenoy
+    propagation), and the beliefs of the cliques are computed on demand.
+    """
+
+    log = logging.getLogger('PyOpenDial')
+
+    def __init__(self, network, evidence, factors):
+        """
+        Creates the junction tree for the factors of the network, and calibrates it.
+        If one of the factors is sparse, or one of the cliques is larger than the
+        maximum size of a dense factor, the tree is left empty (and no marginal can be
+        extracted from it).
+
+        :param network: the Bayesian network
+        :param evidence: the evidence integrated in the factors
+        :param factors: the (dense) factors of the network
+        """
+        self._version = NetworkVersion(network, evidence)
+        self._cliques = []
+        self._neighbours = []
+        self._potentials = []
+        self._messages = dict()
+        self._beliefs = dict()
+
+        if any(not isinstance(factor, DenseFactor) for factor in factors):
+            return
+
+        domain_sizes = dict()
+        for factor in factors:
+            for variable in factor.get_variables():
+                domain_sizes.setdefault(variable, set()).update(factor.get_values(variable))
+        domain_sizes = {variable: len(values) for variable, values in domain_sizes.items()}
+
+        self._cliques = CliqueTree._eliminate(factors, domain_sizes)
+        for clique in self._cliques:
+            size = 1
+            for variable in clique:
+                size *= domain_sizes[variable]
+            if size > DenseFactor.max_size:
+                self.log.debug("clique of size %i, cannot use the junction tree" % size)
+                self._cliques = []
+                return
+
+        self._neighbours = CliqueTree._connect(self._cliques)
+
+        assigned_factors = [[] for _ in self._cliques]
+        for factor in factors:
+            variables = factor.get_variables()
+            candidates = [i for i, clique in enumerate(self._cliques) if variables <= clique]
+            assigned_factors[min(candidates, key=lambda i: len(self._cliques[i]))].append(factor)
+        self._potentials = [CliqueTree._product(clique_factors) for clique_factors in assigned_factors]
+
+        self._calibrate()
+
+    def is_valid(self, network, evidence):
+        """
+        Returns true if the tree was calibrated on the current version of the network
+        and for the evidence.
+
+        :param network: the Bayesian network
+        :param evidence: the evidence
+        :return: true if the tree is valid, false otherwise
+        """
+        return self._version == NetworkVersion(network, evidence)
+
+    def get_cliques(self):
+        """
+        Returns the cliques of the tree.
+
+        :return: the list of cliques (as frozen sets of variables)
+        """
+        return list(self._cliques)
+
+    def get_marginal(self, variables):
+        """
+        Returns the (unnormalised) marginal factor of the variables, computed from the
+        belief of the smallest clique that includes them.
+
+        :param variables: the variables
+        :return: the marginal factor, or None if the variables are not included in a
+                 single clique
+        """
+        if len(variables) == 0:
+            return None
+
+        candidates = sorted((i for i, clique in enumerate(self._cliques) if variables <= clique),
+                            key=lambda i: len(self._cliques[i]))
+        for i in candidates:
+            belief = self._get_belief(i)
+            if variables <= belief.get_variables():
+                for variable in belief.get_variables() - variables:
+                    belief = belief.sum_out(variable)
+                return belief
+        return None
+
+    def _get_belief(self, i):
+        """
+        Returns the belief of the clique, defined as the product of its potential and
+        of its incoming messages.
+
+        :param i: the index of the clique
+        :return: the belief of the clique
+        """
+        if i not in self._beliefs:
+            factors = [self._potentials[i]] + [self._messages[(j, i)] for j in self._neighbours[i]]
+            self._beliefs[i] = CliqueTree._product(factors)
+        return self._beliefs[i]
+
+    def _calibrate(self):
+        """
+        Calibrates the tree by passing the messages from the leaves to the root of
+        each tree of the forest, and then back from the root to the leaves.
+        """
+        visited = set()
+        for root in range(len(self._cliques)):
+            if root in visited:
+                continue
+
+            # depth-first ordering of the edges of the tree, from the root
+            edges = []
+            visited.add(root)
+            stack = [root]
+            while len(stack) > 0:
+                i = stack.pop()
+                for j in self._neighbours[i]:
+                    if j not in visited:
+                        visited.add(j)
+                        edges.append((i, j))
+                        stack.append(j)
+
+            for parent, child in reversed(edges):
+                self._messages[(child, parent)] = self._compute_message(child, parent)
+            for parent, child in edges:
+                self._messages[(parent, child)] = self._compute_message(parent, child)
+
+    def _compute_message(self, i, j):
+        """
+        Computes the message from one clique to a neighbouring clique, by summing out
+        from the product of the clique potential and of the other incoming messages
+        the variables that are not in the separator.
+
+        :param i: the index of the sending clique
+        :param j: the index of the receiving clique
+        :return: the message
+        """
+        factors = [self._potentials[i]] + [self._messages[(k, i)] for k in self._neighbours[i] if k != j]
+        message = CliqueTree._product(factors)
+
+        separator = self._cliques[i] & self._cliques[j]
+        for variable in message.get_variables() - separator:
+            message = message.sum_out(variable)
+
+        # the messages are normalised to avoid underflows in large trees
+        if not message.is_empty():
+            try:
+                message.normalize()
+            except ValueError:
+                pass
+        return message
+
+    @staticmethod
+    def _product(factors):
+        """
+        Computes the pointwise product of the dense factors.
+
+        :param factors: the factors
+        :return: the product (a unit factor if the list is empty)
+        """
+        if len(factors) == 0:
+            unit_factor = DoubleFactor()
+            unit_factor.add_entry(Assignment(), 1., 0.)
+            return DenseFactor(unit_factor)
+
+        product = factors[0]
+        for factor in factors[1:]:
+            product = product.product(factor)
+        return product
+
+    @staticmethod
+    def _eliminate(factors, domain_sizes):
+        """
+        Extracts the cliques of a triangulation of the moral graph of the factors, by
+        eliminating the variables one by one. The next variable to eliminate is the
+        one adding the fewest edges to the graph, and then the one yielding the
+        smallest clique.
+
+        :param factors: the factors
+        :param domain_sizes: the domain size of each variable
+        :return: the list of maximal cliques (as frozen sets of variables)
+        """
+        neighbours = {variable: set() for variable in domain_sizes}
+        for factor in factors:
+            variables = factor.get_variables()
+            for variable in variables:
+                neighbours[variable].update(variables)
+                neighbours[variable].discard(variable)
+
+        def get_cost(variable):
+            variable_neighbours = list(neighbours[variable])
+            fill_in = 0
+            for k, neighbour in enumerate(variable_neighbours):
+                fill_in += sum(1 for other in variable_neighbours[k + 1:] if other not in neighbours[neighbour])
+            size = domain_sizes[variable]
+            for neighbour in variable_neighbours:
+                size *= domain_sizes[neighbour]
+            return fill_in, size, variable
+
+        cliques = []
+        while len(neighbours) > 0:
+            variable = min(neighbours, key=get_cost)
+            clique = frozenset(neighbours[variable] | {variable})
+            for neighbour in neighbours[variable]:
+                neighbours[neighbour].update(neighbours[variable])
+                neighbours[neighbour].discard(neighbour)
+                neighbours[neighbour].discard(variable)
+            del neighbours[variable]
+
+            if not any(clique <= other_clique for other_clique in cliques):
+                cliques.append(clique)
+
+        return cliques
+
+    @staticmethod
+    def _connect(cliques):
+        """
+        Connects the cliques by a maximum spanning tree (or forest) over the sizes of
+        their separators, which ensures the running intersection property.
+
+        :param cliques: the cliques
+        :return: the list of neighbours of each clique
+        """
+        edges = []
+        for i in range(len(cliques)):
+            for j in range(i + 1, len(cliques)):
+                separator_size = len(cliques[i] & cliques[j])
+                if separator_size > 0:
+                    edges.append((separator_size, i, j))
+        edges.sort(key=lambda edge: -edge[0])
+
+        parents = list(range(len(cliques)))
+
+        def find(i):
+            while parents[i] != i:
+                parents[i] = parents[parents[i]]
+                i = parents[i]
+            return i
+
+        neighbours = [[] for _ in cliques]
+        for _, i, j in edges:
+            root1 = find(i)
+            root2 = find(j)
+            if root1 != root2:
+                parents[root1] = root2
+                neighbours[i].append(j)
+                neighbours[j].append(i)
+
+        return neighbours
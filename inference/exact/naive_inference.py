@@ -2,8 +2,6 @@ import logging
 import math
 from collections import OrderedDict, Collection
 
-from multipledispatch import dispatch
-
 from bn.b_network import BNetwork
 from bn.distribs.distribution_builder import ConditionalTableBuilder as ConditionalTableBuilder, MultivariateTableBuilder as MultivariateTableBuilder
 from bn.distribs.utility_table import UtilityTable
@@ -11,6 +9,7 @@ from bn.nodes.chance_node import ChanceNode
 from datastructs.assignment import Assignment
 from inference.inference_algorithm import InferenceAlgorithm
 from inference.query import ProbQuery, UtilQuery, ReduceQuery
+from utils.dispatch_utils import dispatch
 from utils.inference_utils import InferenceUtils
 
 dispatch_namespace = dict()
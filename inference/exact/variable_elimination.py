@@ -2,8 +2,6 @@ import logging
 from collections import Collection
 from copy import copy
 
-from multipledispatch import dispatch
-
 from bn.b_network import BNetwork
 from bn.distribs.distribution_builder import CategoricalTableBuilder as CategoricalTableBuilder, ConditionalTableBuilder as ConditionalTableBuilder, MultivariateTableBuilder as MultivariateTableBuilder
 from bn.distribs.utility_table import UtilityTable
@@ -11,15 +9,19 @@ from bn.nodes.action_node import ActionNode
 from bn.nodes.b_node import BNode
 from bn.nodes.chance_node import ChanceNode
 from bn.nodes.utility_node import UtilityNode
-from datastructs.assignment import Assignment
+from datastructs.assignment import Assignment, FrozenAssignment
+from inference.exact.dense_factor import DenseFactor
 from inference.exact.double_factor import DoubleFactor
 from inference.inference_algorithm import InferenceAlgorithm
 from inference.query import ProbQuery, UtilQuery, Query, ReduceQuery
+from utils.dispatch_utils import dispatch
 
 
 class VariableElimination(InferenceAlgorithm):
     """
-    Implementation of the Variable Elimination algorithm.
+    Implementation of the Variable Elimination algorithm. The factors are encoded as
+    dense arrays (see DenseFactor), and converted to sparse double factors when their
+    product would exceed the maximum size of a dense factor.
     """
 
     log = logging.getLogger('PyOpenDial')
@@ -119,6 +121,23 @@ class VariableElimination(InferenceAlgorithm):
     def _make_factor(self, node, evidence):
         """
         Creates a new factor given the probability distribution defined in the
+        Bayesian node, and the evidence (which needs to be matched). The factor is
+        dense, unless its entries assign distinct variables.
+
+        :param node: the Bayesian node
+        :param evidence: the evidence
+        :return: the factor for the node
+        """
+        sparse_factor = self._make_sparse_factor(node, evidence)
+        try:
+            return DenseFactor(sparse_factor)
+        except ValueError:
+            return sparse_factor
+
+    @dispatch(BNode, Assignment)
+    def _make_sparse_factor(self, node, evidence):
+        """
+        Creates a new sparse factor given the probability distribution defined in the
         Bayesian node, and the evidence (which needs to be matched)
 
         :param node: the Bayesian node
@@ -127,10 +146,10 @@ class VariableElimination(InferenceAlgorithm):
         """
         factor = DoubleFactor()
         flat_table = node.get_factor()
+        evidence_vars = evidence.get_variables()
         for assignment in flat_table.keys():
             if assignment.consistent_with(evidence):
-                assignment2 = Assignment(assignment)
-                assignment2.remove_pairs(evidence.get_variables())
+                assignment2 = assignment.get_pruned(evidence_vars)
 
                 if isinstance(node, ChanceNode) or isinstance(node, ActionNode):
                     factor.add_entry(assignment2, flat_table[assignment], 0.)
@@ -177,8 +196,7 @@ class VariableElimination(InferenceAlgorithm):
         """
         sum_factor = DoubleFactor()
         for assignment in factor.get_values():
-            reduced_assignment = Assignment(assignment)
-            reduced_assignment.remove_pair(node_id)
+            reduced_assignment = assignment.get_pruned([node_id])
             entry = factor.get_entry(assignment)
             prob = entry[0]
             utility = entry[1]
@@ -187,6 +205,17 @@ class VariableElimination(InferenceAlgorithm):
         sum_factor.normalize_util()
         return sum_factor
 
+    @dispatch(str, DenseFactor)
+    def _sum_out_dependent(self, node_id, factor):
+        """
+        Sums out the variable from the given dense factor, and returns the result
+
+        :param node_id: the Bayesian node corresponding to the variable
+        :param factor: the factor to sum out
+        :return: the summed out factor
+        """
+        return factor.sum_out(node_id)
+
     @dispatch(list)
     def _point_wise_product(self, factors):
         """
@@ -198,12 +227,23 @@ class VariableElimination(InferenceAlgorithm):
         if len(factors) == 0:
             factor = DoubleFactor()
             factor.add_entry(Assignment(), 1., 0.)
-            return factor
+            return DenseFactor(factor)
         elif len(factors) == 1:
             return factors[0]
 
         factor = factors.pop(0)
         for f in factors:
+            if isinstance(factor, DenseFactor) and isinstance(f, DenseFactor) \
+                    and factor.get_product_size(f) <= DenseFactor.max_size:
+                factor = factor.product(f)
+                continue
+
+            # falls back on sparse factors if the dense product is too large
+            if isinstance(factor, DenseFactor):
+                factor = factor.to_double_factor()
+            if isinstance(f, DenseFactor):
+                f = f.to_double_factor()
+
             temp_factor = DoubleFactor()
             shared_vars = set(f.get_variables()).intersection(factor.get_variables())
 
@@ -216,7 +256,7 @@ class VariableElimination(InferenceAlgorithm):
                         product = prob * prob2
                         sum = utility + utility2
 
-                        temp_factor.add_entry(Assignment([assignment, assignment2]), product, sum)
+                        temp_factor.add_entry(FrozenAssignment([assignment, assignment2]), product, sum)
 
             factor = temp_factor
 
@@ -240,7 +280,7 @@ class VariableElimination(InferenceAlgorithm):
         if len(inter) > 0:
             new_factor = DoubleFactor()
             for assignment in factor.get_assignments():
-                assignment2 = Assignment([assignment, evidence])
+                assignment2 = assignment.union(evidence)
                 prob, utility = factor.get_entry(assignment)
                 new_factor.add_entry(assignment2, prob, utility)
 
@@ -248,6 +288,27 @@ class VariableElimination(InferenceAlgorithm):
 
         return factor
 
+    @dispatch(DenseFactor, Query)
+    def _add_evidence_pairs(self, factor, query):
+        """
+        In case of overlap between the query variables and the evidence (this happens
+        when a variable specified in the evidence also appears in the query), extends
+        the distribution to add the evidence assignment pairs.
+
+        :param factor: the factor
+        :param query: the query
+        :return: updated factor
+        """
+        inter = set(query.get_query_vars())
+        inter.intersection_update(query.get_evidence().get_variables())
+        evidence = query.get_evidence().get_trimmed(inter)
+
+        if len(inter) > 0:
+            new_factor = DenseFactor(factor)
+            new_factor.extend_entries(evidence)
+            return new_factor
+
+        return factor
 
     @dispatch(BNetwork, Collection, Assignment)
     def reduce(self, network, query_vars, evidence):
@@ -293,7 +354,7 @@ class VariableElimination(InferenceAlgorithm):
 
         return reduced_network
 
-    @dispatch(DoubleFactor, str, set)
+    @dispatch((DoubleFactor, DenseFactor), str, set)
     def _get_relevant_factor(self, full_factor, head_var, input_vars):
         """
         Returns the factor associated with the probability/utility distribution for
@@ -315,7 +376,7 @@ class VariableElimination(InferenceAlgorithm):
 
         return factor
 
-    @dispatch(str, DoubleFactor)
+    @dispatch(str, (DoubleFactor, DenseFactor))
     def _create_prob_distribution(self, head_var, factor):
         """
         Creates the probability distribution for the given variable, as described by
@@ -2,11 +2,10 @@ import abc
 from collections import Collection
 import logging
 
-from multipledispatch import dispatch
-
 from bn.b_network import BNetwork
 from datastructs.assignment import Assignment
 from inference.query import ProbQuery, UtilQuery, ReduceQuery
+from utils.dispatch_utils import dispatch
 
 
 class InferenceAlgorithm:
@@ -1,11 +1,10 @@
 import logging
 from collections import Collection
 
-from multipledispatch import dispatch
-
 from bn.b_network import BNetwork
 from bn.nodes.utility_node import UtilityNode
 from datastructs.assignment import Assignment
+from utils.dispatch_utils import dispatch
 
 
 class Query:
@@ -1,16 +1,17 @@
 import logging
 from collections import Collection
 
-from multipledispatch import dispatch
-
 from bn.b_network import BNetwork
 from bn.distribs.continuous_distribution import ContinuousDistribution
 from bn.nodes.chance_node import ChanceNode
 from datastructs.assignment import Assignment
 from inference.approximate.sampling_algorithm import SamplingAlgorithm
+from inference.exact.junction_tree import JunctionTree, NetworkVersion
 from inference.exact.variable_elimination import VariableElimination
 from inference.inference_algorithm import InferenceAlgorithm
 from inference.query import ProbQuery, ReduceQuery, UtilQuery, Query
+from utils.dispatch_utils import dispatch
+from utils.instrumentation import Instrumentation
 
 
 class SwitchingAlgorithm(InferenceAlgorithm):
@@ -25,17 +26,25 @@ class SwitchingAlgorithm(InferenceAlgorithm):
 
     If one of these threshold is exceeded or if the Bayesian network contains a
     continuous distribution, the selected algorithm will be likelihood weighting.
-    Variable elimination is selected in the remaining cases.
+    Variable elimination is selected in the remaining cases, except for the
+    probability queries repeated on an unchanged network (with the same evidence),
+    which are answered by the junction tree algorithm: the tree is calibrated once
+    for the network, and then reused by the following queries.
     """
 
     log = logging.getLogger('PyOpenDial')
 
     max_branching_factor = 10
     max_nr_values = 5000
-    
+
+    # number of successive probability queries on an unchanged network from which the
+    # junction tree algorithm is selected (None to never select it)
+    junction_tree_queries = 2
+
     def __init__(self):
         self._ve = VariableElimination()
         self._lw = SamplingAlgorithm()
+        self._jt = JunctionTree()
 
     @dispatch(BNetwork, Collection, Assignment)
     def query_prob(self, network, query_vars, evidence):
@@ -63,7 +72,8 @@ class SwitchingAlgorithm(InferenceAlgorithm):
         :return: the inference result
         """
         algorithm = self.select_best_algorithm(query)
-        return algorithm.query_prob(query)
+        with self._measure('query_prob', query, algorithm):
+            return algorithm.query_prob(query)
 
     @dispatch(BNetwork, Collection, Assignment)
     def query_util(self, network, query_vars, evidence):
@@ -91,7 +101,8 @@ class SwitchingAlgorithm(InferenceAlgorithm):
         :return: the inference result
         """
         algorithm = self.select_best_algorithm(query)
-        return algorithm.query_util(query)
+        with self._measure('query_util', query, algorithm):
+            return algorithm.query_util(query)
 
     @dispatch(BNetwork, Collection, Assignment)
     def reduce(self, network, query_vars, evidence):
@@ -118,23 +129,95 @@ class SwitchingAlgorithm(InferenceAlgorithm):
         :return: the reduced network
         """
         algorithm = self.select_best_algorithm(query)
-        result = algorithm.reduce(query)
+        with self._measure('reduce', query, algorithm):
+            result = algorithm.reduce(query)
         return result
 
     @dispatch(Query)
     def select_best_algorithm(self, query):
-        for node in query.get_filtered_sorted_nodes():
+        if SwitchingAlgorithm._requires_sampling(query.get_filtered_sorted_nodes()):
+            return self._lw
+        if isinstance(query, ProbQuery) and SwitchingAlgorithm._is_repeated(query):
+            return self._jt
+
+        return self._ve
+
+    @staticmethod
+    def _requires_sampling(nodes):
+        """
+        Returns true if one of the nodes exceeds the thresholds of the exact inference
+        (or has a continuous distribution).
+
+        :param nodes: the nodes involved in the inference
+        :return: true if the inference must be approximate, false otherwise
+        """
+        for node in nodes:
             if len(node.get_input_node_ids()) > SwitchingAlgorithm.max_branching_factor:
-                return self._lw
+                return True
             if isinstance(node, ChanceNode):
                 if isinstance(node.get_distrib(), ContinuousDistribution):
-                    return self._lw
+                    return True
 
                 nr_values = node.get_nb_values()
                 for chance_node in node.get_input_nodes(ChanceNode):
                     nr_values *= chance_node.get_nb_values()
 
                 if nr_values > SwitchingAlgorithm.max_nr_values:
-                    return self._lw
+                    return True
 
-        return self._ve
+        return False
+
+    @staticmethod
+    def _is_repeated(query):
+        """
+        Returns true if the probability query should be answered by the junction tree
+        algorithm, that is, if a junction tree is already calibrated for its network
+        and evidence, or if the last queries were made on the same (unchanged)
+        network and the whole network is tractable for the exact inference.
+
+        :param query: the probability query
+        :return: true if the junction tree algorithm should be selected
+        """
+        if SwitchingAlgorithm.junction_tree_queries is None:
+            return False
+
+        network = query.get_network()
+        evidence = query.get_evidence()
+        if JunctionTree.is_calibrated(network, evidence):
+            return True
+
+        version = NetworkVersion(network, evidence)
+        last_queries = network.get_last_queries()
+        nr_queries = last_queries[1] + 1 if last_queries is not None and last_queries[0] == version else 1
+        network.set_last_queries((version, nr_queries))
+
+        return nr_queries >= SwitchingAlgorithm.junction_tree_queries \
+            and not SwitchingAlgorithm._requires_sampling(network.get_nodes())
+
+    @staticmethod
+    def _measure(query_type, query, algorithm):
+        """
+        Returns the instrumentation context manager for an inference call, with the
+        selected algorithm and the sizes of the node factors (the number of
+        combinations of values of each chance node and its parents).
+
+        :param query_type: the type of query ('query_prob', 'query_util' or 'reduce')
+        :param query: the query
+        :param algorithm: the selected algorithm
+        :return: the context manager
+        """
+        if not Instrumentation.enabled:
+            return Instrumentation.measure('inference', query_type)
+
+        nodes = query.get_filtered_sorted_nodes()
+        factor_sizes = []
+        for node in nodes:
+            if isinstance(node, ChanceNode) and not isinstance(node.get_distrib(), ContinuousDistribution):
+                nr_values = node.get_nb_values()
+                for chance_node in node.get_input_nodes(ChanceNode):
+                    nr_values *= chance_node.get_nb_values()
+                factor_sizes.append(nr_values)
+
+        return Instrumentation.measure('inference', query_type, algorithm=type(algorithm).__name__,
+                                       nb_nodes=len(nodes), max_factor_size=max(factor_sizes, default=0),
+                                       total_factor_size=sum(factor_sizes))
@@ -6,6 +6,7 @@ Some of the possible properties are:
 --domain path/to/domain/file: dialogue domain file
 --dialogue path/to/recorded/dialogue: dialogue file to import
 --simulator path/to/simulator/file: domain file for the simulator
+--domain_cache path/to/cache/directory: directory of the compiled domains
 """
 import argparse
 import logging
@@ -13,16 +14,20 @@ import os
 
 from dialogue_system import DialogueSystem
 from modules.simulation.simulator import Simulator
-from plugins.GoogleSTT import GoogleSTT
-from plugins.GoogleTTS import GoogleTTS
+from readers.domain_cache import DomainCache
 from readers.xml_domain_reader import XMLDomainReader
 
 parser = argparse.ArgumentParser()
 parser.add_argument('--domain', type=str, help='domain file path')
 # parser.add_argument('--dialogue', type=str, help='dialogue file path')
 parser.add_argument('--simulator', type=str, help='simulator file path')
+parser.add_argument('--domain_cache', type=str,
+                    help='directory of the compiled domains (must not be writable by untrusted users)')
 args = parser.parse_args()
 
+if args.domain_cache:
+    DomainCache.cache_dir = args.domain_cache
+
 # Set logger
 logger = logging.getLogger('PyOpenDial')
 logger.setLevel(logging.DEBUG)
@@ -52,6 +57,8 @@ system.change_settings(settings)
 
 if os.path.exists(settings.GOOGLE_APPLICATION_CREDENTIALS):
     os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = settings.GOOGLE_APPLICATION_CREDENTIALS
+    from plugins.GoogleSTT import GoogleSTT
+    from plugins.GoogleTTS import GoogleTTS
     system.attach_module(GoogleSTT(system))
     system.attach_module(GoogleTTS(system))
     print('Google SST/TTS modules are attached.')
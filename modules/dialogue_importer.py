@@ -3,11 +3,10 @@ import logging
 from threading import Thread
 from time import sleep
 
-from multipledispatch import dispatch
-
 from dialogue_state import DialogueState
 from modules.dialogue_recorder import DialogueRecorder
 from modules.forward_planner import ForwardPlanner
+from utils.dispatch_utils import dispatch
 
 
 class DialogueImporter(Thread):
@@ -2,10 +2,9 @@ import logging
 import xml.etree.ElementTree as ET
 from collections import Collection
 
-from multipledispatch import dispatch
-
 from dialogue_state import DialogueState
 from modules.module import Module
+from utils.dispatch_utils import dispatch
 from utils.xml_utils import XMLUtils
 
 
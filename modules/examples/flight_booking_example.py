@@ -1,10 +1,9 @@
 import logging
 from collections import Collection
 
-from multipledispatch import dispatch
-
 from dialogue_state import DialogueState
 from modules.module import Module
+from utils.dispatch_utils import dispatch
 
 
 class FlightBookingExample(Module):
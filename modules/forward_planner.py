@@ -1,15 +1,15 @@
 import logging
+import threading
 from collections import Collection
 from copy import copy
 
-from multipledispatch import dispatch
-
 from bn.distribs.distribution_builder import MultivariateTableBuilder
 from bn.distribs.utility_table import UtilityTable
 from datastructs.assignment import Assignment
 from dialogue_state import DialogueState
 from modules.module import Module
 from settings import Settings
+from utils.dispatch_utils import dispatch
 
 
 class ForwardPlanner(Module):
@@ -38,9 +38,6 @@ class ForwardPlanner(Module):
     # Minimum probability for the generated observations
     min_observation_prob = 0.1
 
-    # TODO: ScheduledExecutorService
-    # service = Executors.newScheduledThreadPool(2);
-
     def __init__(self, system):
         from dialogue_system import DialogueSystem
         if not isinstance(system, object): # object: DialogueSystem
@@ -97,6 +94,8 @@ class PlannerProcess:
     @author Pierre Lison (plison@ifi.uio.no)
     """
 
+    log = logging.getLogger('PyOpenDial')
+
     def __init__(self, init_state, system, paused):
         from dialogue_system import DialogueSystem
         if not isinstance(init_state, DialogueState) or not isinstance(system, DialogueSystem) or not isinstance(paused, bool):
@@ -104,7 +103,7 @@ class PlannerProcess:
 
         """
         Creates the planning process. Timeout is set to twice the maximum sampling
-        ime. Then, runs the planner until the horizon has been reached, or the
+        time. Then, runs the planner until the horizon has been reached, or the
         planner has run out of time. Adds the best action to the dialogue state.
 
         :param init_state: initial dialogue state
@@ -122,11 +121,15 @@ class PlannerProcess:
         if init_state.has_chance_node(settings.user_speech):
             timeout = timeout / 5.0
 
-        # TODO: ScheduledExecutorService
-        # service.schedule(() -> isTerminated = true, timeout, TimeUnit.MILLISECONDS);
+        timer = threading.Timer(timeout / 1000., self.terminate)
+        timer.daemon = True
+        timer.start()
 
         # step 1: extract the Q-values
-        eval_actions = self.get_q_values(init_state, settings.horizon)
+        try:
+            eval_actions = self.get_anytime_q_values(init_state, settings.horizon)
+        finally:
+            timer.cancel()
 
         # step 2: find the action with highest utility
         best_action = eval_actions.get_best()[0]
@@ -142,6 +145,39 @@ class PlannerProcess:
         init_state.add_to_state(best_action.remove_primes())
         self.is_terminated = True
 
+    def terminate(self):
+        """
+        Terminates the planning process. The lookahead is then interrupted, and the
+        planner returns the best action found so far.
+        """
+        self.is_terminated = True
+
+    @dispatch(DialogueState, int)
+    def get_anytime_q_values(self, state, horizon):
+        """
+        Returns the Q-values for the dialogue state, by iteratively deepening the
+        lookahead up to the planning horizon. The Q-values of a given horizon are only
+        retained if their computation was completed before the termination of the
+        process, so that the planner always returns the Q-values of the deepest
+        complete lookahead.
+
+        :param state: the dialogue state
+        :param horizon: the planning horizon
+        :return: the estimated utility table for the Q-values
+        """
+        q_values = self.get_q_values(state, 1)
+        for cur_horizon in range(2, horizon + 1):
+            if self.is_terminated:
+                break
+
+            new_q_values = self.get_q_values(state, cur_horizon)
+            if self.is_terminated:
+                self.log.debug("planning interrupted at horizon %d" % cur_horizon)
+                break
+            q_values = new_q_values
+
+        return q_values
+
     @dispatch(DialogueState, int)
     def get_q_values(self, state, horizon):
         """
@@ -195,11 +231,10 @@ class PlannerProcess:
             to_process = state.get_new_variables()
             state.reduce()
 
-            for model in self.system.get_domain().get_models():
-                if model.is_triggered(state, to_process):
-                    change = model.trigger(state)
-                    if change and model.is_blocking():
-                        break
+            for model in self.system.get_domain().get_triggered_models(to_process):
+                change = self.system.trigger_model(model, state)
+                if change and model.is_blocking():
+                    break
 
     @dispatch(Assignment)
     def has_transition(self, action):
@@ -210,10 +245,7 @@ class PlannerProcess:
         :param action: the assignment of action values.
         :return: true if a transition is defined, false otherwise.
         """
-        for m in self.system.get_domain().get_models():
-            if m.is_triggered(action.remove_primes().get_variables()):
-                return True
-        return False
+        return len(self.system.get_domain().get_triggered_models(action.remove_primes().get_variables())) > 0
 
     @dispatch(DialogueState, int)
     def get_expected_value(self, state, horizon):
@@ -229,6 +261,9 @@ class PlannerProcess:
         expected_value = 0.0
 
         for obs in nbest_obs.get_values():
+            if self.is_terminated:
+                break
+
             obs_prob = nbest_obs.get_prob(obs)
             if obs_prob > ForwardPlanner.min_observation_prob:
                 state_copy = copy(state)
@@ -1,4 +1,5 @@
 import logging
+import threading
 from copy import copy
 from math import *
 from random import *
@@ -124,9 +125,10 @@ class ActionNode():
 
 
 class MCTS():
-    def __init__(self, init_state, system):
+    def __init__(self, init_state, system, process=None):
         self.root = init_state
         self.system = system
+        self.process = process
         self.simulation_count = system.get_settings().mcts_simulation_count
         self.max_depth = system.get_settings().horizon - 1
         self.gamma = system.get_settings().discount_factor
@@ -201,11 +203,10 @@ class MCTS():
         while len(state.get_new_variables()) > 0:
             to_process = state.get_new_variables()
             state.reduce()
-            for model in self.system.get_domain().get_models():
-                if model.is_triggered(state, to_process):
-                    change = model.trigger(state)
-                    if change and model.is_blocking():
-                        break
+            for model in self.system.get_domain().get_triggered_models(to_process):
+                change = self.system.trigger_model(model, state)
+                if change and model.is_blocking():
+                    break
 
     def rollout(self, state_node, depth):
         # print('ROLLOUT(%d): %s' % (depth, str(state_node)))
@@ -267,8 +268,24 @@ class MCTS():
             R = reward + self.gamma *  self.rollout(next_state_node, depth+1)
             return R
 
+    def is_terminated(self):
+        """
+        :return: true if the planning process has been terminated, false otherwise.
+        """
+        return self.process is not None and self.process.is_terminated
+
     def search(self):
+        """
+        Runs the simulations until the simulation count has been reached, or the
+        planning process has been terminated. If no simulation could be completed,
+        the best action is selected according to the immediate rewards.
+
+        :return: the best action
+        """
         for i in range(self.simulation_count):
+            if self.is_terminated():
+                logger.debug("planning interrupted after %d simulations" % i)
+                break
             self.simulate(self.root, 0)
 
         best_action = self.root.get_best_child().action
@@ -329,7 +346,7 @@ class PlannerProcess():
     def __init__(self, init_state, system, paused):
         """
         Creates the planning process. Timeout is set to twice the maximum sampling
-        ime. Then, runs the planner for the number of simulations, or the
+        time. Then, runs the planner for the number of simulations, or the
         planner has run out of time. Adds the best action to the dialogue state.
 
         :param init_state: initial dialogue state
@@ -347,13 +364,20 @@ class PlannerProcess():
         if init_state.has_chance_node(settings.user_speech):
             timeout = timeout / 5.0
 
+        timer = threading.Timer(timeout / 1000., self.terminate)
+        timer.daemon = True
+        timer.start()
+
         # step 1: find the best action with mcts
-        state_copy = copy(init_state)
+        try:
+            state_copy = copy(init_state)
 
-        init_state_node = StateNode(state_copy)
+            init_state_node = StateNode(state_copy)
 
-        planner = MCTS(init_state_node, self.system)
-        best_action = planner.search()
+            planner = MCTS(init_state_node, self.system, self)
+            best_action = planner.search()
+        finally:
+            timer.cancel()
 
         # step 2: remove the action and utility nodes
         init_state.remove_nodes(init_state.get_utility_node_ids())
@@ -363,3 +387,10 @@ class PlannerProcess():
         # step 3: add the selection action to the dialogue state
         init_state.add_to_state(best_action.remove_primes())
         self.is_terminated = True
+
+    def terminate(self):
+        """
+        Terminates the planning process. The search is then interrupted, and the
+        planner returns the best action found so far.
+        """
+        self.is_terminated = True
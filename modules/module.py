@@ -1,9 +1,8 @@
 import abc
 from collections import Collection
 
-from multipledispatch import dispatch
-
 from dialogue_state import DialogueState
+from utils.dispatch_utils import dispatch
 
 
 class Module:
@@ -1,9 +1,8 @@
 import logging
 from enum import Enum, auto
 
-from multipledispatch import dispatch
-
 from modules.module import Module
+from utils.dispatch_utils import dispatch
 
 
 class MessageType(Enum):
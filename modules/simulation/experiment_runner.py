@@ -0,0 +1,307 @@
+import csv
+import json
+import logging
+import multiprocessing
+import random
+from collections import Collection
+from time import time
+
+import numpy as np
+
+from bn.values.value_factory import ValueFactory
+from dialogue_state import DialogueState
+from modules.forward_planner import ForwardPlanner
+from modules.mcts_planner import MCTSPlanner
+from modules.module import Module
+from modules.simulation.simulator import Simulator
+from readers.xml_domain_reader import XMLDomainReader
+from utils.dispatch_utils import dispatch
+
+
+class TurnCounter(Module):
+    """
+    Module counting the system turns (that is, the non-empty system outputs) produced
+    by the dialogue system.
+    """
+
+    def __init__(self, system):
+        from dialogue_system import DialogueSystem
+        if not isinstance(system, DialogueSystem):
+            raise NotImplementedError("UNDEFINED PARAMETERS")
+
+        self._system = system
+        self._nb_turns = 0
+
+    def start(self):
+        """
+        Does nothing.
+        """
+        pass
+
+    @dispatch(bool)
+    def pause(self, to_pause):
+        """
+        Does nothing.
+        """
+        pass
+
+    def is_running(self):
+        """
+        Returns true.
+        """
+        return True
+
+    @dispatch(DialogueState, Collection)
+    def trigger(self, state, updated_vars):
+        """
+        Increments the turn counter if the system output has been updated with a
+        non-empty value.
+
+        :param state: the dialogue state
+        :param updated_vars: the set of updated variables
+        """
+        output_var = self._system.get_settings().system_output
+        if output_var in updated_vars and state.has_chance_node(output_var):
+            if state.query_prob(output_var).get_best() != ValueFactory.none():
+                self._nb_turns += 1
+
+    def get_nb_turns(self):
+        """
+        Returns the number of system turns counted so far.
+
+        :return: the number of system turns
+        """
+        return self._nb_turns
+
+
+class ExperimentRunner:
+    """
+    Runner for batches of simulated dialogues. The dialogue domain (and the domain of
+    the user simulator, if any) is loaded once per process, and each dialogue is then
+    run with a new dialogue system, either in the current process or across a pool of
+    worker processes. The outcome of each dialogue is collected as a structured record
+    with the fields listed in ExperimentRunner.fields, which can be written to a JSONL
+    or CSV file.
+    """
+
+    # logger
+    log = logging.getLogger('PyOpenDial')
+
+    # fields of the dialogue records
+    fields = ['dialogue', 'seed', 'planner', 'length', 'reward', 'time_per_step', 'duration', 'error']
+
+    def __init__(self, domain_file, simulator_file=None, planner=None, max_turns=20):
+        """
+        Creates the experiment runner.
+
+        :param domain_file: the file of the dialogue domain
+        :param simulator_file: the file of the simulator domain (optional). Without
+                               simulator, a dialogue only consists of the turns
+                               produced upon starting the system.
+        :param planner: the planner to employ ('forward' or 'mcts'), or None to use the
+                        planner specified in the settings
+        :param max_turns: the maximum number of simulated turns per dialogue
+        """
+        if planner not in [None, 'forward', 'mcts']:
+            raise ValueError("Not supported planner: %s" % planner)
+
+        self.domain_file = domain_file
+        self.simulator_file = simulator_file
+        self.planner = planner
+        self.max_turns = max_turns
+
+        self._domain = None
+        self._simulator_domain = None
+
+    def get_domain(self):
+        """
+        Returns the dialogue domain, which is extracted upon the first call.
+
+        :return: the dialogue domain
+        """
+        if self._domain is None:
+            self._domain = XMLDomainReader.extract_domain(self.domain_file)
+        return self._domain
+
+    def get_simulator_domain(self):
+        """
+        Returns the domain of the simulator (or None if the runner has no simulator),
+        which is extracted upon the first call.
+
+        :return: the simulator domain
+        """
+        if self._simulator_domain is None and self.simulator_file is not None:
+            self._simulator_domain = XMLDomainReader.extract_domain(self.simulator_file)
+        return self._simulator_domain
+
+    def create_system(self):
+        """
+        Creates a new dialogue system for the domain, with the selected planner.
+
+        :return: the dialogue system
+        """
+        from dialogue_system import DialogueSystem
+        system = DialogueSystem(self.get_domain())
+        system.get_settings().show_gui = False
+
+        if self.planner is not None and self.planner != system.get_settings().planner:
+            system.detach_module(ForwardPlanner)
+            system.detach_module(MCTSPlanner)
+            system.attach_module(ForwardPlanner if self.planner == 'forward' else MCTSPlanner)
+            system.get_settings().planner = self.planner
+
+        return system
+
+    def run_dialogue(self, dialogue_id, seed):
+        """
+        Runs a single dialogue, and returns its record. Errors raised during the
+        dialogue are reported in the 'error' field of the record.
+
+        :param dialogue_id: the identifier of the dialogue
+        :param seed: the seed of the random number generators
+        :return: the dialogue record
+        """
+        random.seed(seed)
+        np.random.seed(seed)
+
+        record = dict.fromkeys(ExperimentRunner.fields)
+        record['dialogue'] = dialogue_id
+        record['seed'] = seed
+
+        start_time = time()
+        system = None
+        counter = None
+        try:
+            system = self.create_system()
+            record['planner'] = system.get_settings().planner
+            counter = TurnCounter(system)
+            system.attach_module(counter)
+
+            simulator = None
+            if self.simulator_file is not None:
+                simulator = Simulator(system, self.get_simulator_domain())
+
+            system.start_system()
+
+            if simulator is not None:
+                # the simulator is not attached to the system, so that the turns are
+                # performed synchronously rather than in separate threads
+                simulator.start()
+                output_var = system.get_settings().system_output
+                for turn in range(self.max_turns):
+                    state = system.get_state()
+                    system_action = ValueFactory.none()
+                    if state.has_chance_node(output_var):
+                        system_action = state.query_prob(output_var).get_best()
+
+                    if not simulator.perform_turn(system_action):
+                        break
+
+                record['reward'] = float(sum(simulator.get_rewards()))
+
+        except Exception as e:
+            self.log.warning("dialogue %d failed: %s" % (dialogue_id, e))
+            record['error'] = str(e)
+
+        finally:
+            if system is not None:
+                system.pause(True)
+
+        record['duration'] = time() - start_time
+        if counter is not None:
+            record['length'] = counter.get_nb_turns()
+            if record['length'] > 0:
+                record['time_per_step'] = record['duration'] / record['length']
+
+        return record
+
+    def run(self, nb_dialogues, nb_workers=1, output_file=None, seed=0):
+        """
+        Runs the dialogues, and returns their records (sorted by dialogue identifier).
+        The records are written to the output file as soon as the dialogues are
+        completed, in CSV if the file has a .csv extension, and in JSONL otherwise.
+
+        :param nb_dialogues: the number of dialogues to run
+        :param nb_workers: the number of worker processes (if 1, the dialogues are run
+                           in the current process)
+        :param output_file: the file in which to write the records (optional)
+        :param seed: the seed of the first dialogue, incremented for each dialogue
+        :return: the list of dialogue records
+        """
+        tasks = [(dialogue_id, seed + dialogue_id) for dialogue_id in range(nb_dialogues)]
+
+        pool = None
+        if nb_workers > 1:
+            pool = multiprocessing.Pool(nb_workers, initializer=_init_worker,
+                                        initargs=(self.domain_file, self.simulator_file, self.planner, self.max_turns))
+            results = pool.imap_unordered(_run_dialogue, tasks)
+        else:
+            results = (self.run_dialogue(dialogue_id, dialogue_seed) for dialogue_id, dialogue_seed in tasks)
+
+        output = None
+        writer = None
+        records = []
+        try:
+            if output_file is not None:
+                output = open(output_file, 'w', newline='')
+                if output_file.lower().endswith('.csv'):
+                    writer = csv.DictWriter(output, fieldnames=ExperimentRunner.fields)
+                    writer.writeheader()
+
+            for record in results:
+                records.append(record)
+                if writer is not None:
+                    writer.writerow(record)
+                elif output is not None:
+                    output.write(json.dumps(record) + '\n')
+                if output is not None:
+                    output.flush()
+
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+            if output is not None:
+                output.close()
+
+        records.sort(key=lambda record: record['dialogue'])
+        return records
+
+    @staticmethod
+    def summarize(records):
+        """
+        Returns the mean and the 95% confidence interval (twice the standard error) of
+        the reward, length and time per step over the successful dialogues.
+
+        :param records: the dialogue records
+        :return: dictionary mapping each field to a (mean, interval) pair
+        """
+        summary = dict()
+        for field in ['reward', 'length', 'time_per_step']:
+            values = [record[field] for record in records if record['error'] is None and record[field] is not None]
+            if len(values) == 0:
+                summary[field] = (None, None)
+            else:
+                summary[field] = (float(np.mean(values)), float(2 * np.std(values) / np.sqrt(len(values))))
+        return summary
+
+
+# experiment runner of the worker process
+_worker_runner = None
+
+
+def _init_worker(domain_file, simulator_file, planner, max_turns):
+    """
+    Initialises the experiment runner of a worker process.
+    """
+    global _worker_runner
+    _worker_runner = ExperimentRunner(domain_file, simulator_file, planner, max_turns)
+    _worker_runner.get_domain()
+    _worker_runner.get_simulator_domain()
+
+
+def _run_dialogue(task):
+    """
+    Runs a dialogue in a worker process.
+    """
+    return _worker_runner.run_dialogue(*task)
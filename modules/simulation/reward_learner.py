@@ -60,17 +60,18 @@ class RewardLearner(Module):
         for evidence_var in state.get_evidence().get_variables():
             if evidence_var.startswith('R(') and evidence_var.endswith(')'):
                 actual_action = Assignment.create_from_string(evidence_var[2:])
-                actual_utility = state.get_evidence.get_value(evidence_var).get_double()
+                actual_utility = state.get_evidence().get_value(evidence_var).get_double()
 
-                if actual_action.get_variables() in self.previous_states.keys():
-                    previous_state = self.previous_states[actual_action.get_variables()]
+                action_vars = frozenset(actual_action.get_variables())
+                if action_vars in self.previous_states:
+                    previous_state = self.previous_states[action_vars]
                     self.learn_from_feedback(previous_state, actual_action, actual_utility)
 
-                state.clear_evidence(evidence_var)
+                state.clear_evidence([evidence_var])
 
         if len(state.get_action_node_ids()) != 0:
             try:
-                self.previous_states[state.get_action_node_ids()] = copy(state)
+                self.previous_states[frozenset(state.get_action_node_ids())] = copy(state)
             except Exception as e:
                 self.log.warning("cannot copy state: " + str(e))
 
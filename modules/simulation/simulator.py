@@ -4,8 +4,6 @@ from collections import Collection
 from copy import copy
 from time import sleep
 
-from multipledispatch import dispatch
-
 from bn.values.value import Value
 from bn.values.value_factory import ValueFactory
 from datastructs.assignment import Assignment
@@ -14,6 +12,7 @@ from domains.domain import Domain
 from modules.module import Module
 from modules.simulation.reward_learner import RewardLearner
 from readers.xml_domain_reader import XMLDomainReader
+from utils.dispatch_utils import dispatch
 from utils.string_utils import StringUtils
 
 
@@ -58,6 +57,8 @@ class Simulator(Module):
         self.simulator_state.set_parameters(domain.get_parameters())
         self.system.change_settings(domain.get_settings())
 
+        self._rewards = []
+
         self._lock = threading.RLock()
 
     def start(self):
@@ -139,17 +140,17 @@ class Simulator(Module):
                 to_process = self.simulator_state.get_new_variables()
                 self.simulator_state.reduce()
 
-                for model in self.domain.get_models():
-                    if model.is_triggered(self.simulator_state, to_process):
-                        change = model.trigger(self.simulator_state)
-                        if change and model.is_blocking():
-                            break
+                for model in self.domain.get_triggered_models(to_process):
+                    change = model.trigger(self.simulator_state)
+                    if change and model.is_blocking():
+                        break
 
                 if len(self.simulator_state.get_utility_node_ids()) > 0:
                     reward = self.simulator_state.query_util()
+                    self._rewards.append(reward)
                     comment = 'Reward: ' + StringUtils.get_short_form(reward)
                     self.system.display_comment(comment)
-                    self.system.get_state().add_evidence(Assignment('R(' + system_assign.add_primes() + ')', reward))
+                    self.system.get_state().add_evidence(Assignment('R(' + str(system_assign.add_primes()) + ')', reward))
                     self.simulator_state.remove_nodes(self.simulator_state.get_utility_node_ids())
 
                 if self.add_new_observations():
@@ -158,6 +159,15 @@ class Simulator(Module):
                 self.simulator_state.add_evidence(self.simulator_state.get_sample())
             return turn_performed
 
+    def get_rewards(self):
+        """
+        Returns the rewards generated by the simulator since its creation, in the
+        order in which they were received by the dialogue system.
+
+        :return: the list of rewards
+        """
+        return list(self._rewards)
+
     def add_new_observations(self):
         """
         Generates new simulated observations and adds them to the dialogue state. The
@@ -2,8 +2,6 @@ import copy
 import logging
 from collections import Collection
 
-from multipledispatch import dispatch
-
 from bn.b_network import BNetwork
 from bn.distribs.categorical_table import CategoricalTable
 from bn.distribs.marginal_distribution import MarginalDistribution
@@ -14,6 +12,8 @@ from dialogue_state import DialogueState
 from domains.rules.distribs.anchored_rule import AnchoredRule
 from domains.rules.distribs.equivalence_distribution import EquivalenceDistribution
 from inference.switching_algorithm import SwitchingAlgorithm
+from utils.dispatch_utils import dispatch
+from utils.instrumentation import Instrumentation
 
 dispatch_namespace = dict()
 
@@ -40,18 +40,24 @@ class StatePruner:
         :param state: the state to prune
         """
         # step 1: selection of nodes to keep
-        nodes_to_keep = StatePruner.get_nodes_to_keep(state)
+        with Instrumentation.measure('prune', 'get_nodes_to_keep'):
+            nodes_to_keep = StatePruner.get_nodes_to_keep(state)
         if len(nodes_to_keep) > 0:
             # step 2: reduction
-            reduced = StatePruner.reduce(state, nodes_to_keep)
+            with Instrumentation.measure('prune', 'reduce'):
+                reduced = StatePruner.reduce(state, nodes_to_keep)
             # step 3: reinsert action and utility nodes (if necessary)
-            StatePruner.reinsert_action_and_utility_nodes(reduced, state)
+            with Instrumentation.measure('prune', 'reinsert_action_and_utility_nodes'):
+                StatePruner.reinsert_action_and_utility_nodes(reduced, state)
             # step 4: remove the primes from the identifiers
-            StatePruner.remove_primes(reduced)
+            with Instrumentation.measure('prune', 'remove_primes'):
+                StatePruner.remove_primes(reduced)
             # step 5: filter the distribution and remove and empty nodes
-            StatePruner.remove_spurious_nodes(reduced)
+            with Instrumentation.measure('prune', 'remove_spurious_nodes'):
+                StatePruner.remove_spurious_nodes(reduced)
             # step 6: and final reset the state to the reduced form
-            state.reset(reduced)
+            with Instrumentation.measure('prune', 'reset'):
+                state.reset(reduced)
         else:
             state.reset(BNetwork())
 
@@ -170,8 +176,12 @@ class StatePruner:
         for chance_node in new_state.get_chance_nodes():
             if chance_node.get_id() not in nodes_to_keep:
                 init_distrib = state.query_prob(chance_node.get_id(), False).to_discrete()
+                if init_distrib is chance_node.get_distrib():
+                    # the marginal distributions below may modify the distribution of the node
+                    init_distrib = chance_node.get_mutable_distrib()
                 for output_node in chance_node.get_output_nodes(ChanceNode):
-                    new_distrib = MarginalDistribution(output_node.get_distrib(), init_distrib)
+                    # the marginal distribution takes over (and may modify) the output distribution
+                    new_distrib = MarginalDistribution(output_node.get_mutable_distrib(), init_distrib)
                     output_node.set_distrib(new_distrib)
 
                 new_state.remove_node(chance_node.get_id())
@@ -0,0 +1,178 @@
+import hashlib
+import logging
+import os
+import pickle
+import re
+import tempfile
+from pathlib import Path
+
+from domains.model import Model
+from readers.xml_rule_reader import XMLRuleReader
+from settings import Settings
+
+
+class DomainCache:
+    """
+    Cache of compiled dialogue domains. Once extracted from its XML specification, a
+    domain (with its models, rules, initial state, parameters and settings) is pickled
+    in the cache directory, together with the content hashes of its source file and
+    imported files. The next extraction of the same file loads the compiled domain
+    instead of parsing the XML specification again, provided none of these files (nor
+    the Python sources of the package) has changed in the meantime (otherwise the
+    cached domain is stale and is replaced).
+
+    The cache is disabled by default, and is enabled by setting the cache directory.
+    Since loading a pickled file may execute arbitrary code, the cache directory must
+    not be writable by untrusted users.
+    """
+
+    # logger
+    log = logging.getLogger('PyOpenDial')
+
+    # directory of the compiled domains (None if the cache is disabled), which must
+    # not be writable by untrusted users
+    cache_dir = None
+
+    # version of the format of the cache files (the changes of the classes of the
+    # domain are detected from the hash of the sources)
+    version = 3
+
+    # settings stored at the class level, which must be restored upon loading
+    class_settings = ['samples', 'timeout', 'sampling_processes', 'discretisation']
+
+    # content hash of the Python sources of the package (computed once per process)
+    _code_hash = None
+
+    @staticmethod
+    def is_enabled():
+        """
+        Returns whether the cache is enabled.
+
+        :return: true if the cache directory is set, false otherwise
+        """
+        return DomainCache.cache_dir is not None
+
+    @staticmethod
+    def get_cache_file(top_domain_file):
+        """
+        Returns the file of the compiled domain for the XML file. The file is specific
+        to the absolute path of the XML file and to the path as given (since the
+        domain refers to its files with paths relative to the working directory).
+
+        :param top_domain_file: the filename of the top XML file
+        :return: the file of the compiled domain
+        """
+        key = os.path.abspath(top_domain_file) + '\n' + str(top_domain_file)
+        file_name = hashlib.sha1(key.encode('utf-8')).hexdigest() + '.pkl'
+        return os.path.join(DomainCache.cache_dir, file_name)
+
+    @staticmethod
+    def get_file_hash(file_path):
+        """
+        Returns the content hash of the file.
+
+        :param file_path: the file path
+        :return: the hash of its content
+        """
+        with open(file_path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+    @staticmethod
+    def get_code_hash():
+        """
+        Returns the content hash of the Python sources of the package. The domains are
+        pickled together with the classes of the package, so that any change of the
+        code makes the previously compiled domains stale.
+
+        :return: the hash of the sources
+        """
+        if DomainCache._code_hash is None:
+            root = Path(__file__).resolve().parent.parent
+            code_hash = hashlib.sha1()
+            for file in sorted(root.rglob('*.py')):
+                code_hash.update(str(file.relative_to(root)).encode('utf-8'))
+                code_hash.update(file.read_bytes())
+            DomainCache._code_hash = code_hash.hexdigest()
+        return DomainCache._code_hash
+
+    @staticmethod
+    def load(top_domain_file):
+        """
+        Loads the compiled domain for the XML file, if it exists and is up to date.
+
+        :param top_domain_file: the filename of the top XML file
+        :return: the compiled domain, or None if it is missing or stale
+        """
+        cache_file = DomainCache.get_cache_file(top_domain_file)
+        if not os.path.isfile(cache_file):
+            return None
+
+        try:
+            with open(cache_file, 'rb') as f:
+                # the header is checked before unpickling the (possibly stale) domain
+                compiled = pickle.load(f)
+                if compiled['version'] != DomainCache.version or compiled['code'] != DomainCache.get_code_hash():
+                    return None
+                for file_path, file_hash in compiled['files'].items():
+                    if not os.path.isfile(file_path) or DomainCache.get_file_hash(file_path) != file_hash:
+                        return None
+                domain = pickle.load(f)
+        except Exception as e:
+            DomainCache.log.warning("cannot load compiled domain %s: %s" % (cache_file, e))
+            return None
+
+        for name, func in domain.get_functions().items():
+            Settings.add_function(name, func)
+        domain.get_settings().fill_settings(compiled['settings'])
+        DomainCache._update_id_counters(domain)
+        return domain
+
+    @staticmethod
+    def save(top_domain_file, domain):
+        """
+        Saves the compiled domain for the XML file. Errors are only logged, since the
+        domain can still be extracted from its XML specification.
+
+        :param top_domain_file: the filename of the top XML file
+        :param domain: the domain extracted from the file
+        """
+        files = [Path(top_domain_file)] + domain.get_imported_files()
+        mapping = domain.get_settings().get_specified_mapping()
+        compiled = {
+            'version': DomainCache.version,
+            'code': DomainCache.get_code_hash(),
+            'files': {os.path.abspath(str(file)): DomainCache.get_file_hash(str(file)) for file in files},
+            'settings': {key: mapping[key] for key in DomainCache.class_settings if key in mapping},
+        }
+
+        try:
+            os.makedirs(DomainCache.cache_dir, exist_ok=True)
+            # the file is written atomically, in case several processes extract the domain
+            fd, tmp_file = tempfile.mkstemp(dir=DomainCache.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    pickle.dump(domain, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_file, DomainCache.get_cache_file(top_domain_file))
+            except BaseException:
+                os.remove(tmp_file)
+                raise
+        except Exception as e:
+            DomainCache.log.warning("cannot save compiled domain for %s: %s" % (top_domain_file, e))
+
+    @staticmethod
+    def _update_id_counters(domain):
+        """
+        Updates the counters of the model and rule identifiers, so that the models and
+        rules created afterwards do not reuse the identifiers of the loaded domain.
+
+        :param domain: the loaded domain
+        """
+        for model in domain.get_models():
+            match = re.fullmatch(r'model(\d+)', model.get_id())
+            if match:
+                Model.id_counter = max(Model.id_counter, int(match.group(1)) + 1)
+            for rule in model.get_rules():
+                match = re.fullmatch(r'rule(\d+)', rule.get_rule_id())
+                if match:
+                    XMLRuleReader._id_counter = max(XMLRuleReader._id_counter, int(match.group(1)) + 1)
@@ -1,9 +1,9 @@
 from datastructs.assignment import Assignment
 from dialogue_state import DialogueState
 from readers.xml_state_reader import XMLStateReader
+from utils.dispatch_utils import dispatch
 from utils.xml_utils import XMLUtils
 import logging
-from multipledispatch import dispatch
 import xml.etree.ElementTree as ET
 
 
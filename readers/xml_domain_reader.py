@@ -1,4 +1,3 @@
-import importlib
 import os
 import regex as re
 from pathlib import Path
@@ -6,8 +5,10 @@ from pathlib import Path
 from dialogue_state import DialogueState
 from domains.domain import Domain
 from domains.model import Model
+from readers.domain_cache import DomainCache
 from readers.xml_rule_reader import XMLRuleReader
 from readers.xml_state_reader import XMLStateReader
+from utils.py_utils import get_lazy_function
 from utils.xml_utils import XMLUtils
 
 """
@@ -38,6 +39,13 @@ class XMLDomainReader:
         :param full_extract: whether to extract the full domain or only the files
         :return: the extracted dialogue domain
         """
+        # load the compiled domain (if it is cached and up to date)
+        use_cache = full_extract and DomainCache.is_enabled()
+        if use_cache:
+            domain = DomainCache.load(top_domain_file)
+            if domain is not None:
+                return domain
+
         # create a new, empty domain
         domain = Domain()
 
@@ -54,6 +62,9 @@ class XMLDomainReader:
         for child in main_node:
             domain = XMLDomainReader.extract_partial_domain(child, domain, root_path, full_extract)
 
+        domain.build_trigger_index()
+        if use_cache:
+            DomainCache.save(top_domain_file, domain)
         return domain
 
     @staticmethod
@@ -98,11 +109,10 @@ class XMLDomainReader:
             # try:
             domain_function_name = main_node.attrib['name'].strip()
 
-            module_name, actual_function_name = main_node.text.rsplit('.', 1)
-            mod = importlib.import_module(module_name)
-            func = getattr(mod, actual_function_name)
+            # the module of the function is only imported upon the first call
+            func = get_lazy_function(main_node.text)
 
-            domain.get_settings().add_function(domain_function_name, func)
+            domain.add_function(domain_function_name, func)
             # except:
             #     raise ValueError()
         if tag == 'initialstate':
@@ -0,0 +1,320 @@
+import asyncio
+import itertools
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from copy import copy
+
+from dialogue_system import DialogueSystem
+from domains.domain import Domain
+from modules.module import Module
+from readers.xml_domain_reader import XMLDomainReader
+from settings import Settings
+from utils.dispatch_utils import dispatch
+
+
+class DialogueSession(DialogueSystem):
+    """
+    Lightweight dialogue system for one session of a session manager. The session
+    shares the domain (with its models and rules) and the settings of the manager,
+    which are only read, and owns its dialogue state and its planner. The session
+    has no GUI and no dialogue recorder.
+
+    The rules and conditions of the domain keep intermediate results while they are
+    applied, and are thus not thread-safe: the models of the domain are triggered (by
+    the update loop or by the planner) while holding the domain lock. The rest of the
+    processing, such as the inference in the planner, runs concurrently.
+
+    The domain, settings and modules of a session cannot be changed.
+    """
+
+    def __init__(self, session_id, domain, settings, domain_lock):
+        """
+        Creates a new session for the domain.
+
+        :param session_id: the identifier of the session
+        :param domain: the (shared) dialogue domain
+        :param settings: the (shared) system settings
+        :param domain_lock: the (shared) lock of the domain
+        """
+        self._session_id = session_id
+        self._domain_lock = domain_lock
+        self._settings = settings
+        self._domain = domain
+        self._cur_state = copy(domain.get_initial_state())
+        self._cur_state.set_parameters(domain.get_parameters())
+        self._paused = True
+        self._modules = []
+        self._init_lock()
+
+        if settings.planner == 'forward':
+            from modules.forward_planner import ForwardPlanner
+            self._modules.append(ForwardPlanner(self))
+        elif settings.planner == 'mcts':
+            from modules.mcts_planner import MCTSPlanner
+            self._modules.append(MCTSPlanner(self))
+        else:
+            raise ValueError("Not supported planner: %s" % settings.planner)
+
+        for module_type in settings.modules:
+            # the modules are attached directly, since attach_module is disabled
+            try:
+                self._modules.insert(len(self._modules) - 1, module_type(self))
+            except Exception as e:
+                self.log.warning("cannot attach %s: %s" % (module_type.__name__, e))
+
+    def get_session_id(self):
+        """
+        Returns the identifier of the session.
+
+        :return: the session identifier
+        """
+        return self._session_id
+
+    def trigger_model(self, model, state):
+        """
+        Triggers a model of the shared domain on the dialogue state, while holding the
+        lock of the domain.
+
+        :param model: the model of the domain
+        :param state: the dialogue state
+        :return: true if the state has been changed, false otherwise
+        """
+        with self._domain_lock:
+            return model.trigger(state)
+
+    @dispatch(Domain)
+    def change_domain(self, domain):
+        raise NotImplementedError("the domain of a session is shared and cannot be changed")
+
+    @dispatch()
+    def refresh_domain(self):
+        raise NotImplementedError("the domain of a session is shared and cannot be changed")
+
+    @dispatch(Settings)
+    def change_settings(self, settings):
+        raise NotImplementedError("the settings of a session are shared and cannot be changed")
+
+    @dispatch(Module)
+    def attach_module(self, module_instance):
+        raise NotImplementedError("modules cannot be attached to a session")
+
+    @dispatch(type)
+    def attach_module(self, module_type):
+        raise NotImplementedError("modules cannot be attached to a session")
+
+
+class SessionManager:
+    """
+    Manager of concurrent dialogue sessions sharing one dialogue domain. The domain is
+    loaded once, and each session only holds its own dialogue state (see
+    DialogueSession). The user inputs are queued per session, and the queues are
+    processed by a pool of worker threads: the inputs of a session are processed in
+    order, one at a time, while distinct sessions are processed concurrently (the
+    applications of the rules of the shared domain being serialized, see
+    DialogueSession).
+    """
+
+    # logger
+    log = logging.getLogger('PyOpenDial')
+
+    def __init__(self, domain, nr_workers=4):
+        """
+        Creates a new session manager for the domain.
+
+        :param domain: the dialogue domain (or the path of its XML file)
+        :param nr_workers: the number of worker threads processing the sessions
+        """
+        if isinstance(domain, str):
+            domain = XMLDomainReader.extract_domain(domain)
+        if not isinstance(domain, Domain):
+            raise NotImplementedError("UNDEFINED PARAMETERS")
+
+        self._domain = domain
+        # the trigger index is built beforehand, since the domain is shared by the sessions
+        self._domain.build_trigger_index()
+
+        self._settings = Settings()
+        self._settings.fill_settings(domain.get_settings().get_specified_mapping())
+        self._settings.show_gui = False
+
+        self._sessions = dict()
+        self._queues = dict()
+        self._scheduled = set()
+        self._session_counter = itertools.count()
+        self._lock = threading.RLock()
+        self._domain_lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(nr_workers)
+
+    def open_session(self):
+        """
+        Opens a new session, and starts it (which performs the initial update of its
+        dialogue state).
+
+        :return: the identifier of the session
+        """
+        session_id = 'session' + str(next(self._session_counter))
+        session = DialogueSession(session_id, self._domain, self._settings, self._domain_lock)
+        session.start_system()
+
+        with self._lock:
+            self._sessions[session_id] = session
+            self._queues[session_id] = deque()
+        return session_id
+
+    def close_session(self, session_id):
+        """
+        Closes the session. The inputs of the session that are still queued are
+        cancelled.
+
+        :param session_id: the identifier of the session
+        """
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            queue = self._queues.pop(session_id, deque())
+
+        if session is None:
+            raise ValueError("Unknown session: %s" % session_id)
+
+        for _, future in queue:
+            future.cancel()
+        session.pause(True)
+
+    def add_user_input(self, session_id, user_input):
+        """
+        Queues the user input (a string or a N-best list) for the session. The input is
+        processed by a worker thread after the previous inputs of the session.
+
+        :param session_id: the identifier of the session
+        :param user_input: the user input
+        :return: future of the set of variables updated by the input
+        """
+        return self.add_content(session_id, user_input, True)
+
+    def add_content(self, session_id, content, is_user_input=False):
+        """
+        Queues the content for the session (see DialogueSystem.add_content). The
+        content is processed by a worker thread after the previous inputs of the
+        session.
+
+        :param session_id: the identifier of the session
+        :param content: the content to add
+        :param is_user_input: whether the content is a user input
+        :return: future of the set of variables updated by the content
+        """
+        future = Future()
+        with self._lock:
+            if session_id not in self._queues:
+                raise ValueError("Unknown session: %s" % session_id)
+
+            self._queues[session_id].append(((content, is_user_input), future))
+            if session_id not in self._scheduled:
+                self._scheduled.add(session_id)
+                self._executor.submit(self._process_queue, session_id)
+        return future
+
+    async def add_user_input_async(self, session_id, user_input, timeout=None):
+        """
+        Asynchronous version of add_user_input, which can be awaited from an event
+        loop. If the call is cancelled (or times out) while the input is still queued,
+        the input is not processed.
+
+        :param session_id: the identifier of the session
+        :param user_input: the user input
+        :param timeout: the maximum duration (in seconds) to wait for the input to be
+                        processed, or None to wait without limit
+        :return: the set of variables updated by the input
+        """
+        return await self.add_content_async(session_id, user_input, True, timeout=timeout)
+
+    async def add_content_async(self, session_id, content, is_user_input=False, timeout=None):
+        """
+        Asynchronous version of add_content, which can be awaited from an event loop.
+        If the call is cancelled (or times out) while the content is still queued, the
+        content is not processed.
+
+        :param session_id: the identifier of the session
+        :param content: the content to add
+        :param is_user_input: whether the content is a user input
+        :param timeout: the maximum duration (in seconds) to wait for the content to be
+                        processed, or None to wait without limit
+        :return: the set of variables updated by the content
+        """
+        future = self.add_content(session_id, content, is_user_input)
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+
+    def _process_queue(self, session_id):
+        """
+        Processes the queued inputs of the session, until its queue is empty.
+
+        :param session_id: the identifier of the session
+        """
+        while True:
+            with self._lock:
+                queue = self._queues.get(session_id, None)
+                if not queue:
+                    self._scheduled.discard(session_id)
+                    return
+                (content, is_user_input), future = queue.popleft()
+                session = self._sessions[session_id]
+
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                if is_user_input:
+                    updated_vars = session.add_user_input(content)
+                else:
+                    updated_vars = session.add_content(content)
+                future.set_result(updated_vars)
+            except Exception as e:
+                self.log.warning("cannot process input of %s: %s" % (session_id, e))
+                future.set_exception(e)
+
+    def get_session(self, session_id):
+        """
+        Returns the session with the given identifier.
+
+        :param session_id: the identifier of the session
+        :return: the session
+        """
+        with self._lock:
+            if session_id not in self._sessions:
+                raise ValueError("Unknown session: %s" % session_id)
+            return self._sessions[session_id]
+
+    def get_state(self, session_id):
+        """
+        Returns the dialogue state of the session.
+
+        :param session_id: the identifier of the session
+        :return: the dialogue state
+        """
+        return self.get_session(session_id).get_state()
+
+    def get_session_ids(self):
+        """
+        Returns the identifiers of the open sessions.
+
+        :return: the session identifiers
+        """
+        with self._lock:
+            return set(self._sessions.keys())
+
+    def get_domain(self):
+        """
+        Returns the dialogue domain shared by the sessions.
+
+        :return: the dialogue domain
+        """
+        return self._domain
+
+    def shutdown(self, wait=True):
+        """
+        Closes all the sessions and stops the worker threads.
+
+        :param wait: whether to wait for the inputs being processed
+        """
+        for session_id in self.get_session_ids():
+            self.close_session(session_id)
+        self._executor.shutdown(wait)
@@ -3,11 +3,10 @@ from xml.etree.ElementTree import Element
 
 import yaml
 
+from utils.dispatch_utils import dispatch
 from utils.py_utils import get_class, get_class_name_from_type
 from collections import Callable
 import logging
-from multipledispatch import dispatch
-import soundcard as sc
 
 class Settings:
     """
@@ -21,8 +20,13 @@ class Settings:
     eps = 1e-6
     nr_samples = 3000
     max_sampling_time = 250  # in milliseconds
+    nr_sampling_processes = 1  # number of processes sampling in parallel (opt-in)
+    max_combinations = 100000  # maximum number of input combinations of an anchored rule
 
     _functions = dict()
+    # names of the registered functions (stripped), and number of registrations so far
+    _function_names = set()
+    function_version = 0
 
     def __init__(self, arg1=None):
         if arg1 is None:
@@ -86,6 +90,7 @@ class Settings:
             raise NotImplementedError()
 
     def select_audio_mixers(self):
+        import soundcard as sc
         self._input_mixer = sc.all_speakers()[0] if len(sc.all_speakers()) > 0 else None
         self._output_mixer = sc.all_microphones()[0] if len(sc.all_microphones()) > 0 else None
 
@@ -123,6 +128,10 @@ class Settings:
                 Settings.nr_samples = value
             elif key.lower() == 'timeout':
                 Settings.max_sampling_time = value
+            elif key.lower() == 'sampling_processes':
+                Settings.nr_sampling_processes = value
+            elif key.lower() == 'max_combinations':
+                Settings.max_combinations = value
             elif key.lower() == 'discretisation':
                 Settings.discretization_buckets = value
             elif key.lower() == 'modules' or key.lower() == 'module':
@@ -166,6 +175,8 @@ class Settings:
         mapping["monitor"] = ",".join(self.vars_to_monitor)
         mapping["samples"] = Settings.nr_samples
         mapping["timeout"] = Settings.max_sampling_time
+        mapping["sampling_processes"] = Settings.nr_sampling_processes
+        mapping["max_combinations"] = Settings.max_combinations
         mapping["discretisation"] = Settings.discretization_buckets
         mapping['modules'] = ','.join([get_class_name_from_type(module_type) for module_type in self.modules])
         return mapping
@@ -183,15 +194,14 @@ class Settings:
     @dispatch(str, Callable)
     def add_function(name, func):
         Settings._functions[name] = func
+        Settings._function_names.add(name.strip())
+        Settings.function_version += 1
 
     @staticmethod
     @dispatch(str)
     def is_function(str_val):
-        for name in Settings._functions.keys():
-            name = name.strip()
-            if str_val.startswith(name) and str_val[len(name)] == '(' and str_val[-1] == ')':
-                return True
-        return False
+        idx = str_val.find('(')
+        return idx >= 0 and str_val[-1] == ')' and str_val[:idx] in Settings._function_names
 
     @staticmethod
     @dispatch(str)
@@ -1,11 +1,10 @@
 import logging
 
-from multipledispatch import dispatch
-
 from bn.values.value_factory import ValueFactory
 from datastructs.assignment import Assignment
 from datastructs.math_expression import MathExpression
 from templates.regex_template import RegexTemplate
+from utils.dispatch_utils import dispatch
 from utils.string_utils import StringUtils
 
 dispatch_namespace = dict()
@@ -1,9 +1,9 @@
-from multipledispatch import dispatch
 from bn.values.value_factory import ValueFactory
 from datastructs.assignment import Assignment
 from settings import Settings
 from templates.string_template import StringTemplate
 from templates.template import Template, MatchResult
+from utils.dispatch_utils import dispatch
 
 
 class FunctionalTemplate(Template):
@@ -1,4 +1,3 @@
-from multipledispatch import dispatch
 import regex as re
 import logging
 
@@ -6,6 +5,7 @@ from bn.values.custom_val import CustomVal
 from bn.values.value_factory import ValueFactory
 from datastructs.assignment import Assignment
 from templates.template import Template, MatchResult
+from utils.dispatch_utils import dispatch
 from utils.string_utils import StringUtils
 
 dispatch_namespace = dict()
@@ -81,15 +81,28 @@ class RegexTemplate(Template):
         """
         Tries to match the template against the provided string.
         """
+        return self._match(str_val, self._pattern)
+
+    def _match(self, str_val, pattern):
+        """
+        Tries to match the pattern (the pattern of the template, or a permutation of
+        it) against the provided string.
+
+        :param str_val: the string
+        :param pattern: the compiled pattern
+        :return: the matching result
+        """
         input = str_val.strip()
 
-        matcher = self._pattern.fullmatch(input)
+        matcher = pattern.fullmatch(input)
         if matcher:
             results = MatchResult(matcher.start(), matcher.end())
             for slot_key in self._slots.keys():
                 filled_value = matcher.captures(self._slots[slot_key])[0]
-                if not StringUtils.check_form(filled_value) and self.permutate_pattern():
-                    return self.match(str_val)
+                if not StringUtils.check_form(filled_value):
+                    new_pattern = RegexTemplate.permutate_pattern(pattern)
+                    if new_pattern is not None:
+                        return self._match(str_val, new_pattern)
                 results.add_pair(slot_key, filled_value)
 
             return results
@@ -109,10 +122,22 @@ class RegexTemplate(Template):
         Tries to find all occurrences of the template in the provided string. Stops
         after the maximum number of results is reached.
         """
+        return self._find(str_val, max_results, self._pattern)
+
+    def _find(self, str_val, max_results, pattern):
+        """
+        Tries to find all occurrences of the pattern (the pattern of the template, or
+        a permutation of it) in the provided string.
+
+        :param str_val: the string
+        :param max_results: the maximum number of results
+        :param pattern: the compiled pattern
+        :return: the list of matching results
+        """
         str_val = str_val.strip()
         results = list()
 
-        for matcher in self._pattern.finditer(str_val):
+        for matcher in pattern.finditer(str_val):
             if not StringUtils.is_delimited(str_val, matcher.start(), matcher.end()):
                 continue
 
@@ -123,8 +148,10 @@ class RegexTemplate(Template):
                 # quick-fix to handle some rare cases where the occurrence found
                 # by the regex leads to unbalanced parentheses or brackets.
                 # TODO: check whether this is a bug or not.
-                if not StringUtils.check_form(filled_value) and self.permutate_pattern():
-                    return self.find(str_val, max_results)
+                if not StringUtils.check_form(filled_value):
+                    new_pattern = RegexTemplate.permutate_pattern(pattern)
+                    if new_pattern is not None:
+                        return self._find(str_val, max_results, new_pattern)
 
                 match_result.add_pair(slot_key, filled_value)
 
@@ -195,25 +222,27 @@ class RegexTemplate(Template):
 
         return self._str_val == other._str_val
 
-    @dispatch(namespace=dispatch_namespace)
-    def permutate_pattern(self):
+    @staticmethod
+    def permutate_pattern(pattern):
         """
         Quick fix to make slight changes to the regular expression in case the
         templates produces matching results with unbalanced parenthesis/brackets. For
         instance, when the template pred({X},{Y}) is matched against a string
         pred(foo,bar(1,2)), the resulting match is X="foo,bar(1" and Y="2)". We can
         get the desired result X="foo", Y="bar(1,2)" by changing the patterns,
-        replacing greedy quantifiers by reluctant or possessive ones.
+        replacing greedy quantifiers by reluctant or possessive ones. The pattern of
+        the template is left unchanged, since templates are shared across rules.
 
-        :return: true if the permutation resulted in a change in the pattern. else, false.
+        :param pattern: the compiled pattern to change
+        :return: the new compiled pattern, or None if the permutation resulted in no change
         """
-        new_pattern = self._pattern.pattern.replace("(.+)", "(.+?)", 1)
-        if new_pattern == self._pattern.pattern:
-            new_pattern = self._pattern.sub("(.?)", "(.++)", 1)
+        new_pattern = pattern.pattern.replace("(.+)", "(.+?)", 1)
+        if new_pattern == pattern.pattern:
+            new_pattern = pattern.sub("(.?)", "(.++)", 1)
 
-        change = new_pattern != self._pattern.pattern
-        self._pattern = re.compile(new_pattern, re.I | re.U)
-        return change
+        if new_pattern == pattern.pattern:
+            return None
+        return re.compile(new_pattern, re.I | re.U)
 
     @staticmethod
     @dispatch(str, namespace=dispatch_namespace)
@@ -1,4 +1,3 @@
-from multipledispatch import dispatch
 from copy import copy
 
 from bn.values.relational_val import RelationalVal
@@ -7,6 +6,7 @@ from datastructs.assignment import Assignment
 from datastructs.graph import Graph, Node
 from templates.regex_template import RegexTemplate
 from templates.template import Template
+from utils.dispatch_utils import dispatch
 
 
 class RelationalTemplate(Graph, Template):
@@ -1,6 +1,6 @@
-from multipledispatch import dispatch
 from datastructs.assignment import Assignment
 from templates.template import Template, MatchResult
+from utils.dispatch_utils import dispatch
 from utils.string_utils import StringUtils
 
 
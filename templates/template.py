@@ -1,11 +1,10 @@
 import abc
 import logging
 
-from multipledispatch import dispatch
-
 from datastructs.assignment import Assignment
 from datastructs.graph import Graph
 from settings import Settings
+from utils.dispatch_utils import dispatch
 
 dispatch_namespace = dict()
 
@@ -36,17 +35,47 @@ class Template:
     # logger
     log = logging.getLogger('PyOpenDial')
 
+    # maximum number of templates kept in the cache
+    max_cache_size = 10000
+
+    # cache of the templates created from strings (cleared when new functions are
+    # registered in the settings)
+    _cache = dict()
+    _cache_version = 0
+
     @staticmethod
     @dispatch(str, namespace=dispatch_namespace)
     def create(value):
         """
         Creates a new template based on the string value. This method finds the best
-        template representation for the string and returns the result.
+        template representation for the string and returns the result. The templates
+        are cached by string, so that a template is only constructed (and its regular
+        expression compiled) once for each string.
 
         :param value: the string for the template
         :return: the corresponding template object
         """
+        if Template._cache_version != Settings.function_version:
+            Template._cache.clear()
+            Template._cache_version = Settings.function_version
 
+        template = Template._cache.get(value, None)
+        if template is None:
+            template = Template._create(value)
+            if len(Template._cache) >= Template.max_cache_size:
+                Template._cache.clear()
+            Template._cache[value] = template
+
+        return template
+
+    @staticmethod
+    def _create(value):
+        """
+        Constructs the template that best represents the string value.
+
+        :param value: the string for the template
+        :return: the corresponding template object
+        """
         if Settings.is_function(value):
             from templates.functional_template import FunctionalTemplate
             return FunctionalTemplate(value)
@@ -1,5 +1,10 @@
+import pickle
+from copy import copy
+
+import pytest
+
 from bn.values.value_factory import ValueFactory
-from datastructs.assignment import Assignment
+from datastructs.assignment import Assignment, FrozenAssignment
 
 
 class TestAssignment:
@@ -16,4 +21,37 @@ class TestAssignment:
         assert a1 != a2bis
         assert hash(a1) != hash(a2bis)
         assert a1bis != a2
-        assert hash(a1bis) != hash(a2)
\ No newline at end of file
+        assert hash(a1bis) != hash(a2)
+
+    def test_frozen_assignment(self):
+        a = Assignment.create_from_string("A=1 ^ B=blue ^ C")
+        frozen = a.freeze()
+        assert isinstance(frozen, FrozenAssignment)
+        assert frozen == a and hash(frozen) == hash(a)
+        assert {a: 1}[frozen] == 1
+        assert frozen.freeze() is frozen
+
+        with pytest.raises(ValueError):
+            frozen.add_pair("D", "red")
+        with pytest.raises(ValueError):
+            frozen.remove_pair("A")
+
+        trimmed = frozen.get_trimmed(["A", "B"])
+        assert isinstance(trimmed, FrozenAssignment)
+        assert trimmed == a.get_trimmed(["A", "B"])
+        assert frozen.get_pruned({"A"}) == Assignment.create_from_string("B=blue ^ C")
+        assert frozen.rename_var("B", "B2").get_value("B2") == ValueFactory.create("blue")
+        assert frozen.add_primes().remove_primes() == frozen
+
+        merged = FrozenAssignment([frozen, Assignment("A", 2.0), Assignment("D", "red")])
+        assert merged == Assignment([a, Assignment("A", 2.0), Assignment("D", "red")])
+        assert frozen.union(Assignment("D", "red")) == Assignment(a, "D", "red")
+
+        thawed = frozen.thaw()
+        thawed.add_pair("D", "red")
+        assert not frozen.contains_var("D")
+        mutable_copy = copy(frozen)
+        mutable_copy.remove_pair("A")
+        assert frozen.contains_var("A")
+
+        assert pickle.loads(pickle.dumps(frozen)) == frozen
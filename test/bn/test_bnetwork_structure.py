@@ -1,3 +1,4 @@
+import gc
 from copy import copy
 
 import pytest
@@ -8,6 +9,7 @@ from bn.nodes.action_node import ActionNode
 from bn.nodes.chance_node import ChanceNode
 from bn.values.value_factory import ValueFactory
 from datastructs.assignment import Assignment
+from dialogue_state import DialogueState
 from test.common.network_examples import NetworkExamples
 
 
@@ -73,6 +75,30 @@ class TestBNetworkStructure:
         assert len(bn2.get_action_node("Action").get_values()) == 3
         assert bn2.get_utility_node("Util2").get_utility(Assignment(Assignment("Burglary"), "Action", ValueFactory.create("DoNothing"))) == pytest.approx(-10, abs=0.0001)
 
+    def test_copy_on_write(self):
+        bn = NetworkExamples.construct_basic_network()
+        bn2 = copy(bn)
+
+        bn2.get_chance_node("Burglary").prune_values(0.01)
+        assert len(bn2.get_chance_node("Burglary").get_values()) == 1
+        assert len(bn.get_chance_node("Burglary").get_values()) == 2
+
+        bn2.get_utility_node("Util1").add_utility(Assignment(Assignment("Burglary", True), "Action", ValueFactory.create("DoNothing")), -20.0)
+        assert bn2.get_utility_node("Util1").get_utility(Assignment(Assignment("Burglary", True), "Action", ValueFactory.create("DoNothing"))) == pytest.approx(-20.0, abs=0.0001)
+        assert bn.get_utility_node("Util1").get_utility(Assignment(Assignment("Burglary", True), "Action", ValueFactory.create("DoNothing"))) == pytest.approx(0.0, abs=0.0001)
+
+        bn.get_chance_node("Alarm").get_mutable_distrib().modify_variable_id("Burglary", "Burglary2")
+        assert "Burglary" in bn2.get_chance_node("Alarm").get_distrib().get_input_variables()
+
+        # the original node no longer copies its distribution once the copies are discarded
+        bn3 = NetworkExamples.construct_basic_network()
+        bn4 = copy(bn3)
+        distrib = bn3.get_chance_node("JohnCalls").get_distrib()
+        assert bn4.get_chance_node("JohnCalls").get_distrib() is distrib
+        del bn4
+        gc.collect()
+        assert bn3.get_chance_node("JohnCalls").get_mutable_distrib() is distrib
+
     def test_structure(self):
         bn = NetworkExamples.construct_basic_network()
 
@@ -110,6 +136,49 @@ class TestBNetworkStructure:
         assert len(bn.get_chance_node("Alarm").get_input_nodes()) == 1
         assert len(bn.get_chance_node("Earthquake").get_output_nodes()) == 0
 
+    def test_structure_update(self):
+        bn = NetworkExamples.construct_basic_network()
+
+        assert "Earthquake" in bn.get_node("MaryCalls").get_ancestor_ids()
+        assert bn.get_sorted_node_ids().index("Earthquake") > bn.get_sorted_node_ids().index("Alarm")
+
+        bn.get_chance_node("Alarm").remove_input_node("Earthquake")
+        assert "Earthquake" not in bn.get_node("MaryCalls").get_ancestor_ids()
+        assert len(bn.get_node("Earthquake").get_descendant_ids()) == 0
+
+        bn.get_chance_node("Earthquake").add_input_node(bn.get_node("MaryCalls"))
+        assert "Burglary" in bn.get_node("Earthquake").get_ancestor_ids()
+        assert "Earthquake" in bn.get_node("Alarm").get_descendant_ids()
+        assert bn.get_sorted_node_ids().index("Earthquake") < bn.get_sorted_node_ids().index("MaryCalls")
+
+        bn.remove_node("MaryCalls")
+        assert "MaryCalls" not in bn.get_sorted_node_ids()
+        assert len(bn.get_node("Earthquake").get_ancestor_ids()) == 0
+
+        # the changes of a network leave the versions of the other networks unchanged
+        bn2 = NetworkExamples.construct_basic_network()
+        structure_version = bn2.get_structure_version()
+        content_version = bn2.get_content_version()
+        bn.get_chance_node("Alarm").remove_input_node("Burglary")
+        bn.get_chance_node("Alarm").prune_values(0.9)
+        assert bn2.get_structure_version() == structure_version
+        assert bn2.get_content_version() == content_version
+        bn2.get_chance_node("Alarm").remove_input_node("Burglary")
+        assert bn2.get_structure_version() != structure_version
+        assert "Burglary" not in bn2.get_node("JohnCalls").get_ancestor_ids()
+
+    def test_shared_nodes(self):
+        bn = NetworkExamples.construct_basic_network()
+        assert len(bn.get_cliques()) == 1
+        assert "Burglary" in bn.get_node("JohnCalls").get_ancestor_ids()
+
+        # the nodes are now owned by the dialogue state, but still shared with the network
+        state = DialogueState(bn)
+        bn.get_node("Alarm").remove_input_node("Burglary")
+        assert len(bn.get_cliques()) == 2
+        assert len(state.get_cliques()) == 2
+        assert "Burglary" not in bn.get_node("JohnCalls").get_ancestor_ids()
+
     def test_id_chance(self):
         bn = NetworkExamples.construct_basic_network()
 
@@ -241,3 +310,24 @@ class TestBNetworkStructure:
         del result[4]
 
         assert len(result) == 0
+
+    def test_clique_index(self):
+        bn = NetworkExamples.construct_basic_network()
+        assert bn.is_clique(bn.get_node_ids())
+        assert bn.get_clique("Burglary") == bn.get_node_ids()
+
+        bn.get_node("JohnCalls").remove_input_node("Alarm")
+        assert bn.get_clique("JohnCalls") == {"JohnCalls"}
+        assert bn.is_clique({"JohnCalls"})
+        assert not bn.is_clique({"JohnCalls", "Alarm"})
+        assert [len(clique) for clique in bn.get_cliques({"JohnCalls"})] == [1]
+        assert len(bn.get_cliques({"JohnCalls", "Alarm"})) == 2
+
+        node = ChanceNode("Neighbour", bn.get_node("JohnCalls").get_distrib())
+        bn.add_node(node)
+        assert len(bn.get_cliques()) == 3
+        bn.get_node("JohnCalls").add_input_node(node)
+        assert bn.get_clique("Neighbour") == {"Neighbour", "JohnCalls"}
+
+        bn.remove_node("Neighbour")
+        assert bn.is_clique({"JohnCalls"})
@@ -12,6 +12,7 @@ from bn.distribs.density_functions.kernel_density_function import KernelDensityF
 from bn.distribs.density_functions.uniform_density_function import UniformDensityFunction
 from bn.distribs.distribution_builder import CategoricalTableBuilder as CategoricalTableBuilder, \
     ConditionalTableBuilder as ConditionalTableBuilder, MultivariateTableBuilder as MultivariateTableBuilder
+from bn.distribs.empirical_distribution import EmpiricalDistribution
 from bn.nodes.chance_node import ChanceNode
 from bn.values.array_val import ArrayVal
 from bn.values.value_factory import ValueFactory
@@ -248,6 +249,37 @@ class TestDistribution:
         assert continuous.get_prob_density(1.8) == pytest.approx(distrib2.to_continuous().get_prob_density(1.8), abs=0.1)
         assert continuous.get_prob_density(3.2) == pytest.approx(distrib2.to_continuous().get_prob_density(3.2), abs=0.1)
 
+    def test_empirical_distrib_columns(self):
+        samples = []
+        for idx in range(10):
+            sample = Assignment([Assignment("var1", "one" if idx < 7 else "two"), Assignment("var2", float(idx))])
+            if idx % 2 == 0:
+                sample.add_pair("var3", ValueFactory.create(idx < 4))
+            samples.append(sample)
+        distrib = EmpiricalDistribution(samples)
+
+        assert distrib.get_marginal("var1").get_prob("one") == pytest.approx(0.7, abs=0.0001)
+        assert distrib.to_discrete().get_prob(Assignment([Assignment("var1", "two"), Assignment("var2", 8.), Assignment("var3", False)])) == pytest.approx(0.1, abs=0.0001)
+        assert distrib.to_discrete().get_prob(Assignment([Assignment("var1", "two"), Assignment("var2", 7.)])) == pytest.approx(0.1, abs=0.0001)
+        assert distrib.create_discrete("var3").get_prob(ValueFactory.none()) == pytest.approx(0.5, abs=0.0001)
+
+        conditional = distrib.get_marginal("var3", {"var1"})
+        assert conditional.get_prob(Assignment("var1", "one"), ValueFactory.create(True)) == pytest.approx(2. / 7., abs=0.0001)
+        assert conditional.get_prob(Assignment("var1", "two"), ValueFactory.create(False)) == pytest.approx(1. / 3., abs=0.0001)
+
+        continuous = distrib.get_marginal("var2")
+        assert isinstance(continuous, ContinuousDistribution)
+        assert continuous.get_function()._points.shape == (10, 1)
+        assert continuous.get_cumulative_prob(4.5) == pytest.approx(0.5, abs=0.05)
+
+        distrib.modify_variable_id("var1", "var4")
+        assert distrib.get_marginal("var4").get_prob("two") == pytest.approx(0.3, abs=0.0001)
+
+        assert not distrib.prune_values(0.2)
+        assert distrib.prune_values(0.3)
+        assert len(distrib) == 8
+        assert distrib.get_marginal("var4").get_prob("two") == pytest.approx(3. / 8., abs=0.0001)
+
     def test_dep_empirical_distrib_continuous(self):
         bn = BNetwork()
         builder = CategoricalTableBuilder("var1")
@@ -355,6 +387,53 @@ class TestDistribution:
         assert sum / 10000.0 == pytest.approx(0.424, abs=0.15)
         assert continuous2.to_discrete().get_prob(-1.5) == pytest.approx(0.2, abs=0.1)
 
+    def test_kernel_distrib_batch(self):
+        kds = KernelDensityFunction(np.array([[0.1], [-1.5], [0.6], [1.3], [1.3]]))
+
+        points = np.array([[-2.0], [0.6], [1.3], [1.29]])
+        densities = kds.get_density(points)
+        assert densities.shape == (4,)
+        for idx, point in enumerate(points):
+            assert densities[idx] == pytest.approx(kds.get_density(point), abs=0.0001)
+        assert densities[0] == pytest.approx(0.086, abs=0.01)
+        assert kds.get_density(np.array([[1000.0]]))[0] == pytest.approx(0.0, abs=0.0001)
+        assert list(kds.get_cdf(points)) == pytest.approx([0.0, 0.6, 1.0, 0.6], abs=0.0001)
+
+        samples = kds.sample(20000)
+        assert samples.shape == (20000, 1)
+        assert np.mean(samples) == pytest.approx(0.36, abs=0.1)
+
+        bounded = KernelDensityFunction(np.array([[0.2, 0.3, 0.5], [0.3, 0.3, 0.4], [0.1, 0.6, 0.3]]))
+        assert bounded.get_density(np.array([0.2, 0.4, 0.4])) > 0.
+        assert np.sum(bounded.sample(10), axis=1) == pytest.approx(np.ones(10), abs=0.0001)
+
+    def test_nearest_value(self):
+        builder = CategoricalTableBuilder("var1")
+        builder.add_row(1.5, 0.6)
+        builder.add_row(-3.0, 0.1)
+        builder.add_row(2.0, 0.3)
+        table = builder.build()
+
+        assert table.get_prob(1.7) == pytest.approx(0.6, abs=0.0001)
+        assert table.get_prob(1.8) == pytest.approx(0.3, abs=0.0001)
+        assert table.get_prob(-10.0) == pytest.approx(0.1, abs=0.0001)
+        assert table.get_prob(100.0) == pytest.approx(0.3, abs=0.0001)
+
+        table.prune_values(0.2)
+        assert table.get_prob(-10.0) == pytest.approx(0.6 / 0.9, abs=0.0001)
+
+        builder = CategoricalTableBuilder("var2")
+        builder.add_row(ValueFactory.create("[0.2, 0.8]"), 0.7)
+        builder.add_row(ValueFactory.create("[0.9, 0.1]"), 0.3)
+        table2 = builder.build()
+        assert table2.get_prob(ValueFactory.create("[0.3, 0.6]")) == pytest.approx(0.7, abs=0.0001)
+        assert table2.get_prob(ValueFactory.create("[1.0, 0.0]")) == pytest.approx(0.3, abs=0.0001)
+
+        builder = CategoricalTableBuilder("var3")
+        builder.add_row("val1", 0.4)
+        builder.add_row(2.0, 0.6)
+        assert builder.build().get_prob(1.9) == pytest.approx(0.0, abs=0.0001)
+
     def test_nbest(self):
         builder = CategoricalTableBuilder("test")
 
@@ -1,3 +1,6 @@
+import pickle
+from copy import copy
+
 import pytest
 
 from bn.distribs.distribution_builder import CategoricalTableBuilder
@@ -47,6 +50,22 @@ class TestValue:
         assert ValueFactory.create('True') in ValueFactory.create('[test,[1,2],True]').get_sub_values()
         assert len(ValueFactory.create('[a1=test,a2=[1,2],a3=true]').get_sub_values()) == 3
 
+    def test_interning(self):
+        value = ValueFactory.create('Move(Left)')
+        assert ValueFactory.create('Move(Left)') is value
+        assert ValueFactory.create('move(left)') == value
+        assert hash(ValueFactory.create('move(left)')) == hash(value)
+        assert str(ValueFactory.create('move(left)')) == 'move(left)'
+        assert copy(value) is value
+        assert ValueFactory.create(3.5) is ValueFactory.create('3.5')
+        assert ValueFactory.create(True) is ValueFactory.create('true')
+
+        for value in [ValueFactory.create('Move(Left)'), ValueFactory.create(3.5), ValueFactory.create(False), ValueFactory.none()]:
+            assert pickle.loads(pickle.dumps(value)) is value
+
+        assert ValueFactory.create('[a,b]') is not ValueFactory.create('[a,b]')
+        assert ValueFactory.create('[a,b]') == ValueFactory.create('[a,b]')
+
     def test_closest(self):
         builder = CategoricalTableBuilder('v')
         builder.add_row(np.array([0.2, 0.2]), 0.3)
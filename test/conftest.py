@@ -0,0 +1,16 @@
+import pytest
+
+from settings import Settings
+
+
+@pytest.fixture
+def sampling_time(monkeypatch):
+    """
+    Raises the time budget of the sampling, which stops the sampling before the
+    requested number of samples on slow machines.
+
+    :return: the raised time budget (in milliseconds)
+    """
+    max_sampling_time = Settings.max_sampling_time * 10
+    monkeypatch.setattr(Settings, 'max_sampling_time', max_sampling_time)
+    return max_sampling_time
@@ -32,7 +32,7 @@ class TestDemo:
         for i in range(3000):
             print((system.get_state().get_chance_node("theta").sample()).get_array()[0])
 
-    def test_demo(self):
+    def test_demo(self, sampling_time):
         domain = XMLDomainReader.extract_domain(TestDemo.domain_file2)
         system = DialogueSystem(domain)
         system.get_settings().show_gui = False
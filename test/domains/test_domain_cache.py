@@ -0,0 +1,72 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from dialogue_system import DialogueSystem
+from readers.domain_cache import DomainCache
+from readers.xml_domain_reader import XMLDomainReader
+from settings import Settings
+
+
+class TestDomainCache:
+    domain_file = "test/data/example-flightbooking.xml"
+
+    def test_cache(self):
+        DomainCache.cache_dir = tempfile.mkdtemp()
+        try:
+            domain = XMLDomainReader.extract_domain(TestDomainCache.domain_file)
+            cached_domain = DomainCache.load(TestDomainCache.domain_file)
+            assert cached_domain is not None
+            assert [model.get_id() for model in cached_domain.get_models()] == [model.get_id() for model in domain.get_models()]
+            assert cached_domain.get_imported_files() == domain.get_imported_files()
+
+            system = DialogueSystem(XMLDomainReader.extract_domain(TestDomainCache.domain_file))
+            system.get_settings().show_gui = False
+            system.start_system()
+            assert str(system.get_content("u_m").get_best()).find("your destination?") != -1
+            system.add_user_input({"to Bergen": 0.4, "to Bethleem": 0.2})
+            assert system.get_content("a_u").get_prob("[Inform(Airport,Bergen)]") == pytest.approx(0.833, abs=0.01)
+            assert str(system.get_content("a_m").to_discrete().get_best()) == "Confirm(Destination,Bergen)"
+        finally:
+            DomainCache.cache_dir = None
+
+    def test_stale_cache(self, monkeypatch):
+        DomainCache.cache_dir = tempfile.mkdtemp()
+        try:
+            domain_dir = tempfile.mkdtemp()
+            for file_name in os.listdir("test/data"):
+                if file_name.startswith("example-flightbooking"):
+                    shutil.copy(os.path.join("test/data", file_name), domain_dir)
+            domain_file = os.path.join(domain_dir, "example-flightbooking.xml")
+
+            XMLDomainReader.extract_domain(domain_file)
+            assert DomainCache.load(domain_file) is not None
+
+            with open(os.path.join(domain_dir, "example-flightbooking_nlg.xml"), 'a') as f:
+                f.write("\n<!-- modified -->\n")
+            assert DomainCache.load(domain_file) is None
+            XMLDomainReader.extract_domain(domain_file)
+            assert DomainCache.load(domain_file) is not None
+
+            # the compiled domains are also stale after a change of the code
+            monkeypatch.setattr(DomainCache, '_code_hash', DomainCache.get_code_hash() + 'modified')
+            assert DomainCache.load(domain_file) is None
+        finally:
+            DomainCache.cache_dir = None
+
+    def test_cached_functions(self):
+        DomainCache.cache_dir = tempfile.mkdtemp()
+        try:
+            domain_file = os.path.join(tempfile.mkdtemp(), "functions.xml")
+            with open(domain_file, 'w') as f:
+                f.write('<domain><function name="cached_basename">os.path.basename</function></domain>')
+
+            XMLDomainReader.extract_domain(domain_file)
+            domain = XMLDomainReader.extract_domain(domain_file)
+            assert list(domain.get_functions().keys()) == ["cached_basename"]
+            assert domain.get_functions()["cached_basename"]("a/b") == "b"
+            assert Settings.get_function("cached_basename") is domain.get_functions()["cached_basename"]
+        finally:
+            DomainCache.cache_dir = None
@@ -141,7 +141,7 @@ class TestParameters:
         assert system.get_content("a_u").get_prob("approval") == pytest.approx(0.63, abs=0.08)
         assert system.get_content("a_u").get_prob("irony") == pytest.approx(0.3, abs=0.08)
 
-    def test_param_6(self):
+    def test_param_6(self, sampling_time):
         system = DialogueSystem(XMLDomainReader.extract_domain("test/data/testparams3.xml"))
         system.get_settings().show_gui = False
         system.start_system()
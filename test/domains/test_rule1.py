@@ -1,8 +1,23 @@
+import pytest
+
 from bn.distribs.distribution_builder import CategoricalTableBuilder as CategoricalTableBuilder
+from bn.nodes.chance_node import ChanceNode
+from datastructs.assignment import Assignment
+from dialogue_state import DialogueState
 from dialogue_system import DialogueSystem
+from domains.rules.conditions.basic_condition import BasicCondition, Relation
+from domains.rules.conditions.complex_condition import BinaryOperator, ComplexCondition
+from domains.rules.distribs.anchored_rule import AnchoredRule
+from domains.rules.effects.effect import Effect
+from domains.rules.effects.template_effect import TemplateEffect
+from domains.rules.parameters.fixed_parameter import FixedParameter
+from domains.rules.parameters.single_parameter import SingleParameter
+from domains.rules.rule import Rule, RuleOutput, RuleType
 from modules.forward_planner import ForwardPlanner
 from modules.state_pruner import StatePruner
 from readers.xml_domain_reader import XMLDomainReader
+from settings import Settings
+from templates.template import Template
 from test.common.inference_checks import InferenceChecks
 
 
@@ -105,3 +120,36 @@ class TestRule1:
         TestRule1.inference.check_prob(system.get_state(), "a_u2", "[HowAreYou]", 0.2)
 
         StatePruner.enable_reduction = True
+
+    def test_anchoring(self, monkeypatch):
+        state = DialogueState()
+        for variable in ["A", "B", "C"]:
+            builder = CategoricalTableBuilder(variable)
+            for i in range(20):
+                builder.add_row("%s%d" % (variable.lower(), i), 0.05)
+            state.add_node(ChanceNode(variable, builder.build()))
+
+        rule = Rule("rule", RuleType.PROB)
+        condition = ComplexCondition([BasicCondition("A", "a1", Relation.EQUAL), BasicCondition("B", "b2", Relation.UNEQUAL)], BinaryOperator.AND)
+        output = RuleOutput(RuleType.PROB)
+        output.add_effect(Effect(TemplateEffect(Template.create("D"), Template.create("{C}"), 1, True, False)), FixedParameter(0.8))
+        rule.add_case(condition, output)
+
+        anchored_rule = AnchoredRule(rule, state, Assignment())
+        assert anchored_rule.is_relevant()
+        assert anchored_rule.get_input_range().get_nb_combinations() == 8000
+        assert anchored_rule._get_relevant_inputs().get_nb_combinations() == 80
+        assert len(anchored_rule.get_output_range().get_values("D'")) == 20
+
+        # the variables are only kept whole if they are used by the parameters
+        rule2 = Rule("rule2", RuleType.PROB)
+        output2 = RuleOutput(RuleType.PROB)
+        output2.add_effect(Effect(TemplateEffect(Template.create("D"), Template.create("{C}"), 1, True, False)), SingleParameter("theta_B"))
+        rule2.add_case(condition, output2)
+        assert AnchoredRule(rule2, state, Assignment())._get_relevant_inputs().get_nb_combinations() == 80
+
+        # the maximum number of input combinations is specified in the settings
+        monkeypatch.setattr(Settings, 'max_combinations', Settings.max_combinations)
+        assert Settings({'max_combinations': 10}).get_specified_mapping()['max_combinations'] == 10
+        with pytest.raises(ValueError, match="rule rule: 80 input combinations"):
+            AnchoredRule(rule, state, Assignment())
@@ -84,3 +84,15 @@ class TestRule3:
 
         assert system.get_content("out").get_prob("val1 is in [val1, val2]") + system.get_content("out").get_prob("val1 is in [val2, val1]") == pytest.approx(0.56, abs=0.01)
         assert system.get_content("out2").get_prob("this is a string is matched") == pytest.approx(0.5, abs=0.01)
+
+    def test_triggers(self):
+        domain = XMLDomainReader.extract_domain(TestRule3.test2_domain_file)
+        models = domain.get_models()
+        for updated_vars in [["a_u"], ["a_m", "u_u"], ["shape(obj1)"], ["graspable(b)", "a_u"], ["unknown"], []]:
+            assert domain.get_triggered_models(updated_vars) == [model for model in models if model.is_triggered(updated_vars)]
+
+        model = models[0]
+        model.add_trigger("new_var")
+        assert model in domain.get_triggered_models(["new_var"])
+        models.pop(0)
+        assert model not in domain.get_triggered_models(["new_var"])
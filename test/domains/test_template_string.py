@@ -2,7 +2,7 @@ import pytest
 
 from bn.values.value_factory import ValueFactory
 from datastructs.assignment import Assignment
-from datastructs.math_expression import MathExpression
+from datastructs.math_expression import CompiledExpression, MathExpression
 from dialogue_system import DialogueSystem
 from readers.xml_domain_reader import XMLDomainReader
 from settings import Settings
@@ -102,12 +102,47 @@ class TestTemplateString:
         assert system.get_content("caught").get_prob(False) == pytest.approx(1.0, abs=0.01)
         assert system.get_content("caught2").get_prob(True) == pytest.approx(1.0, abs=0.01)
 
+    def test_template_permutation(self):
+        template = Template.create("pred({X},{Y})")
+        pattern = template._pattern
+        result = template.match("pred(foo,bar(1,2))")
+        assert result.get_value("X") == ValueFactory.create("foo")
+        assert result.get_value("Y") == ValueFactory.create("bar(1,2)")
+        # the (cached) template keeps its initial pattern
+        assert template._pattern is pattern
+        assert Template.create("pred({X},{Y})") is template
+
     def test_template_math(self):
         assert MathExpression("1+2").evaluate() == pytest.approx(3.0, abs=0.001)
         assert MathExpression("-1.2*3").evaluate() == pytest.approx(-3.6, abs=0.001)
         t = Template.create("{X}+2")
         assert str(t.fill_slots(Assignment("X", "3"))) == "5"
 
+    def test_template_math_batch(self):
+        expression = MathExpression("theta*2 + exp(x)")
+        assert expression.evaluate(Assignment([Assignment("theta", 1.5), Assignment("x", 0.0)])) == pytest.approx(4.0, abs=0.001)
+
+        params = [Assignment([Assignment("theta", float(i)), Assignment("x", 0.0)]) for i in range(4)]
+        results = expression.evaluate_batch(params)
+        assert len(results) == 4
+        for param, result in zip(params, results):
+            assert result == pytest.approx(expression.evaluate(param), abs=0.001)
+
+        conditional = MathExpression("a if a > 1 else 0")
+        assert list(conditional.evaluate_batch([Assignment("a", float(i)) for i in range(4)])) == [0., 0., 2., 3.]
+
+    def test_template_math_sandbox(self, monkeypatch):
+        # the unsafe constructs are left to the interpreter, which rejects them
+        assert MathExpression("().__class__").evaluate(Assignment()) is None
+        assert not MathExpression("().__class__").get_compiled()._safe
+        assert MathExpression("2*max(a, 1)").get_compiled()._safe
+
+        monkeypatch.setattr(CompiledExpression, 'compiled_expressions', dict())
+        monkeypatch.setattr(CompiledExpression, 'max_cache_size', 2)
+        for i in range(5):
+            assert MathExpression("a+%i" % i).evaluate(Assignment("a", 1.0)) == pytest.approx(i + 1.0, abs=0.001)
+        assert len(CompiledExpression.compiled_expressions) <= 2
+
     def test_complex_regex(self):
         t = Template.create("a (pizza)? margherita")
         assert t.match("a margherita").is_matching()
@@ -232,3 +267,18 @@ class TestTemplateString:
         t = Template.create("add(substract({X},{Y}),substract({Z}, {A}))")
         assert isinstance(t, FunctionalTemplate)
         assert t.fill_slots(Assignment.create_from_string("X=3 ^ Y=1 ^ Z=4 ^ A=2")) == "4"
+
+    def test_template_cache(self):
+        template = Template.create("the {colour} box")
+        assert Template.create("the {colour} box") is template
+        assert str(template.match("the red box").get_value("colour")) == "red"
+
+        assert not isinstance(Template.create("cube({X})"), FunctionalTemplate)
+        Settings.add_function("cube", lambda x: ValueFactory.create(float(x) ** 3))
+        assert Settings.is_function("cube(2)")
+        assert not Settings.is_function("cube")
+        assert not Settings.is_function("cubes(2)")
+
+        t = Template.create("cube({X})")
+        assert isinstance(t, FunctionalTemplate)
+        assert t.fill_slots(Assignment.create_from_string("X=2")) == "8"
@@ -9,11 +9,19 @@ from bn.distribs.multivariate_table import MultivariateTable
 from bn.nodes.chance_node import ChanceNode
 from bn.values.value_factory import ValueFactory
 from datastructs.assignment import Assignment
+from dialogue_system import DialogueSystem
+from inference.approximate.intervals import Intervals
+from inference.approximate.likelihood_weighting import LikelihoodWeighting
 from inference.approximate.sampling_algorithm import SamplingAlgorithm
+from inference.exact.dense_factor import DenseFactor
+from inference.exact.double_factor import DoubleFactor
 from inference.exact.naive_inference import NaiveInference
 from inference.exact.variable_elimination import VariableElimination
+from inference.query import ProbQuery
 from inference.switching_algorithm import SwitchingAlgorithm
+from settings import Settings
 from test.common.network_examples import NetworkExamples
+from utils.py_utils import current_time_millis
 
 
 class TestInference:
@@ -77,8 +85,42 @@ class TestInference:
 
         assert query2.get_prob(Assignment(["Alarm", "!Burglary"])) == pytest.approx(0.3577609, abs=0.001)
 
-    def test_network3bis(self):
-        iz = SamplingAlgorithm(5000, 300)
+    def test_dense_factors(self, monkeypatch):
+        ve = VariableElimination()
+        bn = NetworkExamples.construct_basic_network2()
+        evidence = Assignment([Assignment("JohnCalls"), Assignment("MaryCalls")])
+
+        dense_prob = ve.query_prob(bn, ["Alarm", "Burglary"], evidence)
+        dense_util = ve.query_util(bn, ["Action", "Burglary"], evidence)
+        dense_reduced = ve.reduce(bn, ["Burglary", "Earthquake", "MaryCalls"], Assignment("JohnCalls"))
+
+        monkeypatch.setattr(DenseFactor, 'max_size', 0)
+        sparse_prob = ve.query_prob(bn, ["Alarm", "Burglary"], evidence)
+        sparse_util = ve.query_util(bn, ["Action", "Burglary"], evidence)
+        sparse_reduced = ve.reduce(bn, ["Burglary", "Earthquake", "MaryCalls"], Assignment("JohnCalls"))
+
+        for assignment in sparse_prob.get_values():
+            assert dense_prob.get_prob(assignment) == pytest.approx(sparse_prob.get_prob(assignment), abs=1e-10)
+        for assignment in sparse_util.get_table().keys():
+            assert dense_util.get_util(assignment) == pytest.approx(sparse_util.get_util(assignment), abs=1e-10)
+        assert dense_reduced.get_node_ids() == sparse_reduced.get_node_ids()
+        marginal = dense_reduced.get_chance_node("Burglary").get_prob(ValueFactory.create(True))
+        assert marginal == pytest.approx(sparse_reduced.get_chance_node("Burglary").get_prob(ValueFactory.create(True)), abs=1e-10)
+
+    def test_dense_factor_edge_cases(self):
+        # factor without variables
+        empty_prob = VariableElimination().query_prob(NetworkExamples.construct_basic_network(), [], Assignment())
+        assert empty_prob.get_prob(Assignment()) == pytest.approx(1.0, abs=1e-10)
+
+        # sparse factor whose entries assign distinct variables
+        sparse_factor = DoubleFactor()
+        sparse_factor.add_entry(Assignment("A", True), 0.5, 0.)
+        sparse_factor.add_entry(Assignment([Assignment("A", False), Assignment("B", True)]), 0.5, 0.)
+        with pytest.raises(ValueError):
+            DenseFactor(sparse_factor)
+
+    def test_network3bis(self, sampling_time):
+        iz = SamplingAlgorithm(5000, sampling_time)
         bn = NetworkExamples.construct_basic_network2()
 
         query = iz.query_prob(bn, ["Burglary"], Assignment(["JohnCalls", "MaryCalls"]))
@@ -90,11 +132,63 @@ class TestInference:
 
         assert query2.get_prob(Assignment(["Alarm", "!Burglary"])) == pytest.approx(0.35970, abs=0.05)
 
-    def test_network_util(self):
+    def test_parallel_sampling(self, monkeypatch):
+        monkeypatch.setattr(Settings, 'nr_sampling_processes', 2)
+        bn = NetworkExamples.construct_basic_network2()
+        query = ProbQuery(bn, ["Burglary"], Assignment(["JohnCalls", "MaryCalls"]))
+
+        samples = LikelihoodWeighting(query, 3000, 5000).get_samples()
+        distrib = EmpiricalDistribution(samples)
+
+        assert len(samples) == 3000
+        assert distrib.get_prob(Assignment("Burglary", True)) == pytest.approx(0.637392, abs=0.06)
+
+        start_time = current_time_millis()
+        samples = LikelihoodWeighting(query, 1000000, 100).get_samples()
+
+        assert 0 < len(samples) < 1000000
+        assert current_time_millis() - start_time < 2000
+
+    def test_pool_shutdown(self, monkeypatch):
+        system = DialogueSystem()
+        system.get_settings().show_gui = False
+        system.start_system()
+
+        monkeypatch.setattr(Settings, 'nr_sampling_processes', 2)
+        # the functions registered by other tests may not be passed to the processes
+        monkeypatch.setattr(Settings, '_functions', dict())
+        query = ProbQuery(NetworkExamples.construct_basic_network2(), ["Burglary"], Assignment(["JohnCalls", "MaryCalls"]))
+        LikelihoodWeighting(query, 3000, 5000).get_samples()
+        assert LikelihoodWeighting._pool is not None
+
+        system.pause(True)
+        assert LikelihoodWeighting._pool is None
+
+        # the pool is created again upon the next parallel sampling
+        assert len(LikelihoodWeighting(query, 3000, 5000).get_samples()) == 3000
+        assert LikelihoodWeighting._pool is not None
+        LikelihoodWeighting.shutdown_pool()
+
+    def test_intervals(self):
+        intervals = Intervals({"a": 0.5, "b": 0.3, "c": 0.0, "d": 0.2})
+        samples = intervals.sample(20000)
+        assert len(samples) == 20000
+        assert "c" not in samples
+        assert samples.count("a") / 20000. == pytest.approx(0.5, abs=0.02)
+        assert samples.count("d") / 20000. == pytest.approx(0.2, abs=0.02)
+        assert [intervals.sample() for _ in range(2000)].count("b") / 2000. == pytest.approx(0.3, abs=0.04)
+
+        weighted = Intervals([1, 2, 3], lambda x: float(x))
+        assert weighted.sample(6000).count(3) / 6000. == pytest.approx(0.5, abs=0.03)
+
+        with pytest.raises(ValueError):
+            Intervals({"a": 0.0})
+
+    def test_network_util(self, sampling_time):
         network = NetworkExamples.construct_basic_network2()
         ve = VariableElimination()
         naive = NaiveInference()
-        iz = SamplingAlgorithm(4000, 300)
+        iz = SamplingAlgorithm(4000, sampling_time)
 
         assert ve.query_util(network, ["Action"], Assignment([Assignment("JohnCalls"), Assignment("MaryCalls")])).get_util(Assignment("Action", "CallPolice")) == pytest.approx(-0.680, abs=0.001)
         assert naive.query_util(network, ["Action"], Assignment([Assignment("JohnCalls"), Assignment("MaryCalls")])).get_util(Assignment("Action", "CallPolice")) == pytest.approx(-0.680, abs=0.001)
@@ -0,0 +1,108 @@
+from copy import copy
+
+import pytest
+
+from bn.distribs.distribution_builder import CategoricalTableBuilder
+from bn.nodes.chance_node import ChanceNode
+from datastructs.assignment import Assignment
+from dialogue_state import DialogueState
+from inference.exact.junction_tree import JunctionTree
+from inference.exact.variable_elimination import VariableElimination
+from inference.query import ProbQuery
+from inference.switching_algorithm import SwitchingAlgorithm
+from test.common.network_examples import NetworkExamples
+
+
+class TestJunctionTree:
+    def assert_same_marginals(self, network, evidence):
+        ve = VariableElimination()
+        jt = JunctionTree()
+        for query_var in network.get_chance_node_ids():
+            distrib1 = ve.query_prob(network, query_var, evidence)
+            distrib2 = jt.query_prob(network, query_var, evidence)
+            for value in distrib1.get_values():
+                assert distrib2.get_prob(value) == pytest.approx(distrib1.get_prob(value), abs=0.000001)
+
+    def test_marginals(self):
+        for network in [NetworkExamples.construct_basic_network(), NetworkExamples.construct_basic_network2()]:
+            self.assert_same_marginals(network, Assignment())
+            self.assert_same_marginals(network, Assignment(["JohnCalls", "MaryCalls"]))
+            self.assert_same_marginals(network, Assignment(["!Alarm", "Earthquake"]))
+
+        jt = JunctionTree()
+        bn = NetworkExamples.construct_basic_network()
+        query = jt.query_prob(bn, ["Burglary"], Assignment(["JohnCalls", "MaryCalls"]))
+        assert query.get_prob(Assignment("Burglary", True)) == pytest.approx(0.286323, abs=0.0001)
+
+        # variables in one clique, and variables spread over several cliques
+        for query_vars in [["Alarm", "Burglary"], ["Burglary", "JohnCalls", "MaryCalls"]]:
+            distrib1 = VariableElimination().query_prob(bn, query_vars, Assignment("Earthquake"))
+            distrib2 = jt.query_prob(bn, query_vars, Assignment("Earthquake"))
+            for value in distrib1.get_values():
+                assert distrib2.get_prob(value) == pytest.approx(distrib1.get_prob(value), abs=0.000001)
+
+    def test_cache(self):
+        jt = JunctionTree()
+        bn = NetworkExamples.construct_basic_network()
+        jt.query_prob(bn, "Burglary")
+        tree = bn.get_junction_tree()
+        assert JunctionTree.is_calibrated(bn, Assignment())
+        assert not JunctionTree.is_calibrated(bn, Assignment("JohnCalls"))
+        jt.query_prob(bn, "MaryCalls")
+        assert bn.get_junction_tree() is tree
+
+        builder = CategoricalTableBuilder("Burglary")
+        builder.add_row(True, 0.1)
+        builder.add_row(False, 0.9)
+        bn.get_chance_node("Burglary").set_distrib(builder.build())
+        assert not JunctionTree.is_calibrated(bn, Assignment())
+        assert jt.query_prob(bn, "Burglary").get_prob(True) == pytest.approx(0.1, abs=0.000001)
+        self.assert_same_marginals(bn, Assignment())
+
+        # the distributions modified in place invalidate the tree as well
+        jt.query_prob(bn, "Alarm")
+        assert JunctionTree.is_calibrated(bn, Assignment())
+        bn.get_chance_node("Burglary").get_mutable_distrib().prune_values(0.5)
+        assert not JunctionTree.is_calibrated(bn, Assignment())
+        assert jt.query_prob(bn, "Burglary").get_prob(True) == pytest.approx(0.0, abs=0.000001)
+        self.assert_same_marginals(bn, Assignment())
+
+        builder = CategoricalTableBuilder("Light")
+        builder.add_row(True, 0.5)
+        bn.add_node(ChanceNode("Light", builder.build()))
+        assert not JunctionTree.is_calibrated(bn, Assignment())
+        self.assert_same_marginals(bn, Assignment())
+
+    def test_independent_reads(self):
+        state = DialogueState(NetworkExamples.construct_basic_network())
+        state.query_prob("Alarm")
+        state.query_prob("Alarm")
+        tree = state.get_junction_tree()
+        assert JunctionTree.is_calibrated(state, Assignment())
+
+        # the independent variables are read without copying nor invalidating the tree
+        state_copy = copy(state)
+        distrib = state.get_chance_node("Burglary").get_distrib()
+        assert state.query_prob("Burglary") is distrib
+        assert state_copy.query_prob("Burglary") is distrib
+        assert JunctionTree.is_calibrated(state, Assignment())
+        state.query_prob("Alarm")
+        assert state.get_junction_tree() is tree
+
+    def test_switching(self):
+        bn = NetworkExamples.construct_basic_network()
+        evidence = Assignment(["JohnCalls", "MaryCalls"])
+        algorithm1 = SwitchingAlgorithm().select_best_algorithm(ProbQuery(bn, ["Burglary"], evidence))
+        # the queries are counted per network
+        SwitchingAlgorithm().select_best_algorithm(ProbQuery(NetworkExamples.construct_basic_network(), ["Alarm"], evidence))
+        algorithm2 = SwitchingAlgorithm().select_best_algorithm(ProbQuery(bn, ["Earthquake"], evidence))
+        assert isinstance(algorithm1, VariableElimination) and not isinstance(algorithm1, JunctionTree)
+        assert isinstance(algorithm2, JunctionTree)
+
+        query = SwitchingAlgorithm().query_prob(bn, ["Burglary"], evidence)
+        assert query.get_prob(Assignment("Burglary", True)) == pytest.approx(0.286323, abs=0.0001)
+        assert JunctionTree.is_calibrated(bn, evidence)
+
+        bn.get_chance_node("Alarm").prune_values(0.9)
+        algorithm3 = SwitchingAlgorithm().select_best_algorithm(ProbQuery(bn, ["Burglary"], evidence))
+        assert not isinstance(algorithm3, JunctionTree)
@@ -9,7 +9,7 @@ from readers.xml_domain_reader import XMLDomainReader
 class TestRuleAndParams:
     domain_file = "test/data/rulesandparams.xml"
 
-    def test_rule_and_params(self):
+    def test_rule_and_params(self, sampling_time):
         domain = XMLDomainReader.extract_domain(TestRuleAndParams.domain_file)
         system = DialogueSystem(domain)
 
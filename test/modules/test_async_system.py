@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import pytest
+
+from dialogue_system import DialogueSystem
+from readers.xml_domain_reader import XMLDomainReader
+from session_manager import SessionManager
+
+
+class TestAsyncSystem:
+    domain_file = "test/data/example-flightbooking.xml"
+
+    domain = XMLDomainReader.extract_domain(domain_file)
+
+    def run(self, coroutine):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coroutine)
+        finally:
+            loop.close()
+
+    def create_system(self):
+        system = DialogueSystem(TestAsyncSystem.domain)
+        system.get_settings().show_gui = False
+        system.start_system()
+        return system
+
+    def test_add_user_input(self):
+        system = self.create_system()
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.001)
+
+        async def dialogue():
+            ticker_task = asyncio.ensure_future(ticker())
+            # the updates are performed in the order of the calls
+            first = asyncio.ensure_future(system.add_user_input_async({"to Bergen": 0.4, "to Bethleem": 0.2}))
+            second = asyncio.ensure_future(system.add_user_input_async({"yes exactly": 0.8}))
+            results = [await first, await second]
+            ticker_task.cancel()
+            return results
+
+        results = self.run(dialogue())
+        assert all("a_u" in updated_vars for updated_vars in results)
+        assert system.get_content("Destination").get_prob("Bergen") == pytest.approx(1.0, abs=0.01)
+        # the event loop is not blocked during the updates
+        assert len(ticks) > 2
+
+    def test_timeout(self):
+        system = self.create_system()
+
+        async def dialogue():
+            first = asyncio.ensure_future(system.add_user_input_async("to Oslo"))
+            with pytest.raises(asyncio.TimeoutError):
+                await system.add_user_input_async("yes", timeout=0)
+            await first
+            return await system.update_async(timeout=60)
+
+        self.run(dialogue())
+        assert str(system.get_content("a_m").to_discrete().get_best()) == "Ground(Destination,Oslo)"
+        # the timed-out input is never processed
+        assert str(system.get_content("u_u").get_best()) == "to Oslo"
+
+    def test_session_manager(self):
+        manager = SessionManager(TestAsyncSystem.domain, 2)
+        try:
+            session_ids = [manager.open_session() for _ in range(2)]
+
+            async def dialogue():
+                return await asyncio.gather(manager.add_user_input_async(session_ids[0], "to Oslo"),
+                                            manager.add_user_input_async(session_ids[1], "to Bergen", timeout=60))
+
+            results = self.run(dialogue())
+            assert all("a_u" in updated_vars for updated_vars in results)
+            assert str(manager.get_session(session_ids[1]).get_content("a_m").to_discrete().get_best()) \
+                == "Ground(Destination,Bergen)"
+        finally:
+            manager.shutdown()
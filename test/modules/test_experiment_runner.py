@@ -0,0 +1,41 @@
+import csv
+import json
+import os
+import tempfile
+
+from modules.simulation.experiment_runner import ExperimentRunner
+
+
+class TestExperimentRunner:
+    main_domain = "test/data/experiment-domain.xml"
+    sim_domain = "test/data/experiment-simulator.xml"
+
+    def test_experiment(self):
+        runner = ExperimentRunner(TestExperimentRunner.main_domain, TestExperimentRunner.sim_domain, 'forward', 3)
+        output_file = os.path.join(tempfile.mkdtemp(), 'experiment.jsonl')
+        records = runner.run(1, 1, output_file)
+
+        assert len(records) == 1
+        record = records[0]
+        assert record['error'] is None
+        assert record['planner'] == 'forward'
+        assert record['length'] == 3
+        assert record['time_per_step'] > 0
+        assert record['reward'] == 4.0
+
+        with open(output_file) as f:
+            assert [json.loads(line) for line in f] == records
+
+        summary = ExperimentRunner.summarize(records)
+        assert summary['length'][0] == record['length']
+
+    def test_experiment_csv(self):
+        runner = ExperimentRunner(TestExperimentRunner.main_domain, TestExperimentRunner.sim_domain, 'mcts', 2)
+        output_file = os.path.join(tempfile.mkdtemp(), 'experiment.csv')
+        records = runner.run(2, 1, output_file, seed=5)
+
+        assert [record['seed'] for record in records] == [5, 6]
+        assert all(record['planner'] == 'mcts' and record['length'] == 2 for record in records)
+        with open(output_file) as f:
+            rows = list(csv.DictReader(f))
+        assert [row['dialogue'] for row in rows] == ['0', '1']
@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+
+from dialogue_system import DialogueSystem
+from readers.xml_domain_reader import XMLDomainReader
+from utils.instrumentation import Instrumentation
+
+
+class TestInstrumentation:
+    domain_file = "test/data/domain3.xml"
+
+    domain = XMLDomainReader.extract_domain(domain_file)
+
+    @staticmethod
+    def get_events(events):
+        for event in events:
+            yield event
+            yield from TestInstrumentation.get_events(event.get('events', []))
+
+    def test_instrumentation(self):
+        Instrumentation.clear()
+        Instrumentation.enable()
+        try:
+            system = DialogueSystem(TestInstrumentation.domain)
+            system.get_settings().show_gui = False
+            system.start_system()
+        finally:
+            Instrumentation.enable(False)
+
+        report = Instrumentation.get_last_report()
+        assert report is not None
+        assert report['duration'] > 0
+        assert 'a_m3' in report['updated_variables']
+        assert len(report['cycles']) > 0
+
+        events = [event for cycle in report['cycles'] for event in TestInstrumentation.get_events(cycle['events'])]
+        categories = set(event['category'] for event in events)
+        assert {'reduce', 'prune', 'module', 'inference'} <= categories
+        assert any(event['name'] == 'ForwardPlanner' for event in events)
+        inference = [event for event in events if event['category'] == 'inference']
+        assert all(event['algorithm'] == 'VariableElimination' and event['nb_nodes'] > 0 for event in inference)
+
+        output_file = os.path.join(tempfile.mkdtemp(), 'instrumentation.json')
+        Instrumentation.dump(output_file)
+        with open(output_file) as f:
+            assert json.load(f) == json.loads(Instrumentation.to_json())
+
+    def test_disabled_instrumentation(self):
+        Instrumentation.clear()
+        system = DialogueSystem(TestInstrumentation.domain)
+        system.get_settings().show_gui = False
+        system.start_system()
+        assert Instrumentation.get_last_report() is None
+        with Instrumentation.measure('model', 'model'):
+            pass
+        assert len(Instrumentation.get_reports()) == 0
@@ -1,6 +1,10 @@
+import logging
+
 from bn.distribs.distribution_builder import CategoricalTableBuilder
 from dialogue_system import DialogueSystem
+from modules.forward_planner import PlannerProcess
 from readers.xml_domain_reader import XMLDomainReader
+from settings import Settings
 from test.common.inference_checks import InferenceChecks
 
 
@@ -73,3 +77,38 @@ class TestPlanning:
         system.add_content(t1.build())
 
         TestPlanning.inference.check_prob(system.get_state(), "a_m", "AskRepeat", 1.0)
+
+    def test_planning_deadline(self, monkeypatch):
+        system = DialogueSystem(TestPlanning.domain2)
+
+        system.get_settings().show_gui = False
+
+        system.get_settings().horizon = 2
+        monkeypatch.setattr(Settings, 'max_sampling_time', 0)
+        system.start_system()
+
+        # the lookahead is interrupted, and the action is selected with horizon 1
+        assert not system.get_state().has_chance_node("a_m")
+
+    def test_planning_interrupted(self, monkeypatch, caplog):
+        system = DialogueSystem(TestPlanning.domain2)
+
+        system.get_settings().show_gui = False
+
+        system.get_settings().horizon = 2
+        get_q_values = PlannerProcess.get_q_values
+
+        def get_q_values_until_deadline(process, state, horizon):
+            q_values = get_q_values(process, state, horizon)
+            # the deadline is reached once the lookahead with horizon 1 is complete
+            if horizon > 1:
+                process.is_terminated = True
+            return q_values
+
+        monkeypatch.setattr(PlannerProcess, 'get_q_values', get_q_values_until_deadline)
+        with caplog.at_level(logging.DEBUG, logger='PyOpenDial'):
+            system.start_system()
+
+        # the lookahead with horizon 2 is discarded, and the action is selected with horizon 1
+        assert "planning interrupted at horizon 2" in caplog.text
+        assert not system.get_state().has_chance_node("a_m")
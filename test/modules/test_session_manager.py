@@ -0,0 +1,48 @@
+import pytest
+
+from modules.forward_planner import ForwardPlanner
+from readers.xml_domain_reader import XMLDomainReader
+from session_manager import SessionManager
+
+
+class TestSessionManager:
+    domain_file = "test/data/example-flightbooking.xml"
+
+    domain = XMLDomainReader.extract_domain(domain_file)
+
+    def test_sessions(self):
+        manager = SessionManager(TestSessionManager.domain, 2)
+        try:
+            session_ids = [manager.open_session() for _ in range(3)]
+            assert len(set(session_ids)) == 3
+            for session_id in session_ids:
+                assert manager.get_session(session_id).get_domain() is manager.get_domain()
+                assert str(manager.get_session(session_id).get_content("u_m").get_best()).find("your destination?") != -1
+
+            futures = [manager.add_user_input(session_ids[0], {"to Bergen": 0.4, "to Bethleem": 0.2}),
+                       manager.add_user_input(session_ids[1], "to Oslo"),
+                       manager.add_user_input(session_ids[0], {"yes exactly": 0.8})]
+            for future in futures:
+                assert "a_u" in future.result(timeout=60)
+
+            first = manager.get_session(session_ids[0])
+            assert first.get_content("Destination").get_prob("Bergen") == pytest.approx(1.0, abs=0.01)
+            assert str(first.get_content("a_m").to_discrete().get_best()) == "Ground(Destination,Bergen)"
+            second = manager.get_session(session_ids[1])
+            assert str(second.get_content("a_m").to_discrete().get_best()) == "Ground(Destination,Oslo)"
+            assert not manager.get_state(session_ids[2]).has_chance_node("a_u")
+
+            manager.close_session(session_ids[2])
+            assert manager.get_session_ids() == set(session_ids[:2])
+            with pytest.raises(ValueError):
+                manager.add_user_input(session_ids[2], "to Oslo")
+
+            # the shared domain, settings and modules of a session cannot be changed
+            with pytest.raises(NotImplementedError):
+                first.change_domain(TestSessionManager.domain)
+            with pytest.raises(NotImplementedError):
+                first.change_settings(first.get_settings())
+            with pytest.raises(NotImplementedError):
+                first.attach_module(ForwardPlanner)
+        finally:
+            manager.shutdown()
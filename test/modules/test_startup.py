@@ -0,0 +1,19 @@
+import subprocess
+import sys
+
+
+class TestStartup:
+    domain_file = "test/data/domain3.xml"
+
+    def test_headless_start(self):
+        script = "import sys\n" \
+                 "from dialogue_system import DialogueSystem\n" \
+                 "from readers.xml_domain_reader import XMLDomainReader\n" \
+                 "system = DialogueSystem(XMLDomainReader.extract_domain('%s'))\n" \
+                 "system.get_settings().show_gui = False\n" \
+                 "system.start_system()\n" \
+                 "print(','.join(sorted(set(module.split('.')[0] for module in sys.modules))))" % TestStartup.domain_file
+        output = subprocess.check_output([sys.executable, '-c', script]).decode().strip().splitlines()[-1]
+        packages = set(output.split(','))
+        assert 'dialogue_system' in packages
+        assert not packages & {'PyQt5', 'soundcard', 'google', 'torch', 'scipy'}
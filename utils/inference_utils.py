@@ -2,9 +2,8 @@ import functools
 import logging
 import random
 
-from multipledispatch import dispatch
-
 from datastructs.assignment import Assignment
+from utils.dispatch_utils import dispatch
 
 dispatch_namespace = dict()
 
@@ -0,0 +1,245 @@
+import itertools
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+
+class Instrumentation:
+    """
+    Opt-in instrumentation of the updates of the dialogue system. When enabled, each
+    call to DialogueSystem.update produces a report for the turn, which records the
+    duration of each update cycle and of the operations performed in the cycle: the
+    reduction of the dialogue state (with the steps of the state pruner), the model
+    and module triggers, and the inference calls made through the switching
+    algorithm (with the selected algorithm, the factor sizes and the number of
+    samples). Operations performed within another operation are recorded as its
+    children.
+
+    A report is a dictionary of the form:
+
+    {'turn': 3, 'start_time': 1500000000.0, 'duration': 0.052, 'updated_variables': [...],
+     'cycles': [{'variables': [...], 'duration': 0.031,
+                 'events': [{'category': 'model', 'name': 'model1', 'duration': 0.012,
+                             'events': [...]}, ...]}, ...]}
+
+    where the durations are expressed in seconds. The instrumentation is disabled by
+    default, in which case the instrumented operations only check the enabled flag.
+    """
+
+    # logger
+    log = logging.getLogger('PyOpenDial')
+
+    # whether the instrumentation is enabled
+    enabled = False
+
+    # maximum number of turn reports kept in memory
+    max_reports = 100
+
+    _reports = deque()
+    _turn_counter = itertools.count()
+    _lock = threading.RLock()
+    _local = threading.local()
+
+    @staticmethod
+    def enable(to_enable=True):
+        """
+        Enables (or disables) the instrumentation.
+
+        :param to_enable: whether to enable the instrumentation
+        """
+        Instrumentation.enabled = to_enable
+
+    @staticmethod
+    def start_turn():
+        """
+        Starts the report of a new turn in the current thread. Nested updates (that
+        is, updates triggered while the turn is in progress) belong to the same turn.
+        """
+        local = Instrumentation._local
+        local.depth = getattr(local, 'depth', 0) + 1
+        if local.depth == 1:
+            local.turn = {'turn': next(Instrumentation._turn_counter), 'start_time': time.time(),
+                          'duration': None, 'updated_variables': [], 'cycles': []}
+            local.turn_start = time.perf_counter()
+            local.cycle = None
+            local.stack = []
+
+    @staticmethod
+    def end_turn(updated_vars):
+        """
+        Ends the report of the current turn, and stores it.
+
+        :param updated_vars: the variables updated during the turn
+        """
+        local = Instrumentation._local
+        if getattr(local, 'depth', 0) == 0:
+            return
+
+        local.depth -= 1
+        if local.depth == 0:
+            Instrumentation.end_cycle()
+            turn = local.turn
+            turn['duration'] = time.perf_counter() - local.turn_start
+            turn['updated_variables'] = sorted(updated_vars)
+            local.turn = None
+            with Instrumentation._lock:
+                Instrumentation._reports.append(turn)
+                while len(Instrumentation._reports) > Instrumentation.max_reports:
+                    Instrumentation._reports.popleft()
+
+    @staticmethod
+    def start_cycle(variables):
+        """
+        Starts a new update cycle in the current turn (ending the previous one).
+
+        :param variables: the new variables processed in the cycle
+        """
+        local = Instrumentation._local
+        if getattr(local, 'turn', None) is None or local.depth > 1:
+            return
+
+        Instrumentation.end_cycle()
+        local.cycle = {'variables': sorted(variables), 'duration': None, 'events': []}
+        local.cycle_start = time.perf_counter()
+        local.turn['cycles'].append(local.cycle)
+
+    @staticmethod
+    def end_cycle():
+        """
+        Ends the current update cycle (if any).
+        """
+        local = Instrumentation._local
+        if getattr(local, 'cycle', None) is not None:
+            local.cycle['duration'] = time.perf_counter() - local.cycle_start
+            local.cycle = None
+
+    @staticmethod
+    def measure(category, name, **details):
+        """
+        Returns a context manager measuring the duration of an operation in the
+        current turn. If the instrumentation is disabled or no turn is in progress,
+        the operation is not recorded.
+
+        :param category: the category of the operation (e.g. 'model' or 'inference')
+        :param name: the name of the operation
+        :param details: additional details on the operation
+        :return: the context manager
+        """
+        if not Instrumentation.enabled or getattr(Instrumentation._local, 'turn', None) is None:
+            return _no_measurement
+        return _Measurement(category, name, details)
+
+    @staticmethod
+    def annotate(**details):
+        """
+        Adds details to the innermost operation in progress in the current thread (if
+        any). Numerical details are summed over successive annotations.
+
+        :param details: the details to add
+        """
+        stack = getattr(Instrumentation._local, 'stack', None)
+        if not Instrumentation.enabled or not stack:
+            return
+
+        event = stack[-1]
+        for key, value in details.items():
+            if isinstance(value, (int, float)) and isinstance(event.get(key, None), (int, float)):
+                event[key] += value
+            else:
+                event[key] = value
+
+    @staticmethod
+    def get_reports():
+        """
+        Returns the reports of the last turns (oldest first).
+
+        :return: the list of turn reports
+        """
+        with Instrumentation._lock:
+            return list(Instrumentation._reports)
+
+    @staticmethod
+    def get_last_report():
+        """
+        Returns the report of the last completed turn, or None if no turn has been
+        recorded.
+
+        :return: the last turn report
+        """
+        with Instrumentation._lock:
+            return Instrumentation._reports[-1] if len(Instrumentation._reports) > 0 else None
+
+    @staticmethod
+    def clear():
+        """
+        Removes all the stored reports.
+        """
+        with Instrumentation._lock:
+            Instrumentation._reports.clear()
+
+    @staticmethod
+    def to_json(indent=None):
+        """
+        Returns the stored reports as a JSON string.
+
+        :param indent: the indentation of the JSON output (optional)
+        :return: the JSON string
+        """
+        return json.dumps(Instrumentation.get_reports(), indent=indent)
+
+    @staticmethod
+    def dump(file_path):
+        """
+        Writes the stored reports to a JSON file.
+
+        :param file_path: the path of the file
+        """
+        with open(file_path, 'w') as f:
+            f.write(Instrumentation.to_json(indent=2))
+
+
+class _Measurement:
+    """
+    Context manager recording an operation in the current turn.
+    """
+
+    def __init__(self, category, name, details):
+        self._event = {'category': category, 'name': name, 'duration': None}
+        self._event.update(details)
+
+    def __enter__(self):
+        local = Instrumentation._local
+        if len(local.stack) > 0:
+            local.stack[-1].setdefault('events', []).append(self._event)
+        elif local.cycle is not None:
+            local.cycle['events'].append(self._event)
+        else:
+            local.turn.setdefault('events', []).append(self._event)
+
+        local.stack.append(self._event)
+        self._start = time.perf_counter()
+        return self._event
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._event['duration'] = time.perf_counter() - self._start
+        if exc_type is not None:
+            self._event['error'] = str(exc_value)
+        Instrumentation._local.stack.pop()
+        return False
+
+
+class _NoMeasurement:
+    """
+    Context manager doing nothing (used when the instrumentation is disabled).
+    """
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_no_measurement = _NoMeasurement()
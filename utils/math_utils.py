@@ -1,4 +1,3 @@
-from multipledispatch import dispatch
 import itertools
 import math
 import numpy as np
@@ -8,7 +7,8 @@ from bn.values.array_val import ArrayVal
 from bn.values.value_factory import ValueFactory
 
 import logging
-from multipledispatch import dispatch
+from utils.dispatch_utils import dispatch
+from utils.dispatch_utils import dispatch
 
 dispatch_namespace = dict()
 
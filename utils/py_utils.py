@@ -1,3 +1,5 @@
+import importlib
+import importlib.util
 import time
 import threading
 
@@ -15,6 +17,44 @@ def get_class(kls):
     return m
 
 
+def get_lazy_function(path):
+    """
+    Returns a function that imports the module of the function (given by its full
+    path, e.g. package.module.function) upon its first call, so that modules relying
+    on heavy dependencies are only loaded when actually needed.
+
+    :param path: the full path of the function
+    :return: the function
+    """
+    module_name = path.strip().rsplit('.', 1)[0]
+    if importlib.util.find_spec(module_name) is None:
+        raise ValueError("Cannot find module %s" % module_name)
+    return LazyFunction(path)
+
+
+class LazyFunction:
+    """
+    Function imported upon its first call (see get_lazy_function). The function is
+    pickled by its path.
+    """
+
+    def __init__(self, path):
+        self._path = path.strip()
+        self._module_name, self.__name__ = self._path.rsplit('.', 1)
+        self._function = None
+
+    def __call__(self, *args, **kwargs):
+        if self._function is None:
+            self._function = getattr(importlib.import_module(self._module_name), self.__name__)
+        return self._function(*args, **kwargs)
+
+    def __reduce__(self):
+        return LazyFunction, (self._path,)
+
+    def get_path(self):
+        return self._path
+
+
 def get_class_name(instance):
     return instance.__module__ + '.' + instance.__class__.__name__
 
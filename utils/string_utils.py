@@ -2,7 +2,8 @@ import logging
 from collections import Collection
 
 import regex as re
-from multipledispatch import dispatch
+
+from utils.dispatch_utils import dispatch
 
 dispatch_namespace = dict()
 
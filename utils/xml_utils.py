@@ -4,9 +4,8 @@ from xml.etree.ElementTree import ElementTree, Element
 from io import IOBase
 import logging
 
-from multipledispatch import dispatch
-
 from dialogue_state import DialogueState
+from utils.dispatch_utils import dispatch
 
 dispatch_namespace = dict()
 